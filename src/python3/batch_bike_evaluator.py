@@ -0,0 +1,514 @@
+#!/usr/bin/python3
+
+import math
+import numpy as np
+
+from rider_profile import as_rider_profile
+
+## The column order of the design arrays used by the BatchBikeEvaluator. Each
+## row of a design array holds one bike's values for these params (in the same
+## units as the bike_params file, so angles are in degrees).
+BIKE_PARAM_NAMES = ['wheelbase',
+                    'hip_angle',
+                    'headtube_angle',
+                    'crank_radius',
+                    'crank_x_offset',
+                    'crank_z_offset',
+                    'fork_offset',
+                    'seat_height',
+                    'handlebar_radius',
+                    'front_wheel_radius',
+                    'rear_wheel_radius',
+                    'frame_mass',
+                    'crank_mass',
+                    'front_wheel_mass',
+                    'rear_wheel_mass']
+
+class BatchBikeEvaluator:
+  'Computes the error of many bike designs at once. This mirrors the scalar \
+   math in Bike.compute_error, but works on an (N designs x 15 params) array \
+   so that a whole population can be scored with a handful of NumPy calls.'
+
+  def __init__(self):
+    ## General constants
+    self._g = 9.81 ## Gravity [m/s^2]
+
+  ## Converts a list of single_bike_params dictionaries (param -> value) into an
+  ## (N x 15) design array whose columns follow BIKE_PARAM_NAMES.
+  def designs_from_bike_params(self, single_bike_params_list):
+    designs = np.empty((len(single_bike_params_list), len(BIKE_PARAM_NAMES)))
+    for row, single_bike_params in enumerate(single_bike_params_list):
+      for column, name in enumerate(BIKE_PARAM_NAMES):
+        designs[row, column] = single_bike_params[name]
+    return designs
+
+  ## Converts a list of single_bike_params_indexes dictionaries (param -> index
+  ## into bike_params[param]) into an (N x 15) design array whose columns follow
+  ## BIKE_PARAM_NAMES.
+  def designs_from_indexes(self, bike_params, single_bike_params_indexes_list):
+    designs = np.empty((len(single_bike_params_indexes_list),
+                        len(BIKE_PARAM_NAMES)))
+    for column, name in enumerate(BIKE_PARAM_NAMES):
+      values = np.asarray(bike_params[name], dtype=float)
+      indexes = [single_bike_params_indexes[name] for single_bike_params_indexes
+                 in single_bike_params_indexes_list]
+      designs[:, column] = values[np.asarray(indexes, dtype=int)]
+    return designs
+
+  ## Converts a Population (whose genes index into population.bike_params) into
+  ## an (N x 15) design array whose columns follow BIKE_PARAM_NAMES.
+  def designs_from_population(self, population):
+    designs = np.empty((len(population), len(BIKE_PARAM_NAMES)))
+    for column, name in enumerate(BIKE_PARAM_NAMES):
+      values = np.asarray(population.bike_params[name], dtype=float)
+      designs[:, column] = values[population.genomes[:, population.gene_index(name)]]
+    return designs
+
+  ## Attempts to fit each rider onto every design in the designs array, and
+  ## tests each version up to the specified top_speed. Returns an N-vector of
+  ## the normalized score for each design from all the rider fittings, with
+  ## infinity where the bike geometry is invalid or one of the riders didn't
+  ## fit. This matches Bike.compute_error to within floating point tolerance.
+  def compute_errors(self, designs, riders, target_control_sensitivity,
+                     top_speed):
+    designs = np.atleast_2d(np.asarray(designs, dtype=float))
+    num_designs = designs.shape[0]
+
+    error = np.zeros(num_designs)
+    fits = np.ones(num_designs, dtype=bool)
+
+    ## Only compare the curves over the overlapping speeds, just like
+    ## Bike.compute_sum_of_diff_of_squares does.
+    curve_length = min(int(top_speed), len(target_control_sensitivity))
+    speeds = np.arange(curve_length, dtype=float)
+    target = np.asarray(target_control_sensitivity[:curve_length], dtype=float)
+
+    ## The intermediate values of invalid designs are thrown away below, so
+    ## silence the warnings NumPy raises while computing them.
+    with np.errstate(all='ignore'):
+      bike = self._unpack_designs(designs)
+      frame = self._compute_frame_components(bike)
+
+      ## Try and fit each rider
+      for rider in riders:
+        rider_fits, control_sensitivity =\
+          self._fit_rider_and_compute_control_sensitivity(bike, frame,
+                                                          as_rider_profile(rider),
+                                                          speeds)
+        fits &= rider_fits
+        error += np.sum((control_sensitivity - target) ** 2, axis=1)
+
+      ## Normalize the error across riders.
+      error = error / len(riders)
+
+    ## If any rider doesn't fit (or the design's math broke down), return the
+    ## worst case score for that design.
+    fits &= np.isfinite(error)
+    error[~fits] = float('inf')
+    return error
+
+  ## Splits the design array into named columns, converting the angles from
+  ## degrees to radians.
+  def _unpack_designs(self, designs):
+    bike = {}
+    for column, name in enumerate(BIKE_PARAM_NAMES):
+      bike[name] = designs[:, column]
+
+    return {'A': bike['wheelbase'],
+            'alpha': np.radians(bike['hip_angle']),
+            'beta': np.radians(bike['headtube_angle']),
+            'Cr': bike['crank_radius'],
+            'Cx': bike['crank_x_offset'],
+            'Cz': bike['crank_z_offset'],
+            'e': bike['fork_offset'],
+            'Hz': bike['seat_height'],
+            'Rh': bike['handlebar_radius'],
+            'Rf': bike['front_wheel_radius'],
+            'Rr': bike['rear_wheel_radius'],
+            'm_frame': bike['frame_mass'],
+            'm_crank': bike['crank_mass'],
+            'm_front_wheel': bike['front_wheel_mass'],
+            'm_rear_wheel': bike['rear_wheel_mass']}
+
+  ## Computes every frame component that does not depend on the rider (the
+  ## fork, chain stays and down tube), see Bike._compute_fork and friends.
+  def _compute_frame_components(self, bike):
+    A = bike['A']
+    beta = bike['beta']
+    Cx = bike['Cx']
+    Cz = bike['Cz']
+    e = bike['e']
+    Hz = bike['Hz']
+    Rf = bike['Rf']
+    Rr = bike['Rr']
+    frame = {}
+
+    ## Compute fork
+    gamma = (math.pi / 2) + beta
+    fork_slope = np.tan(gamma)
+    fork_bottom_x = A + e * np.cos(math.pi + beta)
+    fork_bottom_z = Rf + e * np.sin(math.pi + beta)
+    fork_intercept = fork_bottom_z - fork_slope * fork_bottom_x
+
+    a = fork_slope * fork_slope + 1
+    b = 2 * (fork_intercept - Rf) * fork_slope - 2 * A
+    c = A * A + (fork_intercept - Rf) * (fork_intercept - Rf) - (Rf * Rf)
+
+    descrim = b * b - 4 * a * c
+    fork_crosses_wheel = descrim >= 0
+    descrim = np.sqrt(np.where(fork_crosses_wheel, descrim, 0.0))
+
+    ## Positions the fork crosses the front wheel (if assumed infinite length)
+    x_1 = (-b + descrim) / (2 * a)
+    z_1 = fork_slope * x_1 + fork_intercept
+    x_2 = (-b - descrim) / (2 * a)
+    z_2 = fork_slope * x_2 + fork_intercept
+
+    fork_top_x = np.where(z_1 > z_2, x_1, x_2)
+    fork_top_z = np.where(z_1 > z_2, z_1, z_2)
+    tall_headtube = Hz > 2 * Rf
+    fork_top_x = np.where(tall_headtube, (Hz - fork_intercept) / fork_slope,
+                          fork_top_x)
+    fork_top_z = np.where(tall_headtube, Hz, fork_top_z)
+
+    t3x = (fork_top_x - fork_bottom_x) / 2 + fork_bottom_x
+    t3z = (fork_top_z - fork_bottom_z) / 2 + fork_bottom_z
+    t3l = 2 * np.sqrt((fork_bottom_x - fork_top_x) *\
+                      (fork_bottom_x - fork_top_x) +\
+                      (fork_top_z - fork_bottom_z) *\
+                      (fork_top_z - fork_bottom_z))
+
+    ## When the fork does not cross the wheel Bike leaves the fork top and the
+    ## fork's tube at their cleared (zero) values.
+    frame['fork_bottom_x'] = fork_bottom_x
+    frame['fork_bottom_z'] = fork_bottom_z
+    frame['fork_top_x'] = np.where(fork_crosses_wheel, fork_top_x, 0.0)
+    frame['fork_top_z'] = np.where(fork_crosses_wheel, fork_top_z, 0.0)
+    frame['t3x'] = np.where(fork_crosses_wheel, t3x, 0.0)
+    frame['t3z'] = np.where(fork_crosses_wheel, t3z, 0.0)
+    frame['t3l'] = np.where(fork_crosses_wheel, t3l, 0.0)
+    fork_top_x = frame['fork_top_x']
+    fork_top_z = frame['fork_top_z']
+
+    ## Chain stays
+    frame['t2x'] = (A + Cx) / 2
+    frame['t2z'] = ((Cz - Rr) / 2) + Rr
+    frame['t2l'] = 2 * np.sqrt((A + Cx) * (A + Cx) + (Cz - Rr) * (Cz - Rr))
+
+    ## Down tube
+    frame['t5x'] = np.where(Cx >= 0,
+                            (((A + Cx) - fork_top_x) / 2) + fork_top_x,
+                            ((fork_top_x - (Cx + A)) / 2) + (Cx + A))
+    frame['t5z'] = np.where(Cz >= fork_top_z,
+                            (Cz - fork_top_z) / 2 + fork_top_z,
+                            (fork_top_z - Cz) / 2 + Cz)
+    frame['t5l'] = np.sqrt((fork_top_z - frame['t5z']) *\
+                           (fork_top_z - frame['t5z']) +\
+                           (fork_top_x - frame['t5x']) *\
+                           (fork_top_x - frame['t5x']))
+
+    ## Patterson trail, which only depends on the front end geometry.
+    frame['trail'] = Rf * np.sin(beta) - e / np.cos(beta)
+
+    return frame
+
+  ## Fits the rider to every design, returning a tuple of (fits, control
+  ## sensitivity curves), where fits is a boolean N-vector and the curves are an
+  ## (N x len(speeds)) array. See Bike._fit_rider_to_bike for the scalar
+  ## version of this math.
+  def _fit_rider_and_compute_control_sensitivity(self, bike, frame, rider,
+                                                 speeds):
+    A = bike['A']
+    alpha = bike['alpha']
+    beta = bike['beta']
+    Cr = bike['Cr']
+    Cx = bike['Cx']
+    Cz = bike['Cz']
+    Hz = bike['Hz']
+    Rh = bike['Rh']
+    Rf = bike['Rf']
+    Rr = bike['Rr']
+    m_frame = bike['m_frame']
+    m_crank = bike['m_crank']
+    m_front_wheel = bike['m_front_wheel']
+    m_rear_wheel = bike['m_rear_wheel']
+    fork_top_x = frame['fork_top_x']
+    fork_top_z = frame['fork_top_z']
+
+    ## Rider Parameters
+    m_rider        = rider.rider_mass
+    head_diameter  = rider.head_diameter
+    torso_length   = rider.torso_length
+    torso_depth    = rider.torso_depth
+    arm_length     = rider.arm_length
+    leg_length     = rider.leg_length
+    leg_diameter   = rider.leg_diameter
+
+    ## Masses of each of the rider's body segments.
+    m_head   = rider.m_head
+    m_torso  = rider.m_torso
+    m_arm    = rider.m_arm
+    m_leg    = rider.m_leg
+
+    ## Compute the angle of the seat bottom relative to the ground plane, first
+    ## without and then with the thickness of the rider's legs. Invalid angle
+    ## values signify that the rider cannot fit on the bike.
+    angle_value = (Cz - Hz) / (leg_length - Cr)
+    fits = (angle_value >= -1.0) & (angle_value <= 1.0)
+    theta_prime = np.arcsin(np.clip(angle_value, -1.0, 1.0))
+
+    angle_value = (Cz - ((leg_diameter / 2) * np.cos(theta_prime)) - Hz) /\
+                  (leg_length - Cr)
+    fits &= (angle_value >= -1.0) & (angle_value <= 1.0)
+    theta = np.arcsin(np.clip(angle_value, -1.0, 1.0))
+
+    sin_theta = np.sin(theta)
+    cos_theta = np.cos(theta)
+
+    ## Compute the distance between the seat pivot and the center of the rider's
+    ## hip.
+    hip_center_delta_x = (torso_depth / 2) * np.cos(alpha - (math.pi / 2) + theta)
+    hip_center_delta_z = (torso_depth / 2) * np.sin(alpha - (math.pi / 2) + theta) +\
+                         (cos_theta * (leg_diameter / 2))
+
+    ## Compute the seat offset in the x-direction.
+    Hx = A + Cx - cos_theta * (leg_length - Cr) - hip_center_delta_x
+
+    ## Compute the total mass of the bike with the rider.
+    m_bike = m_frame + m_rider + m_crank + m_front_wheel + m_rear_wheel
+
+    ## Seat stays
+    t1x = Hx / 2
+    t1z = ((Hz - Rr) / 2) + Rr
+    t1l = 2 * np.sqrt((Hz - Rr) * (Hz - Rr) + Hx * Hx)
+
+    ## Top tube
+    t4x = (fork_top_x - Hx) / 2 + Hx
+    t4z = (fork_top_z - Hz) / 2 + Hz
+    t4l = np.sqrt((fork_top_x - Hx) * (fork_top_x - Hx) +\
+                  (fork_top_z - Hz) * (fork_top_z - Hz))
+
+    ## Seat back and lower seat
+    phi = math.pi - alpha - theta
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+    seat_back_start_x = Hx
+    seat_back_end_x = Hx - torso_length * cos_phi
+    seat_bottom_start_x = Hx
+    seat_bottom_start_z = Hz
+    seat_bottom_end_x = Hx + torso_depth * cos_theta
+
+    ## Head
+    head_cg_x = Hx - ((torso_length + (head_diameter / 2)) * cos_phi -\
+                      hip_center_delta_x)
+    head_cg_z = Hz + ((torso_length + (head_diameter / 2)) * sin_phi +\
+                      hip_center_delta_z)
+
+    ## Torso
+    torso_end_x = Hx + hip_center_delta_x - torso_length * cos_phi
+    torso_end_z = Hz + hip_center_delta_z + torso_length * sin_phi
+    torso_cg_x = Hx + hip_center_delta_x - (torso_length / 2) * cos_phi
+    torso_cg_z = Hz + hip_center_delta_z + (torso_length / 2) * sin_phi
+
+    ## Legs
+    leg_start_x = Hx + hip_center_delta_x
+    leg_start_z = Hz + hip_center_delta_z
+    leg_end_x = Hx + leg_length * cos_theta + hip_center_delta_x
+    leg_end_z = np.where(hip_center_delta_z < 0,
+                         Hz + leg_length * sin_theta,
+                         Hz + leg_length * sin_theta + hip_center_delta_z)
+    leg_cg_x = leg_start_x - (leg_start_x - leg_end_x) / 2
+    leg_cg_z = leg_start_z - (leg_start_z - leg_end_z) / 2
+
+    ## Arms
+    zeta = np.arctan((torso_end_z - fork_top_z) / (fork_top_x - torso_end_x))
+    sin_zeta = np.sin(zeta)
+    cos_zeta = np.cos(zeta)
+    arm_cg_x = cos_zeta * (arm_length / 2) + torso_end_x
+    arm_cg_z = -sin_zeta * (arm_length / 2) + torso_end_z
+
+    ## Rider CG
+    rider_cg_x = ((head_cg_x * m_head) + (torso_cg_x * m_torso) +\
+                  2 * (leg_cg_x * m_leg) + 2 * (arm_cg_x * m_arm)) / m_rider
+    rider_cg_z = ((head_cg_z * m_head) + (torso_cg_z * m_torso) +\
+                  2 * (leg_cg_z * m_leg) + 2 * (arm_cg_z * m_arm)) / m_rider
+
+    ## Frame CG
+    total_tube_length = t1l + frame['t2l'] + frame['t3l'] + t4l + frame['t5l']
+    t1m = (t1l / total_tube_length) * m_frame
+    t2m = (frame['t2l'] / total_tube_length) * m_frame
+    t3m = (frame['t3l'] / total_tube_length) * m_frame
+    t4m = (t4l / total_tube_length) * m_frame
+    t5m = (frame['t5l'] / total_tube_length) * m_frame
+    frame_mass = m_frame + m_crank + m_front_wheel + m_rear_wheel
+
+    frame_cg_x = (t1m * t1x + t2m * frame['t2x'] + t3m * frame['t3x'] +\
+                  t4m * t4x + t5m * frame['t5x'] + A * m_front_wheel +\
+                  (A + Cx) * m_crank) / frame_mass
+    frame_cg_z = (t1m * t1z + t2m * frame['t2z'] + t3m * frame['t3z'] +\
+                  t4m * t4z + t5m * frame['t5z'] + Rr * m_rear_wheel +\
+                  Rf * m_front_wheel + Cz * m_crank) / frame_mass
+
+    ## Bike CG
+    m_bike_x = (frame_cg_x * m_frame + rider_cg_x * m_rider) / (m_frame + m_rider)
+    m_bike_z = (frame_cg_z * m_frame + rider_cg_z * m_rider) / (m_frame + m_rider)
+
+    ## Head inertia about the global x-axis, idealizing the head as a sphere.
+    head_Ixx = rider.head_local_Ixx + m_head * (head_cg_z ** 2)
+
+    ## Torso inertia about the global x-axis, idealizing the torso as a cuboid.
+    ## Only the Ixx term of the rotated inertia tensor is needed, which is
+    ## sin^2 * local_Ixx + cos^2 * local_Izz for a rotation about the y-axis
+    ## (see Bike._compute_rotated_Ixx).
+    torso_Ixx = (sin_phi ** 2) * rider.torso_local_Ixx +\
+                (cos_phi ** 2) * rider.torso_local_Izz +\
+                m_torso * (torso_cg_z ** 2)
+
+    ## Leg inertia about the global x-axis, idealizing the leg as a cylinder.
+    leg_Ixx = (sin_theta ** 2) * rider.leg_local_Ixx +\
+              (cos_theta ** 2) * rider.leg_local_Izz +\
+              m_leg * (rider.leg_lateral_offset + (leg_cg_z ** 2))
+
+    ## Arm inertia about the global x-axis, idealizing the arm as a cylinder.
+    arm_Ixx = (sin_zeta ** 2) * rider.arm_local_Ixx +\
+              (cos_zeta ** 2) * rider.arm_local_Izz +\
+              m_arm * (rider.arm_lateral_offset + (arm_cg_z ** 2))
+
+    ## Radius of gyration of the rider and then of the whole bike about the
+    ## wheel contact patch. Note that Kxx^2 * (m / m_rider) == Ixx / m_rider.
+    rider_Kxx_squared = (head_Ixx / m_rider) + (torso_Ixx / m_rider) +\
+                        2 * (leg_Ixx / m_rider) + 2 * (arm_Ixx / m_rider)
+    bike_Kxx_squared = (rider_Kxx_squared * (m_rider / m_bike)) +\
+                       ((frame_cg_z ** 2) * (m_frame / m_bike)) +\
+                       ((Rf ** 2) * (m_front_wheel / m_bike)) +\
+                       ((Rr ** 2) * (m_rear_wheel / m_bike)) +\
+                       ((Cz ** 2) * (m_crank / m_bike))
+
+    ## Check that the rider fits on the bike, see Bike._rider_fits_on_bike.
+    fits &= self._wheels_clear_riders_head(A, Rf, Rr, head_cg_x, head_cg_z,
+                                           head_diameter)
+    fits &= self._wheel_clears_torso(A, Rf, alpha, theta, Hx, Hz,
+                                     seat_back_start_x, seat_back_end_x,
+                                     seat_bottom_start_x, seat_bottom_start_z,
+                                     seat_bottom_end_x)
+    fits &= self._wheel_clears_torso(0.0, Rr, alpha, theta, Hx, Hz,
+                                     seat_back_start_x, seat_back_end_x,
+                                     seat_bottom_start_x, seat_bottom_start_z,
+                                     seat_bottom_end_x)
+
+    ## Ensure the fork isn't inverted
+    fits &= ~(fork_top_z < frame['fork_bottom_z'])
+
+    ## Ensure the wheels don't overlap
+    fits &= ~(Rf + Rr >= A)
+
+    ## Ensure the leg length is greater than the crank diameter
+    fits &= ~(leg_length <= (2 * Cr))
+
+    ## Ensure the crank isn't inside the front wheel
+    fits &= ~(Rf ** 2 >= Cx ** 2 + (Cz - Rf) ** 2)
+
+    ## Ensure the crank isn't inside the rear wheel
+    fits &= ~(Rr ** 2 >= (A + Cx) ** 2 + (Cz - Rr) ** 2)
+
+    ## Ensure the seat is above the floor plane
+    fits &= ~(Hz <= 0)
+
+    ## Ensure the cranks don't hit the ground
+    fits &= ~(Cz - Cr <= 0)
+
+    ## Compute the Patterson constants, see Bike.compute_patterson_curves.
+    trail = frame['trail']
+    cos_beta = np.cos(beta)
+    k1 = (m_bike * self._g * (m_bike_x / A) * trail * cos_beta) *\
+         (np.sin(beta) - m_bike_z * trail * m_bike_x /\
+          (A * (m_bike_z * m_bike_z + bike_Kxx_squared)))
+    k2 = trail * (cos_beta * cos_beta) * m_bike * (m_bike_x / (A * A)) *\
+         (bike_Kxx_squared / (m_bike_z * m_bike_z + bike_Kxx_squared))
+    k3 = 1 / 1500.0
+    k4 = m_bike_x / (m_bike_z * A) * cos_beta
+
+    ## Compute the control sensitivity curve for every design at once.
+    v = speeds[np.newaxis, :]
+    control_sensitivity = (k4[:, np.newaxis] * v) /\
+                          (Rh[:, np.newaxis] + (k3 / Rh[:, np.newaxis]) *\
+                           (-k1[:, np.newaxis] + k2[:, np.newaxis] * v * v))
+
+    return fits, control_sensitivity
+
+  ## Returns a boolean vector which is False wherever one of the wheels
+  ## intersects the rider's head.
+  def _wheels_clear_riders_head(self, A, Rf, Rr, head_cg_x, head_cg_z,
+                                head_diameter):
+    head_radius = head_diameter / 2
+
+    ## Check if the front wheel intersects the rider's head.
+    sum_of_diffs = (A - head_cg_x) ** 2 + (Rf - head_cg_z) ** 2
+    front_hits = ((Rf - head_radius) ** 2 <= sum_of_diffs) &\
+                 ((Rf + head_radius) ** 2 >= sum_of_diffs)
+
+    ## Check if the rear wheel intersects the rider's head.
+    sum_of_diffs = head_cg_x ** 2 + (Rr - head_cg_z) ** 2
+    rear_hits = ((Rr - head_radius) ** 2 <= sum_of_diffs) &\
+                ((Rr + head_radius) ** 2 >= sum_of_diffs)
+
+    return ~(front_hits | rear_hits)
+
+  ## Returns a boolean vector which is False wherever the wheel centered at
+  ## (wheel_x, wheel_radius) intersects the seat back, the seat bottom, or
+  ## swallows the rider entirely. See Bike._front_wheel_clears_torso and
+  ## Bike._rear_wheel_clears_torso.
+  def _wheel_clears_torso(self, wheel_x, wheel_radius, alpha, theta, Hx, Hz,
+                          seat_back_start_x, seat_back_end_x,
+                          seat_bottom_start_x, seat_bottom_start_z,
+                          seat_bottom_end_x):
+    ## Seat back, then seat bottom. Both start at the seat pivot (Hx, Hz).
+    seat_back_hits = self._seat_line_hits_wheel(wheel_x, wheel_radius,
+                                                np.tan(alpha + theta), Hx, Hz,
+                                                seat_back_start_x,
+                                                seat_back_end_x)
+    seat_bottom_hits = self._seat_line_hits_wheel(wheel_x, wheel_radius,
+                                                  np.tan(theta), Hx, Hz,
+                                                  seat_bottom_start_x,
+                                                  seat_bottom_end_x)
+
+    ## Finally, check to see that the entire rider isn't inside the wheel.
+    rider_inside_wheel = wheel_radius >=\
+      np.sqrt((seat_bottom_start_x - wheel_x) ** 2 +\
+              (seat_bottom_start_z - wheel_radius) ** 2)
+
+    return ~(seat_back_hits | seat_bottom_hits | rider_inside_wheel)
+
+  ## Returns a boolean vector which is True wherever the seat line with the
+  ## given slope, passing through (point_x, point_z), crosses the wheel centered
+  ## at (wheel_x, wheel_radius) between start_x and end_x.
+  def _seat_line_hits_wheel(self, wheel_x, wheel_radius, seat_slope, point_x,
+                            point_z, start_x, end_x):
+    seat_z_intercept = point_z - seat_slope * point_x
+
+    a = seat_slope * seat_slope + 1
+    b = 2 * (seat_z_intercept - wheel_radius) * seat_slope - 2 * wheel_x
+    c = wheel_x * wheel_x + (seat_z_intercept - wheel_radius) *\
+        (seat_z_intercept - wheel_radius) - (wheel_radius * wheel_radius)
+
+    descrim = b * b - 4 * a * c
+    crosses = descrim >= 0
+    descrim = np.sqrt(np.where(crosses, descrim, 0.0))
+
+    x_1 = (-b + descrim) / (2 * a)
+    x_2 = (-b - descrim) / (2 * a)
+
+    hits = ((x_1 <= start_x) & (x_2 >= end_x)) |\
+           ((x_1 >= start_x) & (x_2 <= end_x)) |\
+           ((x_2 <= start_x) & (x_1 >= end_x)) |\
+           ((x_2 >= start_x) & (x_1 <= end_x))
+
+    return crosses & hits
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
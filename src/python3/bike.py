@@ -5,9 +5,10 @@ import copy
 import math
 import matplotlib.pyplot as plt
 import numpy as np
-import random
 import sys
 
+from rider_profile import as_rider_profile
+
 class Bike:
   'Wrapped to hold all of the parameters for defining a bike.'
 
@@ -84,10 +85,14 @@ class Bike:
   ## computes the radius of gyration of the entire system about the bike's wheel
   ## contact patch.
   ##
+  ## The rider is expected to be a RiderProfile (as produced by
+  ## Parser.parse_riders), though a plain rider_params dictionary is accepted as
+  ## well and converted on the fly.
+  ##
   ## Returns False if the rider cannot fit on the bike.
-  def fit_rider(self, rider_params):
+  def fit_rider(self, rider):
     ## Update the internal mapping of the rider's parameters.
-    self._update_rider_params(rider_params)
+    self._update_rider_params(as_rider_profile(rider))
 
     ## Attempt to fit the rider to the bike. This returns True if it succeeds.
     return self._fit_rider_to_bike()
@@ -95,12 +100,16 @@ class Bike:
   ## Generates a random bike from the input bike_params. Additionally, populates
   ## indexed_bike_params with the param -> array of indices of params that were
   ## chosen to create this random bike and returns a deepcopy of that dict to
-  ## the caller.
-  def generate_random_bike(self, bike_params):
+  ## the caller. The rng is the NumPy random Generator to draw the params from
+  ## (a fresh, unseeded one if it's None).
+  def generate_random_bike(self, bike_params, rng=None):
+    if rng is None:
+      rng = np.random.default_rng()
+
     self._single_bike_params = {}
     indexed_bike_params = {}
     for key, value_list in bike_params.items():
-      index = random.randint(0, len(value_list) - 1)
+      index = int(rng.integers(0, len(value_list)))
       indexed_bike_params[key] = index
       self._single_bike_params[key] = value_list[index]
 
@@ -153,6 +162,9 @@ class Bike:
     ## Update the internal mapping of the bike's parameters.
     self._update_bike_params(single_bike_params)
 
+    ## Compute the frame components that every rider shares.
+    self._compute_fixed_frame_components()
+
     ## Clear out previous rider information.
     self._clear_rider_params()
 
@@ -180,6 +192,9 @@ class Bike:
     ## Update the internal mapping of the bike's parameters.
     self._update_bike_params(single_bike_params)
 
+    ## Compute the frame components that every rider shares.
+    self._compute_fixed_frame_components()
+
     ## Clear out previous rider information.
     self._clear_rider_params()
 
@@ -266,12 +281,8 @@ class Bike:
     self._leg_length     = 0.0
     self._leg_diameter   = 0.0
 
-    ## 95% Male Body Mass Percentages
-    self._body_segment_to_mass_percentage = {}
-    self._body_segment_to_mass_percentage['arm']   = 0.06
-    self._body_segment_to_mass_percentage['head']  = 0.07
-    self._body_segment_to_mass_percentage['leg']   = 0.170
-    self._body_segment_to_mass_percentage['torso'] = 0.47
+    ## The RiderProfile holding the rider's precomputed masses and inertias.
+    self._rider_profile  = None
 
     ## Total rider inertia relative to the rider's CG about the X axis
     self._rider_Ixx  = 0.0
@@ -361,50 +372,23 @@ class Bike:
                     (self._arm_length / 2) + self._arm_start_z
 
   def _compute_arm_inertia_about_global_x_axis(self):
-    ## Compute the local inertia values in the x,y,z directions. Note that we
-    ## are idealizing the leg as a cylinder of constant diameter (which is where
-    ## the below equations come from).
-    arm_local_Ixx = (1 / 4.0) * self._m_arm *\
-                    ((self._arm_diameter / 2) ** 2) +\
-                     (1 / 12.0) * self._m_arm * (self._arm_length ** 2)
-    arm_local_Iyy = (1 / 4.0) * self._m_arm *\
-                    ((self._arm_diameter / 2) ** 2) +\
-                     (1 / 12.0) * self._m_arm * (self._arm_length ** 2)
-    arm_local_Izz = (1 / 2.0) * self._m_arm * ((self._arm_diameter / 2) ** 2)
-
-    ## Compute local torso inertia tensor.
-    arm_local_inertia_tensor =\
-                    np.matrix([[arm_local_Ixx,       0,              0      ],
-                              [      0,        arm_local_Iyy,        0      ],
-                              [      0,              0,        arm_local_Izz]])
-
-    ## Define the global coordinate system for reference.
-    global_ref = np.matrix([[1, 0, 0],
-                            [0, 1, 0],
-                            [0, 0, 1]])
-
-    ## Create rotation matrix to dot with the global reference to create the
-    ## final rotation matrix which will take our local inertia tensor and rotate
-    ## it to align with the global coordinate system.
-    local_arm_ref = np.matrix([[math.sin(self._zeta), 0, math.cos(self._zeta)],
-                               [         0,          1,          0         ],
-                               [math.cos(self._zeta), 0, math.sin(self._zeta)]])
-
-    ## Compute final inertia rotation matrix to rotate the local inertia tensor
-    ## to align with the global coordinate system.
-    arm_rotation_matrix = global_ref * (local_arm_ref.transpose())
-
-    ## Rotate local inertia tensor to align with the global coordinate system.
-    arm_rotated_inertia_tensor = arm_rotation_matrix *\
-                                 arm_local_inertia_tensor *\
-                                 (arm_rotation_matrix.transpose())
-
-    ## Use parallel axis theorum to shift the rotated torso tensor to be about
-    ## the global x-axis. Note that we are grabbing the 0th item in the tensor
-    ## because we only care about Ixx.
-    self._arm_Ixx = arm_rotated_inertia_tensor.item(0) +\
-                   self._m_arm * ((((self._torso_width / 2) +\
-                                   (self._arm_diameter / 2)) ** 2) +\
+    ## Grab the local inertia values, which were precomputed in the rider's
+    ## profile. Note that we are idealizing the arm as a cylinder of constant
+    ## diameter.
+    arm_local_Ixx = self._rider_profile.arm_local_Ixx
+    arm_local_Izz = self._rider_profile.arm_local_Izz
+
+    ## Rotate the local inertia tensor to align with the global coordinate
+    ## system. The arm's local reference frame is rotated about the y-axis by
+    ## zeta, with its first column being [sin(zeta), 0, cos(zeta)].
+    arm_rotated_Ixx = self._compute_rotated_Ixx(math.sin(self._zeta),
+                                                math.cos(self._zeta),
+                                                arm_local_Ixx, arm_local_Izz)
+
+    ## Use parallel axis theorum to shift the rotated Ixx to be about the
+    ## global x-axis.
+    self._arm_Ixx = arm_rotated_Ixx +\
+                   self._m_arm * (self._rider_profile.arm_lateral_offset +\
                                  (self._arm_cg_z ** 2))
 
     ## Radius of gyration about the wheel contact patch. Note that we don't
@@ -543,14 +527,22 @@ class Bike:
                               (self._fork_top_z - self._fork_bottom_z) *\
                               (self._fork_top_z - self._fork_bottom_z))
     
+  ## Computes the locations of the frame components which depend on where the
+  ## rider's seat ends up (the seat stays, top tube and seat), which have to be
+  ## recomputed for every rider.
   def _compute_frame_components(self):
-    self._compute_crank()
     self._compute_seat_stays()
+    self._compute_top_tube()
+    self._compute_seat()
+
+  ## Computes the locations of the frame components which only depend on the
+  ## bike's geometry (the crank, chain stays, fork and down tube). These are
+  ## computed once per geometry update and reused for every rider.
+  def _compute_fixed_frame_components(self):
+    self._compute_crank()
     self._compute_chain_stays()
     self._compute_fork()
-    self._compute_top_tube()
     self._compute_down_tube()
-    self._compute_seat()
 
   def _compute_frame_cg(self):
     ## Compute the masses of each tube
@@ -595,9 +587,9 @@ class Bike:
     self._head_cg_z = self._Hz + z_prime
 
   def _compute_head_inertia_about_global_x_axis(self):
-    ## Compute the head's inertia about its own CG. Note that we are idealizing
-    ## the head as a sphere (which is where the below equation is coming from).
-    head_local_Ixx = (2 / 5.0) * self._m_head * ((self._head_diameter / 2) ** 2)
+    ## Grab the head's inertia about its own CG, which was precomputed in the
+    ## rider's profile. Note that we are idealizing the head as a sphere.
+    head_local_Ixx = self._rider_profile.head_local_Ixx
 
     ## Use parallel axis theorum to shift the head's Ixx to be around the
     ## global x-axis.
@@ -629,50 +621,23 @@ class Bike:
     self._leg_cg_z = self._leg_start_z - (self._leg_start_z - self._leg_end_z) / 2
 
   def _compute_leg_inertia_about_global_x_axis(self):
-    ## Compute the local inertia values in the x,y,z directions. Note that we
-    ## are idealizing the leg as a cylinder of constant diameter (which is where
-    ## the below equations come from).
-    leg_local_Ixx = (1 / 4.0) * self._m_leg *\
-                    ((self._leg_diameter / 2) ** 2) + (1 / 12.0) * self._m_leg *\
-                    (self._leg_length ** 2)
-    leg_local_Iyy = (1 / 4.0) * self._m_leg *\
-                    ((self._leg_diameter / 2) ** 2) + (1 / 12.0) * self._m_leg *\
-                    (self._leg_length ** 2)
-    leg_local_Izz = (1 / 2.0) * self._m_leg * ((self._leg_diameter / 2) ** 2)
-
-    ## Compute local torso inertia tensor.
-    leg_local_inertia_tensor =\
-                    np.matrix([[leg_local_Ixx,        0,              0      ],
-                               [      0,        leg_local_Iyy,        0      ],
-                               [      0,              0,        leg_local_Izz]])
-
-    ## Define the global coordinate system for reference.
-    global_ref = np.matrix([[1, 0, 0],
-                            [0, 1, 0],
-                            [0, 0, 1]])
-
-    ## Create rotation matrix to dot with the global reference to create the
-    ## final rotation matrix which will take our local inertia tensor and rotate
-    ## it to align with the global coordinate system.
-    local_leg_ref = np.matrix([[-math.sin(self._theta), 0,  math.cos(self._theta)],
-                               [           0,          1,            0         ],
-                               [-math.cos(self._theta), 0, -math.sin(self._theta)]])
-
-    ## Compute final inertia rotation matrix to rotate the local inertia tensor
-    ## to align with the global coordinate system.
-    leg_rotation_matrix = global_ref * (local_leg_ref.transpose())
-
-    ## Rotate local inertia tensor to align with the global coordinate system.
-    leg_rotated_inertia_tensor = leg_rotation_matrix *\
-                                 leg_local_inertia_tensor *\
-                                 (leg_rotation_matrix.transpose())
-
-    ## Use parallel axis theorum to shift the rotated inertia tensor to be about
-    ## the global x-axis. Note that we are grabbing the 0th item in the tensor
-    ## because we only care about Ixx.
-    self._leg_Ixx = leg_rotated_inertia_tensor.item(0) +\
-                   self._m_leg * ((((self._torso_width / 2) -\
-                                   (self._leg_diameter / 2)) ** 2) +\
+    ## Grab the local inertia values, which were precomputed in the rider's
+    ## profile. Note that we are idealizing the leg as a cylinder of constant
+    ## diameter.
+    leg_local_Ixx = self._rider_profile.leg_local_Ixx
+    leg_local_Izz = self._rider_profile.leg_local_Izz
+
+    ## Rotate the local inertia tensor to align with the global coordinate
+    ## system. The leg's local reference frame is rotated about the y-axis by
+    ## theta, with its first column being [-sin(theta), 0, -cos(theta)].
+    leg_rotated_Ixx = self._compute_rotated_Ixx(-math.sin(self._theta),
+                                                -math.cos(self._theta),
+                                                leg_local_Ixx, leg_local_Izz)
+
+    ## Use parallel axis theorum to shift the rotated Ixx to be about the
+    ## global x-axis.
+    self._leg_Ixx = leg_rotated_Ixx +\
+                   self._m_leg * (self._rider_profile.leg_lateral_offset +\
                                  (self._leg_cg_z ** 2))
 
     ## Radius of gyration about the wheel contact patch. Note that we don't
@@ -716,6 +681,20 @@ class Bike:
                 2 * ((self._leg_Kxx ** 2) * (self._m_leg / self._m_rider)) +\
                 2 * ((self._arm_Kxx ** 2) * (self._m_arm / self._m_rider)))
 
+  ## Computes the Ixx term of a body segment's inertia tensor once it has been
+  ## rotated from the segment's local reference frame into the global one. The
+  ## local frames are only ever rotated about the y-axis, so the rotation matrix
+  ## is the transpose of a local reference frame whose first column is
+  ## [local_ref_x, 0, local_ref_z]. With a diagonal local tensor, the Ixx term
+  ## of R * I * R^T is then:
+  ##
+  ##    local_ref_x^2 * local_Ixx + local_ref_z^2 * local_Izz
+  ##
+  ## which avoids building and multiplying the full 3x3 matrices.
+  def _compute_rotated_Ixx(self, local_ref_x, local_ref_z, local_Ixx, local_Izz):
+    return (local_ref_x * local_ref_x) * local_Ixx +\
+           (local_ref_z * local_ref_z) * local_Izz
+
   def _compute_seat(self):
     ## Seat Back
     self._phi = math.pi - self._alpha - self._theta
@@ -757,46 +736,22 @@ class Bike:
                       (self._torso_length / 2) * math.sin(self._phi)
 
   def _compute_torso_inertia_about_global_x_axis(self):
-    ## Compute the local inertia values in the x,y,z directions. Note that we
-    ## are idealizing the torso as a cuboid (which is where the below equations
-    ## come from).
-    torso_local_Ixx = (1 / 12.0) * self._m_torso * ((self._torso_width ** 2) +\
-                                                   (self._torso_length ** 2))
-    torso_local_Iyy = (1 / 12.0) * self._m_torso * ((self._torso_depth ** 2) +\
-                                                   (self._torso_length ** 2))
-    torso_local_Izz = (1 / 12.0) * self._m_torso * ((self._torso_width ** 2) +\
-                                                   (self._torso_depth ** 2))
-    ## Compute local torso inertia tensor.
-    torso_local_inertia_tensor =\
-                np.matrix([[torso_local_Ixx,         0,              0        ],
-                           [       0,         torso_local_Iyy,       0        ],
-                           [       0,                0,        torso_local_Izz]])
-
-    ## Define the global coordinate system for reference.
-    global_ref = np.matrix([[1, 0, 0],
-                            [0, 1, 0],
-                            [0, 0, 1]])
-
-    ## Create rotation matrix to dot with the global reference to create the
-    ## final rotation matrix which will take our local inertia tensor and rotate
-    ## it to align with the global coordinate system.
-    local_torso_ref = np.matrix([[math.sin(self._phi),  0, math.cos(self._phi)],
-                                 [         0,          1,          0        ],
-                                 [-math.cos(self._phi), 0, math.sin(self._phi)]])
-
-    ## Compute final inertia rotation matrix to rotate the local inertia tensor
-    ## to align with the global coordinate system.
-    torso_rotation_matrix = global_ref * (local_torso_ref.transpose())
-
-    ## Rotate local inertia tensor to align with the global coordinate system.
-    torso_rotated_inertia_tensor = torso_rotation_matrix *\
-                                   torso_local_inertia_tensor *\
-                                   (torso_rotation_matrix.transpose())
-
-    ## Use parallel axis theorum to shift the rotated inertia tensor to be about
-    ## the global x-axis. Note that we are grabbing the 0th item in the tensor
-    ## because we only care about Ixx.
-    self._torso_Ixx = torso_rotated_inertia_tensor.item(0) +\
+    ## Grab the local inertia values, which were precomputed in the rider's
+    ## profile. Note that we are idealizing the torso as a cuboid.
+    torso_local_Ixx = self._rider_profile.torso_local_Ixx
+    torso_local_Izz = self._rider_profile.torso_local_Izz
+
+    ## Rotate the local inertia tensor to align with the global coordinate
+    ## system. The torso's local reference frame is rotated about the y-axis by
+    ## phi, with its first column being [sin(phi), 0, -cos(phi)].
+    torso_rotated_Ixx = self._compute_rotated_Ixx(math.sin(self._phi),
+                                                  -math.cos(self._phi),
+                                                  torso_local_Ixx,
+                                                  torso_local_Izz)
+
+    ## Use parallel axis theorum to shift the rotated Ixx to be about the
+    ## global x-axis.
+    self._torso_Ixx = torso_rotated_Ixx +\
                      self._m_torso * (self._torso_cg_z ** 2)
 
     ## Radius of gyration about the wheel contact patch.
@@ -844,7 +799,8 @@ class Bike:
     self._m_bike = self._m_frame + + self._m_rider + self._m_crank +\
                    self._m_front_wheel + self._m_rear_wheel
 
-    ## Compute the locations of all the frame components.
+    ## Compute the locations of the frame components that depend on the seat.
+    ## The rest of the frame was already computed when the geometry was set.
     self._compute_frame_components()
 
     ## Compute all the locations of the rider's components and adjust the
@@ -1329,28 +1285,28 @@ class Bike:
     self._m_front_wheel  = single_bike_params['front_wheel_mass']
     self._m_rear_wheel   = single_bike_params['rear_wheel_mass']
 
-  ## Updates the internal symbols for each of the rider parameters in
-  ## rider_params, and computes the mass of each of the rider's body parts.
-  ## Note that we are assuming that the input dictionary will be
-  ## param_name -> value, and that all the names below will be present and all
-  ## their values will be decimal values.
-  def _update_rider_params(self, rider_params):
+  ## Updates the internal symbols for each of the rider parameters from the
+  ## rider_profile, including the mass of each of the rider's body parts (which
+  ## the profile has already computed).
+  def _update_rider_params(self, rider_profile):
+    self._rider_profile = rider_profile
+
     ## Rider Parameters
-    self._m_rider        = rider_params['rider_mass']
-    self._head_diameter  = rider_params['head_diameter']
-    self._torso_length   = rider_params['torso_length']
-    self._torso_depth    = rider_params['torso_depth']
-    self._torso_width    = rider_params['torso_width']
-    self._arm_length     = rider_params['arm_length']
-    self._arm_diameter   = rider_params['arm_diameter']
-    self._leg_length     = rider_params['leg_length']
-    self._leg_diameter   = rider_params['leg_diameter']
-
-    ## Compute the mass of each of the rider's body segments.
-    self._m_head   = self._m_rider * self._body_segment_to_mass_percentage['head']
-    self._m_torso  = self._m_rider * self._body_segment_to_mass_percentage['torso']
-    self._m_arm    = self._m_rider * self._body_segment_to_mass_percentage['arm']
-    self._m_leg    = self._m_rider * self._body_segment_to_mass_percentage['leg']
+    self._m_rider        = rider_profile.rider_mass
+    self._head_diameter  = rider_profile.head_diameter
+    self._torso_length   = rider_profile.torso_length
+    self._torso_depth    = rider_profile.torso_depth
+    self._torso_width    = rider_profile.torso_width
+    self._arm_length     = rider_profile.arm_length
+    self._arm_diameter   = rider_profile.arm_diameter
+    self._leg_length     = rider_profile.leg_length
+    self._leg_diameter   = rider_profile.leg_diameter
+
+    ## Masses of each of the rider's body segments.
+    self._m_head   = rider_profile.m_head
+    self._m_torso  = rider_profile.m_torso
+    self._m_arm    = rider_profile.m_arm
+    self._m_leg    = rider_profile.m_leg
 
   def plot_control_sensitivity(self, ax, control_sensitivity, formatting,
                                rider_name):
@@ -17,6 +17,15 @@ from bike import Bike
 from config_parser import Parser
 from simulation_params import SimulationParams
 
+## Returns the bikes of a search's output file (already parsed from JSON) as a
+## list of (error, bike_params) pairs. The file is either a list of
+## [error, bike_params] pairs, which keeps bikes with the same error apart, or
+## a mapping of error -> bike_params.
+def read_bike_pairs(bike_data):
+  if isinstance(bike_data, dict):
+    bike_data = bike_data.items()
+  return [(float(error), bike_params) for error, bike_params in bike_data]
+
 class BikeFilePlotter:
   def __init__(self):
     pass
@@ -35,21 +44,17 @@ class BikeFilePlotter:
 
     ## Check that there are bikes to plot, print error and exit if the list is
     ## empty.
-    if not bike_data_strings.items():
+    if not bike_data_strings:
       print('No useable bike designs to plot.')
       return
 
-    ## Convert all string errors into float errors.
-    bike_data = {}
-    for key, value in bike_data_strings.items():
-      bike_data[float(key)] = value 
-
-    ## Sort the list by error.
-    bike_errors = sorted(bike_data.keys())
+    ## Sort the (error, bike_params) pairs by error.
+    bike_data = sorted(read_bike_pairs(bike_data_strings),
+                       key=lambda pair: pair[0])
 
     ## For each bike in bikes_to_plot JSON
     counter = 0
-    for error in bike_errors:
+    for error, bike_params in bike_data:
       counter += 1
       color_index = 0
 
@@ -67,9 +72,6 @@ class BikeFilePlotter:
       ## Set overall title for second column.
       curve_axis.set_title('Control Sensitivity')
 
-      ## Get the bike configuration to plot.
-      bike_params = bike_data[error]
-
       ## Print bike configuration.
       print('\n')
       print('Bike Params:')
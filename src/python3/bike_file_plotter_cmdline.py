@@ -14,6 +14,7 @@ import sys
 import time
 
 from bike import Bike
+from bike_file_plotter import read_bike_pairs
 from config_parser import Parser
 from simulation_params import SimulationParams
 
@@ -23,7 +24,7 @@ class BikeFilePlotter:
 
   def plot(self, simulation_params, bikes_to_plot, output_filename):
     json_data = open(bikes_to_plot).read()
-    bike_data = json.loads(json_data)
+    bike_data = read_bike_pairs(json.loads(json_data))
 
     ## Open a file to save all these plots to.
     pp = PdfPages(output_filename)
@@ -61,12 +62,9 @@ class BikeFilePlotter:
     ## is the average error across all the riders that are fit to the bike.
     bikes_to_plot = {}
 
-    ## Sort the list by error.
-    bike_errors = sorted(bike_data.keys())
-
     ## For each bike in bikes_to_plot JSON
     counter = 0
-    for error in bike_data.keys():
+    for error, bike_params in bike_data:
       counter += 1
       color_index = 0
 
@@ -80,7 +78,6 @@ class BikeFilePlotter:
         bike = Bike()
 
         ## Parse the bike params into a Bike object
-        bike_params = bike_data[error]
         bike.update_geometry(bike_params)
 
         ## Get the formatting color for each rider.
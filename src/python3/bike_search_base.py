@@ -9,7 +9,9 @@ class BikeSearchBase:
     pass
 
   ## Runs a bicycle simulation given the set of simulation parameters,
-  ## copying the top bike's bike_params into the "best_bikes" out parameters.
+  ## appending the top bikes to the "best_bikes" out parameter (a list) as
+  ## (error, bike_params) pairs from the best to the worst, so bikes with the
+  ## same error are all kept.
   def run(self, simulation_params, best_bikes):
     raise NotImplementedError('Run function was not defined by subclass.')
 
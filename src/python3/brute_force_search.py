@@ -1,155 +1,197 @@
 #!/usr/bin/python3
 
-import copy
+import concurrent.futures
+import json
+import numpy as np
 import sys
 import time
 
-from bike import Bike
+from batch_bike_evaluator import BatchBikeEvaluator, BIKE_PARAM_NAMES
 from bike_search_base import BikeSearchBase
+from checkpoint import pop_checkpoint_options
+from command_line_options import pop_option
+from config_bundle import load_config_files, pop_config_bundle_options
 from config_parser import Parser
+from design_space_enumerator import DesignSpaceEnumerator
 from simulation_params import SimulationParams
+from top_k_collector import TopKCollector
 
 class BruteForceSearch(BikeSearchBase):
   'Implements a brute force search to find the optimimal bike design.'
 
-  def __init__(self):
-    pass
-
+  ## The num_workers is the number of worker processes to shard the search
+  ## across. With a single worker the search runs serially in this process. The
+  ## checkpoint is an optional Checkpoint object used to periodically save (and,
+  ## when resuming, restore) the completed ranges and the current best designs.
+  def __init__(self, num_workers=1, checkpoint=None):
+    self._num_workers = max(1, int(num_workers))
+    self._checkpoint = checkpoint
+
+    ## Number of designs scored per batched evaluation.
+    self._chunk_size = 65536
+
+    ## Upper bound on the number of designs in a single range of the search,
+    ## which also sets how often progress is reported.
+    self._max_range_size = 16 * self._chunk_size
+
+  ## Scores every design in the bike_params design space, appending the top
+  ## sample_count designs to the best_bikes out parameter (a list) as
+  ## (error, bike_params) pairs from the best to the worst. The design space is
+  ## enumerated as a mixed-radix number (see DesignSpaceEnumerator) and split
+  ## into contiguous ranges of design numbers, which are searched either in
+  ## this process or across a pool of worker processes. Returns the score of
+  ## the best bike.
   def run(self, simulation_params, best_bikes):
-
-    ## Grab the top speed from the input.
-    top_speed = simulation_params.top_speed
-
-    ## Grab the target control sensitivity curve from the input.
-    target_control_sensitivity = simulation_params.target_control_sensitivity
-
-    ## Read in the bike_params, resulting in a dictionary of {param -> [values]}.
-    bike_params = simulation_params.bike_params
-
-    ## Read in the rider_params, resulting in a list of [{param -> [values]}].
-    riders = simulation_params.riders
-
-    ## Create a Bike object to hold all bike_params in the following iterations.
-    bike = Bike()
-
-    ## Create a Bike object to hold the best bike configuration.
-    best_bike = Bike()
-
-    ## Container to represent the bike parameter set to build and test each bike
-    ## from.
-    current_bike_params = {}
-
-    ## List of the top bike params to print to the output file.
-    best_bike_params = []
-
-    ## Initialize the min_error to be infinity to start.
-    min_error = float('inf')
-
-    ## Lists to hold the control spring and control sensitivity values in the
-    ## following iterations.
-    control_spring = []
-    control_sensitivity = []
-
-    counter = 0
-
+    enumerator = DesignSpaceEnumerator(simulation_params.bike_params,
+                                       BIKE_PARAM_NAMES)
+
+    state = None
+    if self._checkpoint is not None:
+      state = self._checkpoint.load()
+
+    if state is None:
+      ## Size the ranges so each worker gets several of them, which keeps the
+      ## workers busy when some ranges finish faster than others.
+      target_range_count = 4 * self._num_workers
+      range_size = min(self._max_range_size,
+                       -(-enumerator.size // target_range_count))
+
+      ## The completed_ranges holds the start of every range searched so far
+      ## and best_designs holds the best designs found in them, ordered by
+      ## design number on ties so the output does not depend on which worker
+      ## finished first.
+      state = {'size': enumerator.size,
+               'sample_count': simulation_params.sample_count,
+               'range_size': range_size,
+               'completed_ranges': set(),
+               'best_designs': TopKCollector(simulation_params.sample_count),
+               'min_error': float('inf')}
+    elif state['size'] != enumerator.size or\
+         state['sample_count'] != simulation_params.sample_count:
+      raise Exception('The checkpoint does not match this search\'s bike '
+                      'params and sample count.')
+
+    ## Resuming keeps the ranges of the original run (even if the number of
+    ## workers changed) and skips the ones which were already searched.
+    ranges = enumerator.split(state['range_size'])
+    remaining_ranges = [(start, stop) for start, stop in ranges
+                        if start not in state['completed_ranges']]
+    print('Searching ' + str(enumerator.size) + ' designs in ' +
+          str(len(ranges)) + ' ranges across ' + str(self._num_workers) +
+          ' workers')
+
+    best_designs = state['best_designs']
     start_time = time.time()
-    checkpoint = start_time
-    for wheelbase in bike_params['wheelbase']:
-     current_bike_params['wheelbase'] = wheelbase
-     for hip_angle in bike_params['hip_angle']:
-      current_bike_params['hip_angle'] = hip_angle
-      for headtube_angle in bike_params['headtube_angle']:
-       current_bike_params['headtube_angle'] = headtube_angle
-       for crank_radius in bike_params['crank_radius']:
-        current_bike_params['crank_radius'] = crank_radius
-        for crank_x_offset in bike_params['crank_x_offset']:
-         current_bike_params['crank_x_offset'] = crank_x_offset
-         for crank_z_offset in bike_params['crank_z_offset']:
-          current_bike_params['crank_z_offset'] = crank_z_offset
-          for fork_offset in bike_params['fork_offset']:
-           current_bike_params['fork_offset'] = fork_offset
-           for seat_height in bike_params['seat_height']:
-            current_bike_params['seat_height'] = seat_height
-            for handlebar_radius in bike_params['handlebar_radius']:
-             current_bike_params['handlebar_radius'] = handlebar_radius
-             for front_wheel_radius in bike_params['front_wheel_radius']:
-              current_bike_params['front_wheel_radius'] = front_wheel_radius
-              for rear_wheel_radius in bike_params['rear_wheel_radius']:
-               current_bike_params['rear_wheel_radius'] = rear_wheel_radius
-               for frame_mass in bike_params['frame_mass']:
-                current_bike_params['frame_mass'] = frame_mass
-                for crank_mass in bike_params['crank_mass']:
-                 current_bike_params['crank_mass'] = crank_mass
-                 for front_wheel_mass in bike_params['front_wheel_mass']:
-                  current_bike_params['front_wheel_mass'] = front_wheel_mass
-                  for rear_wheel_mass in bike_params['rear_wheel_mass']:
-                   current_bike_params['rear_wheel_mass'] = rear_wheel_mass
-
-                   ## For Debugging.
-                   counter += 1
-                   if counter % 10000 == 0:
-                     print(str(counter) + ' - min_error: ' + str(min_error) +\
-                           ' - current runtime: ' +\
-                            str(checkpoint - start_time) + ' sec')
-                     checkpoint = time.time()
-
-                   ## Update the current bike with the current geometry.
-                   bike.update_geometry(current_bike_params)
-
-                   rider_didnt_fit = False
-                   error = 0.0
-
-                   ## Try and fit each rider in the bike and sum the errors.
-                   for rider in riders:
-                     if bike.fit_rider(rider):
-                       bike.compute_patterson_curves(control_spring,\
-                                                     control_sensitivity, top_speed)
-                       error +=\
-                         bike.compute_sum_of_diff_of_squares(control_sensitivity,\
-                                                            target_control_sensitivity)
-                     else:
-                       rider_didnt_fit = True
-                       break
-
-                   ## If a rider doesn't fit, abandon this design.
-                   if rider_didnt_fit:
-                     continue
-
-                   ## If this is a better design than any previous design,
-                   ## record it.
-                   if error < min_error:
-                     min_error = error
-                     current_bike_params['error'] = error
-                     if len(best_bike_params) >= simulation_params.sample_count:
-                       ## Remove the param configuration with the worst error.
-                       best_bike_params = best_bike_params[:-1]
-
-                     ## Add new param configuration to the front of the list.
-                     best_bike_params = [copy.deepcopy(current_bike_params)] + best_bike_params
-
-                     #bike.plot()
-                     best_bike.update_geometry(current_bike_params)
-
-    ## Prints the best bike.
-    best_bike.fit_rider(riders[0])
-    best_bike.compute_patterson_curves(control_spring, control_sensitivity, top_speed)
-    best_bike.plot()
-
-    ## Copy the final list of bike params into the caller's out dictionary, with
-    ## a mapping of each bike_param's error -> bike_param.
-    for bike_params in best_bike_params:
-      error = bike_params['error']
-      best_bikes[error] = bike_params
+    for start, range_errors, range_numbers, range_designs in\
+        self._search_ranges(simulation_params, remaining_ranges):
+      for error, design_number, design in zip(range_errors, range_numbers,
+                                              range_designs):
+        best_designs.offer(error, design, design_number)
+        state['min_error'] = min(state['min_error'], error)
+
+      state['completed_ranges'].add(start)
+      if self._checkpoint is not None:
+        self._checkpoint.save_if_due(state)
+
+      print(str(len(state['completed_ranges'])) + '/' + str(len(ranges)) +
+            ' ranges - min_error: ' + str(state['min_error']) +
+            ' - current runtime: ' + str(time.time() - start_time) + ' sec')
+
+    ## The search finished, so there is nothing left to resume.
+    if self._checkpoint is not None:
+      self._checkpoint.clear()
+
+    for error, design_number, design in best_designs.items():
+      single_bike_params = dict(zip(BIKE_PARAM_NAMES, design))
+      single_bike_params['error'] = error
+      best_bikes.append((error, single_bike_params))
 
     ## Return the score of the best bike.
-    return error
+    return state['min_error']
+
+  ## Searches each of the (start, stop) ranges of design numbers, yielding the
+  ## start of each range along with the result of _search_range for it as the
+  ## range completes.
+  def _search_ranges(self, simulation_params, ranges):
+    search_args = (simulation_params.bike_params,
+                   simulation_params.riders,
+                   simulation_params.target_control_sensitivity,
+                   simulation_params.top_speed,
+                   simulation_params.sample_count)
+
+    if self._num_workers == 1:
+      for start, stop in ranges:
+        yield (start,) + _search_range(*(search_args +
+                                         (start, stop, self._chunk_size)))
+      return
+
+    with concurrent.futures.ProcessPoolExecutor(self._num_workers) as executor:
+      futures = {}
+      for start, stop in ranges:
+        future = executor.submit(_search_range,
+                                 *(search_args + (start, stop, self._chunk_size)))
+        futures[future] = start
+      for future in concurrent.futures.as_completed(futures):
+        yield (futures[future],) + future.result()
+
+## Scores every design numbered [start, stop) in the bike_params design space,
+## returning a tuple of (errors, design_numbers, designs) for the range's top
+## sample_count designs, where errors is a sorted list of errors and designs is
+## a list of the matching lists of bike_param values (in BIKE_PARAM_NAMES
+## order). The range is scored chunk_size designs at a time. This runs inside
+## the worker processes when searching in parallel.
+def _search_range(bike_params, riders, target_control_sensitivity, top_speed,
+                  sample_count, start, stop, chunk_size):
+  evaluator = BatchBikeEvaluator()
+  enumerator = DesignSpaceEnumerator(bike_params, BIKE_PARAM_NAMES)
+  best_designs = TopKCollector(sample_count)
+
+  for chunk_start, designs in enumerator.design_chunks(start, stop, chunk_size):
+    errors = evaluator.compute_errors(designs, riders,
+                                      target_control_sensitivity, top_speed)
+
+    ## Only offer the designs which beat the worst design kept so far (which
+    ## also drops the designs where a rider did not fit). If there are more of
+    ## those than can be kept, narrow them down to the chunk's sample_count
+    ## best, keeping every design tied with the last one so ties are still
+    ## broken by design number.
+    candidates = np.flatnonzero(errors < best_designs.worst_error())
+    if len(candidates) > sample_count > 0:
+      cutoff = np.partition(errors[candidates], sample_count - 1)[sample_count - 1]
+      candidates = candidates[errors[candidates] <= cutoff]
+
+    for candidate in candidates:
+      best_designs.offer(float(errors[candidate]), designs[candidate].tolist(),
+                         chunk_start + int(candidate))
+
+  errors = []
+  design_numbers = []
+  designs = []
+  for error, design_number, design in best_designs.items():
+    errors.append(error)
+    design_numbers.append(design_number)
+    designs.append(design)
+
+  return errors, design_numbers, designs
 
 ## Prints the usage string to stdout.
 def print_usage():
     print('Improper arguments!\n'
-          'Run as python3 brute_force_search.py <output_filename>'
-          ' <sample_count> <target_control_sensitivity> <bike_params.txt>'
-          ' <rider_params>+\n'
+          'Run as python3 brute_force_search.py [--workers <num_workers>]'
+          ' [--resume] [--checkpoint <checkpoint_filename>]'
+          ' [--checkpoint-interval <seconds>]'
+          ' [--config-bundle <bundle_filename>] [--no-config-bundle]'
+          ' <output_filename> <sample_count> <target_control_sensitivity>'
+          ' <bike_params.txt> <rider_params>+\n'
+          '|  num_workers = the number of processes to search with (default 1)\n'
+          '|  --resume = resume from the checkpoint left by an interrupted run\n'
+          '|  checkpoint_filename = the checkpoint file (default '
+                                   '<output_filename>.checkpoint)\n'
+          '|  seconds = the time between checkpoints (default 300)\n'
+          '|  bundle_filename = the file to keep the parsed config files in, '
+                               'reused while they are unchanged (default one '
+                               'per set of config files in the user cache directory)\n'
+          '|  --no-config-bundle = always parse the config files\n'
           '|  output_filename = the file to write the results to\n'
           '|  sample_count = the number optimum bike samples to output\n'
           '|  target_control_sensitivity = a sensitivity curve that this model'
@@ -157,48 +199,66 @@ def print_usage():
           '|  bike_params.txt = a file containing all the bike params\n'
           '|  rider_params.txt = one or more files containing rider params\n')
 
-def parse_inputs(command_line_args):
-  ## Create a SimulationParams object to hold all the parsed input data.
-  simulation_params = SimulationParams()
+## The build_config_bundle is an optional function from
+## pop_config_bundle_options, which lets the parsed config files be loaded from
+## a bundle saved by an earlier launch.
+def parse_inputs(command_line_args, build_config_bundle=None):
+  ## Grab the output filename.
+  output_filename = command_line_args[1]
 
-  ## Create a Parser to parse the input files.
-  parser = Parser()
+  ## Parses the config files into a new SimulationParams.
+  def parse_config_files():
+    ## Create a SimulationParams object to hold all the parsed input data.
+    simulation_params = SimulationParams()
 
-  ## Grab the output filename.
-  output_filename = sys.argv[1]
+    ## Create a Parser to parse the input files.
+    parser = Parser()
 
-  ## Grab the sample count from the input.
-  simulation_params.sample_count = int(sys.argv[2])
+    ## Grab the target control sensitivity curve from the input.
+    parser.parse_curve_file(simulation_params.target_control_sensitivity,
+                            command_line_args[3]) 
+
+    ## Read in the bike_params, resulting in a dictionary of {param -> [values]}.
+    parser.parse_bike(simulation_params.bike_params, command_line_args[4])
 
-  ## Grab the target control sensitivity curve from the input.
-  parser.parse_curve_file(simulation_params.target_control_sensitivity,
-                          sys.argv[3]) 
+    ## Read in the rider_params, resulting in a list of [{param -> [values]}].
+    parser.parse_riders(simulation_params.riders, command_line_args[5])
 
-  ## Read in the bike_params, resulting in a dictionary of {param -> [values]}.
-  parser.parse_bike(simulation_params.bike_params, sys.argv[4])
+    ## Compute the top speed.
+    simulation_params.top_speed = len(simulation_params.target_control_sensitivity)
+    return simulation_params
 
-  ## Read in the rider_params, resulting in a list of [{param -> [values]}].
-  parser.parse_riders(simulation_params.riders, sys.argv[5])
+  ## Load the parsed config files from the bundle if they haven't changed.
+  simulation_params = load_config_files(build_config_bundle, 'brute_force_search',
+                                        command_line_args[3:6],
+                                        parse_config_files)
 
-  ## Compute the top speed.
-  simulation_params.top_speed = len(simulation_params.target_control_sensitivity)
+  ## Grab the sample count from the input.
+  simulation_params.sample_count = int(command_line_args[2])
 
-  return simulation_params
+  return simulation_params, output_filename
 
 def main():
-  if len(sys.argv) < 6:
+  ## Pull the optional arguments out before parsing the positional ones.
+  command_line_args = list(sys.argv)
+  num_workers = int(pop_option(command_line_args, '--workers', 1))
+  build_checkpoint = pop_checkpoint_options(command_line_args)
+  build_config_bundle = pop_config_bundle_options(command_line_args)
+
+  if len(command_line_args) < 6:
     print_usage()
     return
 
   ## Parse all the inputs.
-  simulation_params = parse_inputs(sys.argv)
+  simulation_params, output_filename = parse_inputs(command_line_args,
+                                                    build_config_bundle)
 
   ## Create a BruteForceSearch object to run the simulation with.
-  simulation = BruteForceSearch()
+  simulation = BruteForceSearch(num_workers, build_checkpoint(output_filename))
 
-  ## A dictionary of error -> bike_params to be populated with the best bikes
+  ## A list of (error, bike_params) pairs to be populated with the best bikes
   ## from the simulation.
-  best_bikes = {}
+  best_bikes = []
 
   ## Run the simulation
   start = time.time()
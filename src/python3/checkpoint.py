@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+
+import os
+import pickle
+import time
+
+from command_line_options import pop_flag, pop_option
+
+class Checkpoint:
+  'Periodically saves the state of a long running search to disk, so that a \
+   run which crashes or is preempted can be resumed from where it left off \
+   rather than from the beginning.'
+
+  ## The filename is where the checkpoint is kept, interval is the minimum
+  ## number of seconds between saves, and resume specifies if an existing
+  ## checkpoint file should be loaded (rather than ignored and overwritten).
+  def __init__(self, filename, interval=300.0, resume=False):
+    self._filename = filename
+    self._interval = float(interval)
+    self._resume = resume
+    self._last_save = time.time()
+
+  @property
+  def filename(self):
+    return self._filename
+
+  ## Returns True if at least interval seconds have passed since the last save.
+  def due(self):
+    return time.time() - self._last_save >= self._interval
+
+  ## Returns the saved search state, or None if the search should start from
+  ## scratch (either because resuming wasn't requested or because there is no
+  ## checkpoint to resume from).
+  def load(self):
+    if not self._resume:
+      return None
+
+    if not os.path.isfile(self._filename):
+      print('No checkpoint found at ' + self._filename + ', starting from scratch.')
+      return None
+
+    with open(self._filename, 'rb') as checkpoint_file:
+      state = pickle.load(checkpoint_file)
+
+    print('Resuming from checkpoint ' + self._filename)
+    return state
+
+  ## Saves the search state to disk. The state is written to a temporary file
+  ## first and then moved into place, so a crash part way through a save never
+  ## leaves a truncated checkpoint behind.
+  def save(self, state):
+    temp_filename = self._filename + '.tmp'
+    with open(temp_filename, 'wb') as checkpoint_file:
+      pickle.dump(state, checkpoint_file, pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_filename, self._filename)
+    self._last_save = time.time()
+
+  ## Saves the search state to disk if a save is due.
+  def save_if_due(self, state):
+    if self.due():
+      self.save(state)
+
+  ## Removes the checkpoint file, which should be done once the search finishes.
+  def clear(self):
+    if os.path.isfile(self._filename):
+      os.remove(self._filename)
+
+## Pulls the checkpoint options (--resume, --checkpoint <filename> and
+## --checkpoint-interval <seconds>) out of the command_line_args, returning a
+## function which builds the Checkpoint once the output_filename is known. The
+## checkpoint file defaults to '<output_filename>.checkpoint'.
+def pop_checkpoint_options(command_line_args):
+  resume = pop_flag(command_line_args, '--resume')
+  filename = pop_option(command_line_args, '--checkpoint')
+  interval = float(pop_option(command_line_args, '--checkpoint-interval', 300))
+
+  def build_checkpoint(output_filename):
+    checkpoint_filename = filename
+    if checkpoint_filename is None:
+      checkpoint_filename = output_filename + '.checkpoint'
+    return Checkpoint(checkpoint_filename, interval, resume)
+
+  return build_checkpoint
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
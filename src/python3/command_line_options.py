@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+
+## Helpers for the optional '--name value' and '--name' arguments accepted by
+## the command line entry points. Each helper removes the option from the
+## command_line_args list it is given, so that the remaining positional
+## arguments can be parsed exactly as before.
+
+## Removes '--name value' from command_line_args, returning the value (as a
+## string), or default if the option was not supplied.
+def pop_option(command_line_args, name, default=None):
+  if name not in command_line_args:
+    return default
+
+  index = command_line_args.index(name)
+  if index + 1 >= len(command_line_args):
+    raise Exception('Missing value for the ' + name + ' option.')
+
+  value = command_line_args[index + 1]
+  del command_line_args[index:index + 2]
+  return value
+
+## Removes the '--name' flag from command_line_args, returning True if it was
+## supplied.
+def pop_flag(command_line_args, name):
+  if name not in command_line_args:
+    return False
+
+  command_line_args.remove(name)
+  return True
+
+## Removes '--seed value' from command_line_args, returning the seed as an int,
+## or None if no seed was supplied.
+def pop_seed(command_line_args):
+  seed = pop_option(command_line_args, '--seed')
+  if seed is None:
+    return None
+  return int(seed)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+
+import hashlib
+import hmac
+import os
+import pickle
+import stat
+import sys
+
+from command_line_options import pop_flag, pop_option
+
+class ConfigBundle:
+  'A SimulationParams parsed from a set of config files, saved to disk so \
+   later launches with the same files can load it instead of parsing them \
+   again. The bundle records the modification time, size and hash of every \
+   config file (and of the parsing code), and is only loaded while they all \
+   still match. A file whose modification time changed but whose contents \
+   did not still matches. Bundles are signed with a key kept in the private \
+   cache directory of the user, and a bundle whose signature does not match \
+   is never unpickled.'
+
+  ## The filename is where the bundle is kept, and source_filenames are the
+  ## config files the SimulationParams is parsed from.
+  def __init__(self, filename, source_filenames):
+    self._filename = filename
+    self._source_filenames = [os.path.abspath(source_filename)
+                              for source_filename in source_filenames]
+    self._source_filenames.extend(_parsing_code_filenames())
+
+  @property
+  def filename(self):
+    return self._filename
+
+  ## Returns the saved SimulationParams, or None if there is no bundle or any
+  ## of its config files has changed since it was saved.
+  def load(self):
+    try:
+      with open(self._filename, 'rb') as bundle_file:
+        contents = bundle_file.read()
+      signature = contents[:hashlib.sha256().digest_size]
+      payload = contents[hashlib.sha256().digest_size:]
+      if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+      bundle = pickle.loads(payload)
+    except Exception:
+      return None
+
+    if [source['filename'] for source in bundle['sources']] != self._source_filenames:
+      return None
+
+    ## Check the cheap stats first, only hashing the files which were touched.
+    touched = False
+    for source in bundle['sources']:
+      try:
+        stats = os.stat(source['filename'])
+      except OSError:
+        return None
+
+      if stats.st_mtime_ns == source['mtime'] and stats.st_size == source['size']:
+        continue
+      if _hash_file(source['filename']) != source['hash']:
+        return None
+      touched = True
+
+    ## Record the new modification times so the next load takes the cheap path.
+    ## A bundle which can't be rewritten just takes the slow path again.
+    if touched:
+      try:
+        self.save(bundle['simulation_params'])
+      except OSError as e:
+        print('Could not update the config bundle ' + self._filename + ': ' + str(e))
+
+    return bundle['simulation_params']
+
+  ## Saves the simulation_params to disk along with the state of the config
+  ## files. The bundle is written to a temporary file first and then moved into
+  ## place, so jobs launched side by side never load a half written bundle.
+  def save(self, simulation_params):
+    sources = []
+    for source_filename in self._source_filenames:
+      stats = os.stat(source_filename)
+      sources.append({'filename': source_filename, 'mtime': stats.st_mtime_ns,
+                      'size': stats.st_size, 'hash': _hash_file(source_filename)})
+
+    directory = os.path.dirname(os.path.abspath(self._filename))
+    os.makedirs(directory, exist_ok=True)
+
+    payload = pickle.dumps({'sources': sources,
+                            'simulation_params': simulation_params},
+                           pickle.HIGHEST_PROTOCOL)
+    signature = _sign(payload)
+
+    temp_filename = self._filename + '.' + str(os.getpid()) + '.tmp'
+    with open(temp_filename, 'wb') as bundle_file:
+      bundle_file.write(signature)
+      bundle_file.write(payload)
+    os.replace(temp_filename, self._filename)
+
+  ## Returns the SimulationParams, loaded from the bundle if it's fresh, or else
+  ## built by calling parse (which parses the config files) and saved to the
+  ## bundle for the next launch.
+  def load_or_parse(self, parse):
+    simulation_params = self.load()
+    if simulation_params is None:
+      simulation_params = parse()
+
+      ## A bundle which can't be written only costs the next launch a parse.
+      try:
+        self.save(simulation_params)
+      except OSError as e:
+        print('Could not save the config bundle ' + self._filename + ': ' + str(e))
+    return simulation_params
+
+## Returns the directory bundles are kept in by default, and which holds the
+## key they are signed with. It is created readable by the user alone, and is
+## refused (raising an OSError) if it belongs to someone else or is open to
+## other users.
+def _user_cache_directory():
+  cache_home = os.environ.get('XDG_CACHE_HOME') or \
+               os.path.join(os.path.expanduser('~'), '.cache')
+  directory = os.path.join(cache_home, 'bike_config_bundles')
+  os.makedirs(directory, mode=0o700, exist_ok=True)
+  _check_private(directory, stat.S_ISDIR)
+  return directory
+
+## Raises an OSError unless the path is of the expected kind (is_kind is one of
+## the stat.S_IS* checks), is owned by the user and can't be read or written by
+## anyone else.
+def _check_private(path, is_kind):
+  stats = os.lstat(path)
+  if not is_kind(stats.st_mode):
+    raise OSError(path + ' is not the expected kind of file')
+  if hasattr(os, 'getuid') and stats.st_uid != os.getuid():
+    raise OSError(path + ' is not owned by the current user')
+  if stats.st_mode & 0o077:
+    raise OSError(path + ' can be accessed by other users')
+
+## Returns the key bundles are signed with, creating it the first time.
+def _bundle_key():
+  key_filename = os.path.join(_user_cache_directory(), 'bundle.key')
+  try:
+    key_fd = os.open(key_filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+  except FileExistsError:
+    pass
+  else:
+    with os.fdopen(key_fd, 'wb') as key_file:
+      key_file.write(os.urandom(32))
+
+  _check_private(key_filename, stat.S_ISREG)
+  with open(key_filename, 'rb') as key_file:
+    key = key_file.read()
+  if len(key) != 32:
+    raise OSError(key_filename + ' is not a bundle key')
+  return key
+
+## Returns the signature of a bundle's pickled payload.
+def _sign(payload):
+  return hmac.new(_bundle_key(), payload, hashlib.sha256).digest()
+
+## Returns the sha256 hex digest of the contents of the file.
+def _hash_file(filename):
+  digest = hashlib.sha256()
+  with open(filename, 'rb') as source_file:
+    for block in iter(lambda: source_file.read(1 << 20), b''):
+      digest.update(block)
+  return digest.hexdigest()
+
+## Returns the files of the code which parses the config files, so a bundle
+## saved by an older parser isn't loaded by a newer one.
+def _parsing_code_filenames():
+  filenames = []
+  for module_name in ['config_parser', 'rider_profile', 'simulation_params']:
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(module, '__file__', None):
+      filenames.append(os.path.abspath(module.__file__))
+  return filenames
+
+## Returns the SimulationParams of an entry point (named by kind) parsed from
+## the source_filenames, loaded from the bundle made by build_config_bundle
+## (see pop_config_bundle_options) when there is a fresh one, and otherwise
+## built by calling parse. The files are always parsed if build_config_bundle
+## is None.
+def load_config_files(build_config_bundle, kind, source_filenames, parse):
+  if build_config_bundle is None:
+    return parse()
+
+  config_bundle = build_config_bundle(kind, source_filenames)
+  if config_bundle is None:
+    return parse()
+  return config_bundle.load_or_parse(parse)
+
+## Pulls the config bundle options (--config-bundle <filename> and
+## --no-config-bundle) out of the command_line_args, returning a function which
+## builds the ConfigBundle for an entry point (named by kind) and its config
+## files, or returns None if bundles were turned off. The bundle file defaults
+## to one per kind and set of config files in the user's cache directory.
+def pop_config_bundle_options(command_line_args):
+  disabled = pop_flag(command_line_args, '--no-config-bundle')
+  filename = pop_option(command_line_args, '--config-bundle')
+
+  def build_config_bundle(kind, source_filenames):
+    if disabled:
+      return None
+
+    bundle_filename = filename
+    if bundle_filename is None:
+      key = '\n'.join([kind] + [os.path.abspath(source_filename)
+                                for source_filename in source_filenames])
+      try:
+        directory = _user_cache_directory()
+      except OSError as e:
+        print('Not using a config bundle: ' + str(e))
+        return None
+      bundle_filename = os.path.join(directory, kind + '_' +
+                                     hashlib.sha256(key.encode()).hexdigest()[:16] +
+                                     '.bundle')
+    return ConfigBundle(bundle_filename, source_filenames)
+
+  return build_config_bundle
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -2,9 +2,12 @@
 #!/usr/bin/python3
 
 import copy
+import numpy as np
 import re
 import sys
 
+from rider_profile import RiderProfile
+
 class Parser:
   'Class to parse input strings for the bike plotter. See the description of\
   the parse function for more details.'
@@ -107,6 +110,7 @@ class Parser:
         print('\'' + param_line.strip() + '\'')
         return False
 
+      self._print_design_space(dictionary, input_file)
       return True
 
   ## Parses the contents of the input_file as if it contained only decimal
@@ -164,6 +168,11 @@ class Parser:
   ##
   ##    parameter = [x, y, z]
   ##
+  ## A parameter can also be set to a single word (such as the name of an
+  ## option), which will also be put inside a list (with length 1):
+  ##
+  ##    parameter = word    -->    parameter = ['word']
+  ##
   ## If this function is called on an improperly formated input_file it will
   ## return False to signify that the parse was unsuccessful.
   def parse_genetic_algorithm_config_file(self, dictionary, input_file):
@@ -196,6 +205,12 @@ class Parser:
           self._parse_single_decimal_param_line_as_list(dictionary, match)
           continue
 
+        ## Next check if this is a line for a single word param value.
+        match = self.single_string_param.match(param_line)
+        if match:
+          self._parse_single_string_param_line_as_list(dictionary, match)
+          continue
+
         ## If none of the lines matched then it was an improperly formated line
         ## so skip it.
         print('Unable to parse improperly formatted line in input file <'
@@ -203,6 +218,7 @@ class Parser:
         print('\'' + param_line.strip() + '\'')
         return False
 
+      self._print_design_space(dictionary, input_file)
       return True
 
   ## Opens the input_file and creates a mapping of the contents to their values
@@ -210,16 +226,17 @@ class Parser:
   ## follows:
   ##
   ##    parameter = # 
+  ##    parameter = word
   ##    parameter = [x, y, z]
   ##
-  ## The first case defines a single value for the given parameter. The value
-  ## in the dictionary for this measurement will be:
+  ## The first two cases define a single value for the given parameter. The
+  ## value in the dictionary for this measurement will be:
   ##
   ##    parameter = [#]
   ##
   ## Where the value is inside a list (with length 1).
   ##
-  ## The second case defines a set of values the user wants to specify for a
+  ## The last case defines a set of values the user wants to specify for a
   ## given parameter. The values in the dictionary will be this list.
   ##
   ##    parameter = [x, y, z]
@@ -246,6 +263,12 @@ class Parser:
           self._parse_single_decimal_param_line_as_list(dictionary, match)
           continue
 
+        ## Next check if this is a line for a single string param value.
+        match = self.single_string_param.match(param_line)
+        if match:
+          self._parse_single_string_param_line_as_list(dictionary, match)
+          continue
+
         ## If none of the lines matched then it was an improperly formated line
         ## so skip it.
         print('Unable to parse improperly formatted line in input file <'
@@ -266,9 +289,11 @@ class Parser:
   ##
   ##    'measurement' --> value
   ##
-  ## The resulting dictionary will be appended to the riders_list. If this
-  ## function is called on an improperly formated input_file it will return
-  ## False to signify that the parse was unsuccessful.
+  ## Each rider's resulting dictionary is wrapped in a RiderProfile (which
+  ## precomputes the rider's body segment masses and inertias) and appended to
+  ## the riders_list. If this function is called on an improperly formated
+  ## input_file it will return False to signify that the parse was
+  ## unsuccessful.
   def parse_riders(self, riders_list, input_file):
     with open(input_file, 'r') as params_file:
       rider_params = {}
@@ -304,7 +329,7 @@ class Parser:
           ## rider_config block, then append the previous rider_params to the
           ## riders_list.
           if self._is_new_rider_config(match) and rider_params:
-            riders_list.append(copy.deepcopy(rider_params))
+            riders_list.append(RiderProfile(rider_params))
             rider_params.clear()
 
           ## Parse the param_line
@@ -318,7 +343,7 @@ class Parser:
         print('\'' + param_line.strip() + '\'')
         return False
 
-      riders_list.append(copy.deepcopy(rider_params))
+      riders_list.append(RiderProfile(rider_params))
       return True
 
   def print_params_to_file(self, params, output_file):
@@ -352,6 +377,11 @@ class Parser:
   def _parse_single_string_param_line(self, dictionary, match):
     dictionary[match.group(1)] = match.group(2)
 
+  ## Populates the dictionary with the single param matching supplied by 'match'
+  ## as a list of values.
+  def _parse_single_string_param_line_as_list(self, dictionary, match):
+    dictionary[match.group(1)] = [match.group(2)]
+
   ## Populates the dictionaty with the range of inputs supplied by match.
   def _parse_range_param_line(self, dictionary, match):
     param = match.group(1)
@@ -366,29 +396,36 @@ class Parser:
     if abs(end - (start + step)) >= abs(end - start):
       return False
 
-    param_range = []
-
-    param_range.append(start)
-
-    value = start + step
-    old_difference = abs(end - start)
-    new_difference = abs(end - value)
-
-    while old_difference > new_difference:
-      ## Don't overshoot the end of the range.
-      if value >= end and step > 0 or value <= end and step < 0:
-        param_range.append(end)
-        break
-
-      param_range.append(value)
-
-      value = value + step
-      old_difference = new_difference
-      new_difference = abs(end - value)
-
-    dictionary[param] = copy.deepcopy(param_range)
+    ## Compute each value from its index (start + i * step) rather than by
+    ## adding up steps, so long ranges don't drift. The values are rounded to
+    ## the decimal places written in the range (so 0.1 steps give 0.3, not
+    ## 0.30000000000000004). An end which lands on a step is set exactly, and
+    ## one which falls between steps is only added when it is closer to the
+    ## step past it than to the step before it.
+    decimal_places = max(_decimal_places(match.group(2)),
+                         _decimal_places(match.group(4)))
+    steps = (end - start) / step
+    step_count = int(np.floor(steps + 1e-9))
+    param_range = np.round(start + np.arange(0, step_count + 1, dtype=np.float64) * step,
+                           decimal_places)
+    if abs(steps - step_count) <= 1e-9:
+      param_range[-1] = end
+    elif steps - step_count > 0.5:
+      param_range = np.append(param_range, end)
+
+    dictionary[param] = param_range.tolist()
     return True
 
+  ## Prints the number of values of each param in the dictionary and the size
+  ## of the design space they make up (every combination of their values).
+  def _print_design_space(self, dictionary, input_file):
+    print('Design space of <' + input_file + '>:')
+    design_space_size = 1
+    for param, values in dictionary.items():
+      print('  ' + param + ': ' + str(len(values)))
+      design_space_size *= len(values)
+    print('  total: ' + str(design_space_size) + ' combinations')
+
   ## Populates the dictionaty with the set of inputs defined in match.
   def _parse_set_decimal_param_line(self, dictionary, match):
     param_set = []
@@ -419,10 +456,16 @@ class Parser:
     ## Parse out each value in the set.
     for value in values:
       cleaned_value = value.replace('[', '').replace(']', '').replace(' ', '')
-      param_set.append(cleaned_value.split('#')[0])
+      param_set.append(cleaned_value.split('#')[0].strip())
 
     dictionary[param] = copy.deepcopy(param_set)
 
+## Returns the number of digits after the decimal point in the number string.
+def _decimal_places(number):
+  if '.' not in number:
+    return 0
+  return len(number.split('.')[1])
+
 ## Needed so we can import this module into Jupyter notebooks.
 def load_ipython_extension(ipython):
   pass
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+class DesignSpaceEnumerator:
+  'Enumerates the Cartesian product of a bike_params dictionary (param -> \
+   [values]) as a mixed-radix number. Every design in the space maps to a \
+   single integer in [0, size) and back, which lets the space be split into \
+   contiguous chunks that can be searched in any order, in parallel, or \
+   resumed part way through.'
+
+  ## The bike_params is the dictionary of {param -> [values]} produced by the
+  ## Parser, and param_names is the order to enumerate the params in (which
+  ## defaults to the order of the bike_params). The last param changes the
+  ## fastest, so enumerating from 0 to size visits the designs in the same order
+  ## as nesting one for loop per param in param_names order.
+  def __init__(self, bike_params, param_names=None):
+    if param_names is None:
+      param_names = list(bike_params.keys())
+
+    self._param_names = list(param_names)
+    self._values = [list(bike_params[name]) for name in self._param_names]
+    self._radixes = [len(values) for values in self._values]
+
+    for name, radix in zip(self._param_names, self._radixes):
+      if radix == 0:
+        raise Exception('Param ' + name + ' does not have any values.')
+
+    ## The stride of each param is the number of designs between consecutive
+    ## values of that param.
+    self._strides = []
+    stride = 1
+    for radix in reversed(self._radixes):
+      self._strides.insert(0, stride)
+      stride *= radix
+    self._size = stride
+
+  @property
+  def param_names(self):
+    return self._param_names
+
+  @property
+  def radixes(self):
+    return self._radixes
+
+  @property
+  def size(self):
+    return self._size
+
+  def __len__(self):
+    return self._size
+
+  ## Converts the design number index into a dictionary of {param -> index into
+  ## bike_params[param]}, the same form the genetic searches use.
+  def index_to_indexes(self, index):
+    self._check_index(index)
+    single_bike_params_indexes = {}
+    for name, radix, stride in zip(self._param_names, self._radixes,
+                                   self._strides):
+      single_bike_params_indexes[name] = (index // stride) % radix
+    return single_bike_params_indexes
+
+  ## Converts a dictionary of {param -> index into bike_params[param]} back into
+  ## its design number.
+  def indexes_to_index(self, single_bike_params_indexes):
+    index = 0
+    for name, radix, stride in zip(self._param_names, self._radixes,
+                                   self._strides):
+      param_index = single_bike_params_indexes[name]
+      if param_index < 0 or param_index >= radix:
+        raise Exception('Index ' + str(param_index) + ' is out of range for ' +
+                        'param ' + name + '.')
+      index += param_index * stride
+    return index
+
+  ## Converts the design number index into a dictionary of {param -> value}.
+  def index_to_design(self, index):
+    single_bike_params_indexes = self.index_to_indexes(index)
+    single_bike_params = {}
+    for name, values in zip(self._param_names, self._values):
+      single_bike_params[name] = values[single_bike_params_indexes[name]]
+    return single_bike_params
+
+  ## Converts a dictionary of {param -> value} back into its design number. Each
+  ## value must be one of the values listed for its param in the bike_params.
+  def design_to_index(self, single_bike_params):
+    single_bike_params_indexes = {}
+    for name, values in zip(self._param_names, self._values):
+      value = single_bike_params[name]
+      if value not in values:
+        raise Exception('Value ' + str(value) + ' is not in the values for ' +
+                        'param ' + name + '.')
+      single_bike_params_indexes[name] = values.index(value)
+    return self.indexes_to_index(single_bike_params_indexes)
+
+  ## Yields the designs numbered [start, stop) in contiguous chunks of at most
+  ## chunk_size designs. Each chunk is a tuple of (chunk_start, indexes), where
+  ## indexes is a (chunk length x number of params) integer array holding each
+  ## design's index into bike_params[param], with columns in param_names order.
+  def index_chunks(self, start, stop, chunk_size):
+    if stop > np.iinfo(np.int64).max:
+      raise Exception('Design space is too large to enumerate in chunks.')
+
+    start = max(0, int(start))
+    stop = min(self._size, int(stop))
+    radixes = np.asarray(self._radixes, dtype=np.int64)
+    strides = np.asarray(self._strides, dtype=np.int64)
+
+    for chunk_start in range(start, stop, chunk_size):
+      chunk_stop = min(chunk_start + chunk_size, stop)
+      design_numbers = np.arange(chunk_start, chunk_stop, dtype=np.int64)
+      indexes = (design_numbers[:, np.newaxis] // strides) % radixes
+      yield chunk_start, indexes
+
+  ## Yields the designs numbered [start, stop) in contiguous chunks of at most
+  ## chunk_size designs. Each chunk is a tuple of (chunk_start, designs), where
+  ## designs is a (chunk length x number of params) float array holding each
+  ## design's param values, with columns in param_names order.
+  def design_chunks(self, start, stop, chunk_size):
+    values = [np.asarray(value_list, dtype=float) for value_list in self._values]
+    for chunk_start, indexes in self.index_chunks(start, stop, chunk_size):
+      designs = np.empty(indexes.shape)
+      for column, value_list in enumerate(values):
+        designs[:, column] = value_list[indexes[:, column]]
+      yield chunk_start, designs
+
+  ## Splits [0, size) into contiguous (start, stop) ranges of at most range_size
+  ## designs each.
+  def split(self, range_size):
+    range_size = max(1, int(range_size))
+    return [(start, min(start + range_size, self._size))
+            for start in range(0, self._size, range_size)]
+
+  def _check_index(self, index):
+    if index < 0 or index >= self._size:
+      raise Exception('Design number ' + str(index) + ' is outside of the ' +
+                      'design space [0, ' + str(self._size) + ').')
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
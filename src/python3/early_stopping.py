@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+import time
+
+class EarlyStopping:
+  'Decides when a genetic search run can stop before its generation_count is \
+   up, based on the error of the best bike at the start of each generation. \
+   A run stops once the best error reaches the target_error, once it has run \
+   for time_budget seconds, or once the best error has gone stall_generations \
+   generations without improving by more than improvement_threshold (relative \
+   to the best error so far). Any criterion left as None is not checked.'
+
+  ## The improvement_threshold is the fraction the best error has to drop by
+  ## to count as an improvement (0.01 means a 1% drop). Setting it without
+  ## stall_generations stops the run at the first generation which doesn't
+  ## improve by that much.
+  def __init__(self, stall_generations=None, improvement_threshold=None,
+               target_error=None, time_budget=None):
+    if stall_generations is None and improvement_threshold is not None:
+      stall_generations = 1
+
+    self._stall_generations = stall_generations
+    self._improvement_threshold = improvement_threshold or 0.0
+    self._target_error = target_error
+    self._time_budget = time_budget
+
+    self._best_error = float('inf')
+    self._stalled_generations = 0
+    self._elapsed = 0.0
+    self._last_check = time.time()
+
+  ## Restarts the wall clock, which should be done when a checkpointed run is
+  ## resumed so the time it spent stopped isn't counted against its budget.
+  def restart_clock(self):
+    self._last_check = time.time()
+
+  ## Returns True if the run should stop, given the error of the best bike at
+  ## the start of the current generation.
+  def should_stop(self, best_error):
+    now = time.time()
+    self._elapsed += now - self._last_check
+    self._last_check = now
+
+    if self._target_error is not None and best_error <= self._target_error:
+      return True
+
+    if self._time_budget is not None and self._elapsed >= self._time_budget:
+      return True
+
+    if self._improved(best_error):
+      self._best_error = best_error
+      self._stalled_generations = 0
+    else:
+      self._stalled_generations += 1
+
+    if self._stall_generations is not None and\
+       self._stalled_generations >= self._stall_generations:
+      return True
+
+    return False
+
+  ## Returns True if best_error is enough of an improvement on the best error
+  ## so far.
+  def _improved(self, best_error):
+    if self._best_error == float('inf'):
+      return best_error < self._best_error
+    return best_error < self._best_error -\
+                        self._improvement_threshold * abs(self._best_error)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
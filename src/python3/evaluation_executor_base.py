@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+
+class EvaluationExecutorBase(object):
+  'Interface for the ways of scoring a population of bike designs (serially, \
+   across a pool of processes, etc.) for the genetic searches.'
+
+  def __init__(self):
+    pass
+
+  ## Returns the error of each design in designs, a (number of designs x number
+  ## of params) array as built by BatchBikeEvaluator, scored against the riders
+  ## and the target_control_sensitivity curve up to top_speed.
+  def compute_errors(self, designs, riders, target_control_sensitivity,
+                     top_speed):
+    raise NotImplementedError('compute_errors operation was not defined by '
+                              'subclass.')
+
+  ## Releases any resources (such as worker pools) held by the executor.
+  def shutdown(self):
+    pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
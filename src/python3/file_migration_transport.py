@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+import numpy as np
+import os
+import time
+
+from migration_transport_base import MigrationTransportBase
+
+class FileMigrationTransport(MigrationTransportBase):
+  'Moves migrants between islands through .npz files in a directory, one file \
+   per batch. The islands only need to share the directory, so they can run \
+   as separate processes on one machine or, started one island at a time \
+   (see IslandGeneticSearch), on several machines with a shared filesystem. \
+   Files are written under a temporary name and moved into place, \
+   so an island never reads a half written batch.'
+
+  ## The directory is where the batches are kept, and poll_interval is the
+  ## number of seconds to wait between checks for a batch which hasn't arrived.
+  def __init__(self, directory, poll_interval=0.05):
+    MigrationTransportBase.__init__(self)
+    self._directory = directory
+    self._poll_interval = float(poll_interval)
+    os.makedirs(directory, exist_ok=True)
+
+  @property
+  def directory(self):
+    return self._directory
+
+  ## Sends a batch of migrants to the island.
+  def send(self, island, generation, genomes, scores):
+    filename = self._batch_filename(island, generation)
+    temp_filename = filename + '.tmp.npz'
+    np.savez(temp_filename, genomes=genomes, scores=scores)
+    os.replace(temp_filename, filename)
+
+  ## Waits up to timeout seconds for the island's batch of migrants for the
+  ## given generation, removing the batch's file once it has been read.
+  def receive(self, island, generation, timeout):
+    filename = self._batch_filename(island, generation)
+    deadline = time.time() + timeout
+    while not os.path.isfile(filename):
+      if time.time() > deadline:
+        raise Exception('Island ' + str(island) + ' timed out waiting for '
+                        'migrants at generation ' + str(generation))
+      time.sleep(self._poll_interval)
+
+    with np.load(filename) as batch:
+      genomes = batch['genomes']
+      scores = batch['scores']
+    os.remove(filename)
+    return genomes, scores
+
+  ## Returns the name of the file holding the island's batch of migrants for
+  ## the given generation.
+  def _batch_filename(self, island, generation):
+    return os.path.join(self._directory, 'island_' + str(island) +
+                        '_generation_' + str(generation) + '.npz')
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
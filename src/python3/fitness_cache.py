@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+import collections
+
+class FitnessCache:
+  'Least recently used cache of bike errors, keyed by the tuple of a bike\'s \
+   bike_params indexes (one index per gene). Genetic search populations are \
+   full of repeated individuals, so caching their errors saves re-scoring \
+   the same bike every time it shows up. Keeps count of its hits and misses.'
+
+  ## The max_size is the most errors to keep at once, with the least recently
+  ## used errors evicted first. A max_size of 0 turns the cache off.
+  def __init__(self, max_size=100000):
+    self._max_size = max(0, int(max_size))
+    self._errors = collections.OrderedDict()
+    self._hits = 0
+    self._misses = 0
+
+  @property
+  def max_size(self):
+    return self._max_size
+
+  @property
+  def hits(self):
+    return self._hits
+
+  @property
+  def misses(self):
+    return self._misses
+
+  def __len__(self):
+    return len(self._errors)
+
+  def __contains__(self, key):
+    return key in self._errors
+
+  def __str__(self):
+    lookups = self._hits + self._misses
+    hit_rate = 0.0
+    if lookups > 0:
+      hit_rate = 100.0 * self._hits / lookups
+    return 'Fitness cache: ' + str(self._hits) + ' hits, ' +\
+           str(self._misses) + ' misses (' + str(round(hit_rate, 1)) +\
+           '% hit rate), ' + str(len(self._errors)) + ' entries'
+
+  ## Looks up the error of each key, returning a tuple of (errors, missing_keys)
+  ## where errors holds each key's cached error (or None if it isn't cached) and
+  ## missing_keys is the list of distinct keys which weren't cached, in the
+  ## order they first appear. A key repeated within keys is only counted as a
+  ## miss once, since it only needs to be scored once.
+  def lookup(self, keys):
+    errors = []
+    missing_keys = []
+    missing = set()
+
+    for key in keys:
+      error = self._errors.get(key)
+      if error is not None:
+        self._errors.move_to_end(key)
+        self._hits += 1
+      elif key in missing:
+        self._hits += 1
+      else:
+        missing.add(key)
+        missing_keys.append(key)
+        self._misses += 1
+      errors.append(error)
+
+    return errors, missing_keys
+
+  ## Adds the error of each key to the cache, evicting the least recently used
+  ## errors if the cache grows past its max_size.
+  def update(self, keys, errors):
+    if self._max_size == 0:
+      return
+
+    for key, error in zip(keys, errors):
+      self._errors[key] = error
+      self._errors.move_to_end(key)
+
+    while len(self._errors) > self._max_size:
+      self._errors.popitem(last=False)
+
+  ## Adds hits and misses counted by another cache (such as one used by a
+  ## worker process) to this cache's counts.
+  def add_counts(self, hits, misses):
+    self._hits += hits
+    self._misses += misses
+
+  ## Empties the cache. The hit and miss counts are kept.
+  def clear(self):
+    self._errors.clear()
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
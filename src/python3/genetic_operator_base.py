@@ -8,26 +8,25 @@ class GeneticOperatorBase(object):
   def __init__(self, pop_size):
     self.pop_size = pop_size
 
-  ## Selects the members of the old_poperation (represented as a list of
-  ## single_bike_params (dictionaries of param -> value)) to be copied into the
-  ## new_poperation. Percentage refers to the percent of the old_pop to be
-  ## selected to form the base for the new gen.
+  ## Selects the members of the ranked_pop (a RankedPopulation, or a list of
+  ## them for partitioned selection) to be copied into the new_pop Population.
+  ## Percentage refers to the percent of the old_pop to be selected to form the
+  ## base for the new gen.
   def selection(self, ranked_pop, new_pop, percentage):
     raise NotImplementedError('selection operation was not defined by subclass.')
 
-  ## Selects the members of the old_poperation (represented as a list of
-  ## single_bike_params (dictionaries of param -> value)) to be crossed_over
-  ## with members from the new_population. Percentage refers to the percent of
-  ## the old_population to be selected to cross_over, and num_traits specifies
-  ## the number of traits to cross_over using.
+  ## Selects the members of the old_pop (a Population of genomes, one gene per
+  ## param in bike_params) to be crossed_over with members from the new_pop.
+  ## Percentage refers to the percent of the old_population to be selected to
+  ## cross_over, and num_traits specifies the number of traits to cross_over
+  ## using.
   def cross_over(self, old_pop, new_pop, bike_params, num_traits, percentage):
     raise NotImplementedError('cross_over operation was not defined by subclass.')
 
-  ## Selects the members of the old_poperation (represented as a list of
-  ## single_bike_params (dictionaries of param -> value)) to be mutated
-  ## and placed in the new_population. Percentage refers to the percent of
-  ## the old_population to be selected to mutate, and num_traits specifies
-  ## the number of traits to mutate.
+  ## Selects the members of the old_pop (a Population of genomes, one gene per
+  ## param in bike_params) to be mutated and placed in the new_pop. Percentage
+  ## refers to the percent of the old_population to be selected to mutate, and
+  ## num_traits specifies the number of traits to mutate.
   def mutate(self, old_pop, new_pop,  bike_params, num_traits, percentage):
     raise NotImplementedError('mutate operation was not defined by subclass.')
 
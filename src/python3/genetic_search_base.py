@@ -0,0 +1,629 @@
+#!/usr/bin/python3
+
+import concurrent.futures
+import copy
+import numpy as np
+import time
+
+from batch_bike_evaluator import BatchBikeEvaluator
+from bike_search_base import BikeSearchBase
+from command_line_options import pop_option
+from early_stopping import EarlyStopping
+from fitness_cache import FitnessCache
+from pool_evaluation_executor import PoolEvaluationExecutor
+from ranked_population import RankedPopulation
+from serial_evaluation_executor import SerialEvaluationExecutor
+
+class GeneticSearchBase(BikeSearchBase):
+  'Shared driver for the genetic algorithm bike searches. Sweeps every \
+   combination of the ga_config values, running each configuration num_runs \
+   times and logging the results, and checkpoints its progress so a sweep can \
+   be resumed. Subclasses implement the single simulation run itself.'
+
+  ## The checkpoint is an optional Checkpoint object used to periodically save
+  ## (and, when resuming, restore) the sweep position, the population and the
+  ## state of the random number generator. The seed makes the search
+  ## reproducible, and one is drawn from the system's entropy if it's None.
+  def __init__(self, checkpoint=None, seed=None):
+    self._simulation_params = {}
+    self._ga_log_filename = ''
+    self._checkpoint = checkpoint
+    self._sweep_state = None
+    self._fitness_cache = FitnessCache(0)
+    self._evaluation_executor = SerialEvaluationExecutor()
+    self._operator_config = {}
+
+    ## The generation the last single run stopped at, which is its
+    ## generation_count unless it was stopped early.
+    self._stop_generation = None
+
+    ## Random number generator behind every random choice the search makes.
+    ## The sweep replaces it with a generator of each run's own at the start of
+    ## the run.
+    if seed is None:
+      seed = np.random.SeedSequence().entropy
+    self._seed = seed
+    self._rng = np.random.default_rng(seed)
+
+    ## Default number of errors kept by the fitness cache, which can be
+    ## overridden by the 'fitness_cache_size' entry of the ga_config.
+    self._default_fitness_cache_size = 100000
+
+  ## The seed the search was built with, which can be passed to a new search to
+  ## replay it.
+  @property
+  def seed(self):
+    return self._seed
+
+  ## Runs a genetic algorithm simulation given the specified parameters and
+  ## returns the set containing the best bikes.
+  def run(self, simulation_params, ga_log_filename):
+    self._simulation_params = copy.deepcopy(simulation_params)
+    self._ga_log_filename = ga_log_filename
+    return self._run_full_simulation()
+
+  ## Runs a single genetic algorithm simulation for the current ga_config,
+  ## appending its best bikes to the best_bikes list as (error, bike_params)
+  ## pairs and returning the error of the best bike. The resume_state is the
+  ## state passed to _save_checkpoint_if_due by an interrupted run, or None if
+  ## the run should start from scratch. The run should also set
+  ## _stop_generation to the generation it stopped at.
+  def _run_single_simulation(self, simulation_params, best_bikes,
+                             resume_state=None):
+    raise NotImplementedError('_run_single_simulation function was not defined '
+                              'by subclass.')
+
+  ## Converts the best bikes from every run (a list of (error, bike_params)
+  ## pairs) into the result returned by run().
+  def _finish_full_simulation(self, best_bikes_per_run):
+    raise NotImplementedError('_finish_full_simulation function was not '
+                              'defined by subclass.')
+
+  ## Appends the follow header contents to the output_string:
+  ##
+  ##  ---
+  ##  num_runs = #
+  ##  selection_percentage = #
+  ##  cross_over_percentage = #
+  ##  mutation_percentage = #
+  ##  cross_over_gene_count = #
+  ##  mutation_gene_count = #
+  ##  Run Data [gen_count, pop_size, error, runtime, stop_generations]
+  ##
+  ## where stop_generations is the space separated list of the generation each
+  ## run stopped at.
+  def _add_ga_config_header(self, current_ga_config, num_runs):
+    output_string = '---\n'
+    output_string += 'num_runs = ' + str(num_runs) + '\n'
+    output_string += 'selection_percentage = ' +\
+                     str(current_ga_config['selection_percentage']) + '\n'
+    output_string += 'cross_over_percentage = ' +\
+                     str(current_ga_config['cross_over_percentage']) + '\n'
+    output_string += 'mutation_percentage = ' +\
+                     str(current_ga_config['mutation_percentage']) + '\n'
+    output_string += 'cross_over_gene_count = ' +\
+                     str(current_ga_config['cross_over_gene_count']) + '\n'
+    output_string += 'mutation_gene_count = ' +\
+                     str(current_ga_config['mutation_gene_count']) + '\n'
+    output_string += 'Run Data [gen_count, pop_size, error, runtime, '\
+                     'stop_generations]\n'
+    return output_string
+
+  ## Adds bikes to the population which are randomly chosen from the possible
+  ## bike space.
+  def _add_random_bikes_to_pop(self, population, num_bikes_to_add):
+    population.add_random(num_bikes_to_add, self._rng)
+
+  ## Builds the genetic operators (an instance of operator_class) for a run with
+  ## the given pop_size, configured by the following (optional) ga_config
+  ## entries:
+  ##
+  ##  cross_over_type = [gene_count, uniform] (default gene_count)
+  ##  mutation_rate = # (default none, in which case mutation re-draws
+  ##                     mutation_gene_count genes)
+  def _build_genetic_operators(self, operator_class, pop_size):
+    return operator_class(pop_size,
+                          self._operator_config.get('cross_over_type',
+                                                    'gene_count'),
+                          self._operator_config.get('mutation_rate'),
+                          self._rng)
+
+  ## Ranks all the bikes in the unranked_population (a Population), returning
+  ## a RankedPopulation of its genomes sorted by score.
+  def _rank_bikes_by_score(self, unranked_population):
+    ## Look up the bikes which have already been scored, and score each of the
+    ## remaining bikes once (even if it shows up several times).
+    keys = unranked_population.keys()
+    scores, missing_keys = self._fitness_cache.lookup(keys)
+
+    if missing_keys:
+      individual_by_key = dict(zip(keys, range(0, len(keys))))
+      missing_population = unranked_population.take(
+          [individual_by_key[key] for key in missing_keys])
+      missing_scores = [float(score) for score in
+                        self._score_bikes(missing_population)]
+      self._fitness_cache.update(missing_keys, missing_scores)
+
+      scores_by_key = dict(zip(missing_keys, missing_scores))
+      scores = [scores_by_key[key] if score is None else score
+                for key, score in zip(keys, scores)]
+
+    return RankedPopulation(unranked_population.bike_params,
+                            unranked_population.genomes, scores)
+
+  ## Returns the error of each bike in the population.
+  def _score_bikes(self, population):
+    evaluator = BatchBikeEvaluator()
+
+    ## Build one design array for the whole population and hand it to the
+    ## evaluation executor to score based on the input riders.
+    designs = evaluator.designs_from_population(population)
+    executor = self._evaluation_executor
+    return executor.compute_errors(designs,
+                                   self._simulation_params.riders,
+                                   self._simulation_params.target_control_sensitivity,
+                                   self._simulation_params.top_speed)
+
+  ## Builds the executor used to score each population from the following
+  ## (optional) ga_config entries:
+  ##
+  ##  evaluation_executor = [serial, process, thread] (default serial)
+  ##  evaluation_workers = # (default the number of CPUs)
+  ##  evaluation_chunk_size = # (default 256)
+  def _build_evaluation_executor(self, ga_config):
+    executor_type = 'serial'
+    if 'evaluation_executor' in ga_config:
+      executor_type = str(ga_config['evaluation_executor'][0])
+
+    if executor_type == 'serial':
+      return SerialEvaluationExecutor()
+
+    if executor_type != 'process' and executor_type != 'thread':
+      raise Exception('evaluation_executor must be set to serial, process or '
+                      'thread')
+
+    num_workers = None
+    if 'evaluation_workers' in ga_config:
+      num_workers = int(ga_config['evaluation_workers'][0])
+
+    chunk_size = 256
+    if 'evaluation_chunk_size' in ga_config:
+      chunk_size = int(ga_config['evaluation_chunk_size'][0])
+
+    return PoolEvaluationExecutor(executor_type, num_workers, chunk_size)
+
+  ## Builds the EarlyStopping for a single run from the following (optional)
+  ## entries of its ga_config:
+  ##
+  ##  stall_generations = # generations without improvement before stopping
+  ##  improvement_threshold = # relative drop in the best error which counts as
+  ##                          an improvement (default 0)
+  ##  target_error = # best error to stop at
+  ##  time_budget = # seconds to stop after
+  ##
+  ## A run with none of them set runs for its whole generation_count.
+  def _build_early_stopping(self, ga_config):
+    stall_generations = ga_config.get('stall_generations')
+    if stall_generations is not None:
+      stall_generations = int(stall_generations)
+
+    improvement_threshold = ga_config.get('improvement_threshold')
+    if improvement_threshold is not None:
+      improvement_threshold = float(improvement_threshold)
+
+    target_error = ga_config.get('target_error')
+    if target_error is not None:
+      target_error = float(target_error)
+
+    time_budget = ga_config.get('time_budget')
+    if time_budget is not None:
+      time_budget = float(time_budget)
+
+    return EarlyStopping(stall_generations, improvement_threshold, target_error,
+                         time_budget)
+
+  ## Expands the ga_config lists into the sweep, a list of blocks with one block
+  ## per combination of the selection, cross over and mutation values. Each
+  ## block is the list of GA configs (one per generation_count and
+  ## population_size combination) which share a header in the GA log. Every GA
+  ## config also carries the first value of each ga_config entry which isn't
+  ## swept, for the settings read by the single runs.
+  def _build_ga_config_sweep(self, ga_config):
+    swept_params = ['selection_percentage', 'cross_over_percentage',
+                    'mutation_percentage', 'cross_over_gene_count',
+                    'mutation_gene_count', 'generation_count', 'population_size']
+    settings = {}
+    for param, values in ga_config.items():
+      if param not in swept_params and values:
+        settings[param] = values[0]
+
+    sweep = []
+    for selection_percentage in ga_config['selection_percentage']:
+      for cross_over_percentage in ga_config['cross_over_percentage']:
+        for mutation_percentage in ga_config['mutation_percentage']:
+          for cross_over_gene_count in ga_config['cross_over_gene_count']:
+            for mutation_gene_count in ga_config['mutation_gene_count']:
+              block = []
+              for gen_count in ga_config['generation_count']:
+                for pop_size in ga_config['population_size']:
+                  current_ga_config = dict(settings)
+                  current_ga_config.update(
+                      {'selection_percentage': selection_percentage,
+                       'cross_over_percentage': cross_over_percentage,
+                       'mutation_percentage': mutation_percentage,
+                       'cross_over_gene_count': cross_over_gene_count,
+                       'mutation_gene_count': mutation_gene_count,
+                       'generation_count': gen_count,
+                       'population_size': pop_size})
+                  block.append(current_ga_config)
+              sweep.append(block)
+    return sweep
+
+  ## Returns the state of a sweep which has not been started yet. The block,
+  ## trial and run entries are the sweep position of the next run to do.
+  def _new_sweep_state(self):
+    return {'block': 0,
+            'trial': 0,
+            'run': 0,
+            'output_string': '',
+            'aggregate_error': 0.0,
+            'min_error': float('inf'),
+            'max_error': 0,
+            'runtime': 0.0,
+            'stop_generations': [],
+            'log_length': 0,
+            'best_bikes_per_run': [],
+            'single_run': None}
+
+  ## Saves a checkpoint of the sweep if one is due, along with the state of the
+  ## random number generator so a resumed sweep makes the same choices. The
+  ## single_run_state is the state needed to resume the run currently in
+  ## progress (or None if the checkpoint is being taken between runs).
+  def _save_checkpoint_if_due(self, single_run_state=None):
+    if self._checkpoint is None or not self._checkpoint.due():
+      return
+
+    state = dict(self._sweep_state)
+    state['single_run'] = single_run_state
+    state['random_state'] = self._rng.bit_generator.state
+    self._checkpoint.save(state)
+
+  def _run_full_simulation(self):
+    ## Store a copy of the ga_config for later manipulation.
+    ga_config = copy.deepcopy(self._simulation_params.ga_config)
+
+    ## Start the evaluation executor, keeping it (and any worker pool it starts)
+    ## for every generation and run of the sweep.
+    self._evaluation_executor = self._build_evaluation_executor(ga_config)
+    try:
+      return self._run_sweep(ga_config)
+    finally:
+      self._evaluation_executor.shutdown()
+      self._evaluation_executor = SerialEvaluationExecutor()
+
+  ## Runs every GA config in the sweep described by ga_config, returning the
+  ## result of _finish_full_simulation.
+  def _run_sweep(self, ga_config):
+
+    ## The number of runs to do per configuration (to gather some sense of
+    ## statistical certainty about the results).
+    num_runs = int(ga_config['num_runs'][0])
+    beginning = time.time()
+
+    sweep = self._build_ga_config_sweep(ga_config)
+
+    ## Settings shared by the genetic operators of every run.
+    self._operator_config = {}
+    if 'cross_over_type' in ga_config:
+      self._operator_config['cross_over_type'] =\
+        str(ga_config['cross_over_type'][0])
+    if 'mutation_rate' in ga_config:
+      self._operator_config['mutation_rate'] =\
+        float(ga_config['mutation_rate'][0])
+
+    ## The fitness cache is shared by every generation and run of a GA config,
+    ## and cleared between configs so their runtimes stay comparable.
+    fitness_cache_size = self._default_fitness_cache_size
+    if 'fitness_cache_size' in ga_config:
+      fitness_cache_size = int(ga_config['fitness_cache_size'][0])
+    self._fitness_cache = FitnessCache(fitness_cache_size)
+
+    ## The number of worker processes to spread the runs of the sweep across.
+    sweep_workers = 1
+    if 'sweep_workers' in ga_config:
+      sweep_workers = int(ga_config['sweep_workers'][0])
+
+    state = None
+    if self._checkpoint is not None:
+      state = self._checkpoint.load()
+
+    if state is None:
+      state = self._new_sweep_state()
+
+      ## Open the log file once to clear it.
+      ga_log_file = open(self._ga_log_filename, 'w')
+      ga_log_file.close()
+    else:
+      ## Drop anything written to the log after the checkpoint was taken, since
+      ## it will be written again as the sweep is resumed.
+      with open(self._ga_log_filename, 'a') as ga_log_file:
+        ga_log_file.truncate(state['log_length'])
+      self._rng.bit_generator.state = state.pop('random_state')
+
+      ## Older checkpoints kept the best bikes as a mapping of error ->
+      ## bike_params.
+      if isinstance(state['best_bikes_per_run'], dict):
+        state['best_bikes_per_run'] = list(state['best_bikes_per_run'].items())
+
+    ## Every run draws from its own random number generator, seeded from the
+    ## sweep seed and the run's position in the sweep, so a run's results don't
+    ## depend on the runs before it or on which process it runs in.
+    if 'sweep_seed' not in state:
+      state['sweep_seed'] = int(self._rng.integers(0, 2**63))
+
+    self._sweep_state = state
+
+    if sweep_workers > 1:
+      self._run_parallel_sweep(sweep, num_runs, sweep_workers, beginning)
+    else:
+      self._run_serial_sweep(sweep, num_runs, beginning)
+
+    ## Add final deliminter to the file for later parsing.
+    output_string = '---\n'
+
+    ## Print the output to the specified file.
+    ga_log_file = open(self._ga_log_filename, 'a')
+    ga_log_file.write(output_string)
+    ga_log_file.close()
+
+    print(str(self._fitness_cache))
+
+    ## The sweep finished, so there is nothing left to resume.
+    if self._checkpoint is not None:
+      self._checkpoint.clear()
+
+    return self._finish_full_simulation(state['best_bikes_per_run'])
+
+  ## Runs the sweep one run at a time in this process, picking up from the
+  ## position held in the sweep state.
+  def _run_serial_sweep(self, sweep, num_runs, beginning):
+    state = self._sweep_state
+
+    ## Container to hold the best bike designs at the end of the run.
+    best_bikes_per_run = state['best_bikes_per_run']
+
+    while state['block'] < len(sweep):
+      block = sweep[state['block']]
+      self._start_block(block, num_runs)
+
+      while state['trial'] < len(block):
+        current_ga_config = block[state['trial']]
+
+        ## Add the current GA config to the simulation params so we can run this
+        ## test configuration.
+        self._simulation_params.ga_config = copy.deepcopy(current_ga_config)
+
+        ## Each trial starts with an empty fitness cache.
+        if state['run'] == 0:
+          self._fitness_cache.clear()
+          self._start_trial()
+
+        while state['run'] < num_runs:
+          ## Start timing the run.
+          start = time.time()
+
+          ## A resumed run carries on with the generator restored from the
+          ## checkpoint.
+          if state['single_run'] is None:
+            self._rng = np.random.default_rng(self._sweep_run_seed(
+                sweep, num_runs, (state['block'], state['trial'], state['run'])))
+
+          ## Run the simulation for the given configuration and record the
+          ## error of the best bike in each case.
+          run_error = self._run_single_simulation(self._simulation_params,
+                                                  best_bikes_per_run,
+                                                  state['single_run'])
+          state['single_run'] = None
+
+          self._record_run(run_error, time.time() - start,
+                           self._stop_generation)
+          self._save_checkpoint_if_due()
+
+        self._finish_trial(current_ga_config, num_runs)
+
+      self._finish_block(block, beginning)
+
+  ## Runs the sweep across a pool of sweep_workers processes. Every run of every
+  ## GA config is independent, so they are all handed to the pool at once, each
+  ## with its own random number generator seeded from its position in the
+  ## sweep (so the results match a serial sweep, whatever the number of workers
+  ## or the order the runs finish in). Finished runs are held until every earlier run of the
+  ## sweep is done, and then logged in sweep order, so the GA log comes out the
+  ## same as it would from a serial sweep. Checkpoints are taken between GA
+  ## configs.
+  def _run_parallel_sweep(self, sweep, num_runs, sweep_workers, beginning):
+    state = self._sweep_state
+    if state['run'] != 0:
+      raise Exception('The checkpoint was taken part way through a GA config, '
+                      'so it can only be resumed with sweep_workers = 1')
+
+    ## The runs still to do, in sweep order, as (block, trial, run) positions.
+    positions = []
+    for block_index in range(state['block'], len(sweep)):
+      first_trial = 0
+      if block_index == state['block']:
+        first_trial = state['trial']
+      for trial_index in range(first_trial, len(sweep[block_index])):
+        for run_index in range(0, num_runs):
+          positions.append((block_index, trial_index, run_index))
+
+    ## Results of the finished runs, by position, waiting to be logged.
+    finished = {}
+
+    with concurrent.futures.ProcessPoolExecutor(sweep_workers) as pool:
+      futures = {}
+      for position in positions:
+        block_index, trial_index, run_index = position
+        simulation_params = copy.copy(self._simulation_params)
+        simulation_params.ga_config =\
+          copy.deepcopy(sweep[block_index][trial_index])
+        seed = self._sweep_run_seed(sweep, num_runs, position)
+        future = pool.submit(_run_sweep_task, type(self), simulation_params,
+                             self._operator_config,
+                             self._fitness_cache.max_size, seed)
+        futures[future] = position
+
+      for future in concurrent.futures.as_completed(futures):
+        finished[futures[future]] = future.result()
+
+        ## Log every run which is now next in sweep order.
+        while (state['block'], state['trial'], state['run']) in finished:
+          block = sweep[state['block']]
+          if state['trial'] == 0 and state['run'] == 0:
+            self._start_block(block, num_runs)
+          if state['run'] == 0:
+            self._start_trial()
+
+          run_error, runtime, stop_generation, best_bikes, hits, misses =\
+            finished.pop((state['block'], state['trial'], state['run']))
+          state['best_bikes_per_run'].extend(best_bikes)
+          self._fitness_cache.add_counts(hits, misses)
+          self._record_run(run_error, runtime, stop_generation)
+
+          if state['run'] == num_runs:
+            self._finish_trial(block[state['trial']], num_runs)
+            if state['trial'] == len(block):
+              self._finish_block(block, beginning)
+
+  ## Returns the seed of the random number generator for the run at position
+  ## (block, trial, run) of the sweep.
+  def _sweep_run_seed(self, sweep, num_runs, position):
+    block_index, trial_index, run_index = position
+    run_number = sum(len(block) for block in sweep[:block_index]) * num_runs +\
+                 trial_index * num_runs + run_index
+    return np.random.SeedSequence(self._sweep_state['sweep_seed'],
+                                  spawn_key=(run_number,))
+
+  ## Starts the block of GA configs which share a header in the GA log, unless
+  ## it was already started before the sweep was checkpointed.
+  def _start_block(self, block, num_runs):
+    state = self._sweep_state
+
+    ## Add the initial header to the output_string for this run.
+    if state['trial'] == 0 and state['run'] == 0:
+      state['output_string'] = self._add_ga_config_header(block[0], num_runs)
+
+  ## Resets the error statistics for a new GA config.
+  def _start_trial(self):
+    state = self._sweep_state
+    state['aggregate_error'] = 0.0
+    state['min_error'] = float('inf')
+    state['max_error'] = 0
+    state['runtime'] = 0.0
+    state['stop_generations'] = []
+
+  ## Adds a finished run to the error statistics of the current GA config.
+  def _record_run(self, run_error, runtime, stop_generation):
+    state = self._sweep_state
+    if run_error < state['min_error']:
+      state['min_error'] = run_error
+
+    if run_error > state['max_error']:
+      state['max_error'] = run_error
+
+    state['aggregate_error'] += run_error
+    state['runtime'] += runtime
+    state['stop_generations'].append(stop_generation)
+    state['run'] += 1
+
+  ## Logs the statistics of the current GA config once all of its runs are done
+  ## and moves the sweep on to the next GA config.
+  def _finish_trial(self, current_ga_config, num_runs):
+    state = self._sweep_state
+
+    ## Average the error for each run
+    avg_error = state['aggregate_error'] / num_runs
+
+    ## Append that error to the output_string
+    state['output_string'] += str(current_ga_config['generation_count']) +\
+                              ',' +\
+                              str(current_ga_config['population_size']) +\
+                              ',' + str(avg_error) + ',' +\
+                              str(state['runtime']) + ',' +\
+                              ' '.join(str(stop_generation) for stop_generation
+                                       in state['stop_generations']) + '\n'
+
+    ## Print the output to the specified file. Do it this way to ensure that
+    ## if the trial dies part way through we still have some data saved.
+    with open(self._ga_log_filename, 'a') as ga_log_file:
+      ga_log_file.write(state['output_string'])
+      state['log_length'] = ga_log_file.tell()
+
+    state['trial'] += 1
+    state['run'] = 0
+    self._save_checkpoint_if_due()
+
+  ## Reports the runtime so far once every GA config in a block is done, and
+  ## moves the sweep on to the next block.
+  def _finish_block(self, block, beginning):
+    state = self._sweep_state
+    print('Selection %: ' + str(block[0]['selection_percentage']) + ', ' +
+          'Cross Over %: ' + str(block[0]['cross_over_percentage']) + ', ' +
+          'Mutation %: ' + str(block[0]['mutation_percentage']) + ' -- ' +
+          'Runtime: ' + str(time.time() - beginning))
+
+    state['block'] += 1
+    state['trial'] = 0
+
+## Runs a single GA run of a parallel sweep. This runs inside the workers, with
+## a fresh search of the search_class, and returns a tuple of (error of the best
+## bike, runtime, stop generation, best bikes, fitness cache hits, fitness cache
+## misses).
+def _run_sweep_task(search_class, simulation_params, operator_config,
+                    fitness_cache_size, seed):
+  search = search_class()
+  search._simulation_params = simulation_params
+  search._operator_config = operator_config
+  search._fitness_cache = FitnessCache(fitness_cache_size)
+  search._rng = np.random.default_rng(seed)
+
+  best_bikes = []
+  start = time.time()
+  run_error = search._run_single_simulation(simulation_params, best_bikes)
+  runtime = time.time() - start
+  return (run_error, runtime, search._stop_generation, best_bikes,
+          search._fitness_cache.hits, search._fitness_cache.misses)
+
+## Pulls the evaluation options (--evaluation-executor <serial|process|thread>,
+## --evaluation-workers <count>, --evaluation-chunk-size <size> and
+## --sweep-workers <count>) out of the command_line_args, returning them as a
+## dictionary of ga_config entries which override the ones from the GA config
+## file.
+def pop_evaluation_options(command_line_args):
+  ga_config_overrides = {}
+
+  executor_type = pop_option(command_line_args, '--evaluation-executor')
+  if executor_type is not None:
+    ga_config_overrides['evaluation_executor'] = [executor_type]
+
+  num_workers = pop_option(command_line_args, '--evaluation-workers')
+  if num_workers is not None:
+    ga_config_overrides['evaluation_workers'] = [int(num_workers)]
+
+  chunk_size = pop_option(command_line_args, '--evaluation-chunk-size')
+  if chunk_size is not None:
+    ga_config_overrides['evaluation_chunk_size'] = [int(chunk_size)]
+
+  sweep_workers = pop_option(command_line_args, '--sweep-workers')
+  if sweep_workers is not None:
+    ga_config_overrides['sweep_workers'] = [int(sweep_workers)]
+
+  return ga_config_overrides
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
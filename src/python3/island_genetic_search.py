@@ -0,0 +1,372 @@
+#!/usr/bin/python3
+
+import copy
+import json
+import multiprocessing
+import numpy as np
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+from checkpoint import pop_checkpoint_options
+from command_line_options import pop_option, pop_seed
+from config_bundle import pop_config_bundle_options
+from file_migration_transport import FileMigrationTransport
+from fitness_cache import FitnessCache
+from genetic_search_base import pop_evaluation_options
+from island_migration import IslandMigration
+from queue_migration_transport import QueueMigrationTransport
+from top_k_collector import TopKCollector
+from unpartitioned_genetic_search import UnpartitionedGeneticSearch, parse_inputs
+
+class IslandGeneticSearch(UnpartitionedGeneticSearch):
+  'Island model version of the unpartitioned genetic search. Each run splits \
+   the population across several islands, each evolved with the unpartitioned \
+   selection, cross over and mutation operators in its own process, and the \
+   islands swap their best bikes every few generations (see IslandMigration). \
+   The best bikes from all of the islands make up the result of the run. The \
+   islands can also be spread across several machines, with each machine \
+   running a single island and the migrants moving through files in a shared \
+   directory.'
+
+  ## See GeneticSearchBase for the checkpoint and seed. To run just one island
+  ## of the search (such as one of several on different machines), give its
+  ## island number out of island_count, which overrides the island_count in the
+  ## ga_config. Every island has to be started with the same seed, config files
+  ## and run_id, and the ga_config has to use the file migration_transport with
+  ## a migration_directory the islands share. Each batch of runs keeps its
+  ## files in a directory named after the run_id and the run's seed, so islands
+  ## only meet the other islands of the same run.
+  def __init__(self, checkpoint=None, seed=None, island=None, island_count=None,
+               run_id='islands'):
+    if island is not None:
+      if seed is None:
+        raise Exception('Every island needs the same seed to run one island')
+      if island_count is None or not 0 <= int(island) < int(island_count):
+        raise Exception('island must be between 0 and island_count - 1')
+      island = int(island)
+      island_count = int(island_count)
+
+    UnpartitionedGeneticSearch.__init__(self, checkpoint, None, seed)
+    self._island = island
+    self._island_count = island_count
+    self._run_id = str(run_id)
+
+  ## Runs a single simulation across the islands, configured by the following
+  ## (optional) ga_config entries:
+  ##
+  ##  island_count = # (default the number of CPUs)
+  ##  migration_interval = # generations between migrations (default 5)
+  ##  migration_count = # bikes each island sends per migration (default 2)
+  ##  migration_topology = [ring, random] (default ring)
+  ##  migration_transport = [queue, file] (default queue)
+  ##  migration_directory = where the file transport keeps its batches (default
+  ##                        a temporary directory)
+  ##  migration_timeout = # seconds to wait for migrants (default 600)
+  ##
+  ## The population_size is split evenly between the islands. When the search
+  ## only runs one island, that island is run in this process and only its best
+  ## bikes are returned. A run can't be checkpointed part way through, so
+  ## resume_state is always None. The early stopping entries are ignored, since
+  ## an island which stopped early would leave the others waiting for its
+  ## migrants.
+  def _run_single_simulation(self, simulation_params, best_bikes,
+                             resume_state=None):
+    ga_config = simulation_params.ga_config
+    island_count = max(1, int(ga_config.get('island_count',
+                                             os.cpu_count() or 1)))
+    if self._island is not None:
+      island_count = self._island_count
+    migration_config = {
+        'interval': int(ga_config.get('migration_interval', 5)),
+        'count': int(ga_config.get('migration_count', 2)),
+        'topology': str(ga_config.get('migration_topology', 'ring')),
+        'timeout': float(ga_config.get('migration_timeout', 600.0)),
+        'seed': int(self._rng.integers(0, 2**63))}
+    island_seed = int(self._rng.integers(0, 2**63))
+
+    ## Each island gets an even share of the population.
+    island_params = copy.copy(simulation_params)
+    island_params.ga_config = dict(ga_config)
+    island_params.ga_config['population_size'] =\
+      max(1, int(ga_config['population_size']) // island_count)
+    for param in ['stall_generations', 'improvement_threshold', 'target_error',
+                  'time_budget']:
+      island_params.ga_config.pop(param, None)
+
+    if self._island is not None:
+      outcomes = self._run_one_island(island_params, island_count,
+                                      migration_config, island_seed)
+    else:
+      outcomes = self._run_all_islands(island_params, island_count,
+                                       migration_config, island_seed)
+
+    ## Keep the best bikes from across all of the islands.
+    best_island_bikes = TopKCollector(self._simulation_params.sample_count)
+    score = float('inf')
+    for island in sorted(outcomes.keys()):
+      run_error, island_bikes, hits, misses = outcomes[island]
+      score = min(score, run_error)
+      self._fitness_cache.add_counts(hits, misses)
+      for error, single_bike_params in island_bikes:
+        best_island_bikes.offer(error, single_bike_params)
+    best_bikes.extend(best_island_bikes.to_list())
+    self._stop_generation = int(ga_config['generation_count'])
+
+    ## Return the score of the best bike.
+    return score
+
+  ## Runs every island in a process of its own, returning a dictionary of
+  ## island -> outcome (see _collect_island_outcomes).
+  def _run_all_islands(self, island_params, island_count, migration_config,
+                       island_seed):
+    ga_config = island_params.ga_config
+
+    ## Build the transport before starting the islands so they all share it.
+    transport_type = str(ga_config.get('migration_transport', 'queue'))
+    migration_directory = None
+    if transport_type == 'queue':
+      transport = QueueMigrationTransport(island_count)
+    elif transport_type == 'file':
+      parent_directory = ga_config.get('migration_directory')
+      if parent_directory is not None:
+        os.makedirs(str(parent_directory), exist_ok=True)
+        parent_directory = str(parent_directory)
+      migration_directory = tempfile.mkdtemp(prefix='islands_',
+                                             dir=parent_directory)
+      transport = FileMigrationTransport(migration_directory)
+    else:
+      raise Exception('migration_transport must be set to queue or file')
+
+    results = multiprocessing.Queue()
+    islands = [multiprocessing.Process(target=_run_island,
+                                       args=(island, island_count,
+                                             island_params,
+                                             self._operator_config,
+                                             self._fitness_cache.max_size,
+                                             migration_config, transport,
+                                             island_seed, results))
+               for island in range(0, island_count)]
+    try:
+      for island_process in islands:
+        island_process.start()
+      outcomes = self._collect_island_outcomes(islands, results)
+      for island_process in islands:
+        island_process.join()
+    finally:
+      for island_process in islands:
+        if island_process.is_alive():
+          island_process.terminate()
+      transport.close()
+      if migration_directory is not None:
+        shutil.rmtree(migration_directory, ignore_errors=True)
+
+    return outcomes
+
+  ## Runs just this search's island in this process, swapping migrants with the
+  ## islands run elsewhere through the shared migration_directory. Returns a
+  ## dictionary of island -> outcome (see _collect_island_outcomes) holding
+  ## only this island.
+  def _run_one_island(self, island_params, island_count, migration_config,
+                      island_seed):
+    ga_config = island_params.ga_config
+    if str(ga_config.get('migration_transport', 'queue')) != 'file' or\
+       ga_config.get('migration_directory') is None:
+      raise Exception('Running one island needs migration_transport = file '
+                      'and a migration_directory shared by every island')
+
+    ## The run's seed is the same on every island, so it names the directory
+    ## the islands of this run meet in.
+    migration_directory = os.path.join(str(ga_config['migration_directory']),
+                                       self._run_id + '_' + str(island_seed))
+    transport = FileMigrationTransport(migration_directory)
+
+    results = queue.Queue()
+    try:
+      _run_island(self._island, island_count, island_params,
+                  self._operator_config, self._fitness_cache.max_size,
+                  migration_config, transport, island_seed, results)
+    finally:
+      transport.close()
+
+    island, error, outcome = results.get()
+    if error is not None:
+      raise Exception('Island ' + str(island) + ' failed:\n' + error)
+    return {island: outcome}
+
+  ## Waits for every island to report back on the results queue, returning a
+  ## dictionary of island -> (error of its best bike, its best bikes, fitness
+  ## cache hits, fitness cache misses). Raises an exception if any island
+  ## fails.
+  def _collect_island_outcomes(self, islands, results):
+    outcomes = {}
+    while len(outcomes) < len(islands):
+      try:
+        island, error, outcome = results.get(timeout=1.0)
+      except queue.Empty:
+        for island, island_process in enumerate(islands):
+          if island not in outcomes and island_process.exitcode is not None:
+            raise Exception('Island ' + str(island) + ' exited without a result')
+        continue
+
+      if error is not None:
+        raise Exception('Island ' + str(island) + ' failed:\n' + error)
+      outcomes[island] = outcome
+    return outcomes
+
+## Evolves a single island. This runs inside the island's own process, and puts
+## a tuple of (island, error, outcome) on the results queue when it finishes,
+## where error is the traceback of a failed island (or None) and outcome is the
+## tuple of (error of the best bike, best bikes, fitness cache hits, fitness
+## cache misses) of a successful one.
+def _run_island(island, island_count, simulation_params, operator_config,
+                fitness_cache_size, migration_config, transport, island_seed,
+                results):
+  try:
+    migration = IslandMigration(island, island_count,
+                                migration_config['count'],
+                                migration_config['interval'],
+                                migration_config['topology'], transport,
+                                migration_config['seed'],
+                                migration_config['timeout'])
+    search = UnpartitionedGeneticSearch(None, migration)
+    search._simulation_params = simulation_params
+    search._operator_config = operator_config
+    search._fitness_cache = FitnessCache(fitness_cache_size)
+    search._rng = np.random.default_rng(np.random.SeedSequence(island_seed,
+                                                               spawn_key=(island,)))
+
+    best_bikes = []
+    run_error = search._run_single_simulation(simulation_params, best_bikes)
+    results.put((island, None, (run_error, best_bikes,
+                                search._fitness_cache.hits,
+                                search._fitness_cache.misses)))
+  except BaseException:
+    results.put((island, traceback.format_exc(), None))
+
+## Prints the usage string to stdout.
+def print_usage():
+    print('Improper arguments!\n'
+          'Run as python3 island_genetic_search.py <output_filename>'
+          ' <ga_log_filename> <ga_config_file.txt> <sample_count>'
+          ' <target_control_sensitivity.txt> <bike_params.txt>  <rider_params>'
+          ' [--resume] [--checkpoint <checkpoint_filename>]'
+          ' [--checkpoint-interval <seconds>]'
+          ' [--evaluation-executor <serial|process|thread>]'
+          ' [--evaluation-workers <count>] [--evaluation-chunk-size <size>]'
+          ' [--sweep-workers <count>] [--seed <seed>]'
+          ' [--config-bundle <bundle_filename>] [--no-config-bundle]'
+          ' [--island <island> --island-count <count> [--run-id <run_id>]]'
+          ' [--migration-directory <directory>]\n'
+          '|  output_filename = the file to write the results to\n'
+          '|  ga_log_filename = the name of the output file to dump GA results to\n'
+          '|  ga_config_file.txt = the GA configuration file for this run, which '
+                                  'also holds the island settings (island_count, '
+                                  'migration_interval, migration_count, '
+                                  'migration_topology, migration_transport, '
+                                  'migration_directory and migration_timeout)\n'
+          '|  sample_count = the number optimum bike samples to output\n'
+          '|  target_control_sensitivity.txt = a sensitivity curve that this '
+                                              'model is trying to build towards\n'
+          '|  bike_params.txt = a file containing all the bike params\n'
+          '|  rider_params.txt = one or more files containing rider params\n'
+          '|  --resume = resume from the checkpoint left by an interrupted run\n'
+          '|  --checkpoint = the checkpoint file (default <output_filename>'
+                                                 '.checkpoint)\n'
+          '|  --checkpoint-interval = seconds between checkpoints (default 300)\n'
+          '|  --evaluation-executor = ignored, each island scores its own '
+                                     'population serially\n'
+          '|  --evaluation-workers = ignored\n'
+          '|  --evaluation-chunk-size = ignored\n'
+          '|  --sweep-workers = processes to spread the runs of the GA config '
+                               'sweep across (default 1, or sweep_workers in '
+                               'the GA config file)\n'
+          '|  --seed = seed for the random number generators, to replay a '
+                      'search (default a fresh seed, which is printed)\n'
+          '|  --config-bundle = the file to keep the parsed config files in, '
+                               'reused while they are unchanged (default one '
+                               'per set of config files in the user cache directory)\n'
+          '|  --no-config-bundle = always parse the config files\n'
+          '|  --island = run only this island (0 to island_count - 1) here, so '
+                        'the islands can be started on several machines. Each '
+                        'one needs the same --seed, config files and --run-id, '
+                        'migration_transport = file and a migration_directory '
+                        'they all share. Each writes the best bikes of its own '
+                        'island to its output_filename\n'
+          '|  --island-count = the number of islands started with --island\n'
+          '|  --run-id = names the search in the migration_directory, so '
+                        'searches sharing it stay apart (default islands)\n'
+          '|  --migration-directory = the migration_directory, overriding the '
+                                     'GA config file (which only takes plain '
+                                     'names)\n')
+
+def main():
+  try:
+    ## Pull the optional arguments out before parsing the positional ones.
+    command_line_args = list(sys.argv)
+    build_checkpoint = pop_checkpoint_options(command_line_args)
+    ga_config_overrides = pop_evaluation_options(command_line_args)
+    seed = pop_seed(command_line_args)
+    build_config_bundle = pop_config_bundle_options(command_line_args)
+    island = pop_option(command_line_args, '--island')
+    island_count = pop_option(command_line_args, '--island-count')
+    run_id = pop_option(command_line_args, '--run-id', 'islands')
+    migration_directory = pop_option(command_line_args, '--migration-directory')
+    if migration_directory is not None:
+      ga_config_overrides['migration_directory'] = [migration_directory]
+
+    if len(command_line_args) < 8:
+      print_usage()
+      raise Exception()
+
+    ## Parse the command line argumements.
+    simulation_params, output_filename, ga_log_filename  =\
+      parse_inputs(command_line_args, build_config_bundle)
+
+    ## Options given on the command line take precedence over the GA config file.
+    simulation_params.ga_config.update(ga_config_overrides)
+
+    ## A single island runs its part of every run in order, so the sweep can't
+    ## be spread across processes.
+    if island is not None and\
+       int(simulation_params.ga_config.get('sweep_workers', [1])[0]) > 1:
+      raise Exception('--island can only be used with sweep_workers = 1')
+
+    ## Build the simulation object.
+    ga_search = IslandGeneticSearch(build_checkpoint(output_filename), seed=seed,
+                                    island=island, island_count=island_count,
+                                    run_id=run_id)
+    print('Seed: ' + str(ga_search.seed))
+
+    ## Run the simulation and get back the best bikes.
+    start_time = time.time()
+    best_bikes_overall = ga_search.run(simulation_params, ga_log_filename)
+    end_time = time.time()
+    print('Total time: ' + str(end_time - start_time))
+
+    ## Write the top bikes to an output file.
+    try:
+      with open(output_filename, 'w') as output:
+        ## Write all the top bikes to disk.
+        output.write(json.dumps(best_bikes_overall))
+    except IOError:
+      print('Could not open ' + str(output_filename) + ' for writing.')
+      sys.exit(1)
+
+  except BaseException as e:
+    print(str(e))
+
+if __name__ == '__main__':
+    main()
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from ranked_population import RankedPopulation
+
+class IslandMigration:
+  'Migrates the elites of one island of an island model genetic search. Every \
+   migration_interval generations the island sends copies of its \
+   migration_count best bikes to another island and takes in the batch sent \
+   to it, which replaces its worst bikes. On the ring topology island i always \
+   sends to island i + 1. On the random topology the islands are shuffled into \
+   a new ring at every migration, with every island drawing the same ring \
+   from the shared seed, so each island still receives exactly one batch.'
+
+  ## The island is this island's number (out of island_count), topology is
+  ## either 'ring' or 'random', transport is the MigrationTransportBase to move
+  ## the migrants with, seed is the seed shared by every island for drawing the
+  ## random topology and timeout is the number of seconds to wait for migrants.
+  def __init__(self, island, island_count, migration_count, migration_interval,
+               topology, transport, seed=0, timeout=600.0):
+    if topology != 'ring' and topology != 'random':
+      raise Exception('migration_topology must be set to ring or random')
+
+    self._island = island
+    self._island_count = island_count
+    self._migration_count = max(0, int(migration_count))
+    self._migration_interval = max(1, int(migration_interval))
+    self._topology = topology
+    self._transport = transport
+    self._seed = seed
+    self._timeout = float(timeout)
+
+  ## Exchanges migrants with the other islands if one is due at the start of
+  ## generation gen, returning the island's ranked_pop (a RankedPopulation)
+  ## after the exchange.
+  def migrate(self, gen, ranked_pop):
+    if gen == 0 or gen % self._migration_interval != 0 or\
+       self._island_count < 2 or self._migration_count == 0:
+      return ranked_pop
+
+    elites = ranked_pop.best(self._migration_count)
+    self._transport.send(self._destination(gen), gen, elites.genomes,
+                         elites.scores)
+    genomes, scores = self._transport.receive(self._island, gen, self._timeout)
+
+    ## The migrants replace the worst bikes on the island.
+    keep = max(0, len(ranked_pop) - len(scores))
+    return RankedPopulation(ranked_pop.bike_params,
+                            np.concatenate((ranked_pop.genomes[:keep], genomes)),
+                            np.concatenate((ranked_pop.scores[:keep], scores)))
+
+  ## Returns the island to send this island's migrants to at generation gen.
+  def _destination(self, gen):
+    if self._topology == 'ring':
+      return (self._island + 1) % self._island_count
+
+    rng = np.random.default_rng(np.random.SeedSequence(self._seed,
+                                                       spawn_key=(gen,)))
+    ring = rng.permutation(self._island_count).tolist()
+    position = ring.index(self._island)
+    return ring[(position + 1) % self._island_count]
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
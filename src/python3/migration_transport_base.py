@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+
+class MigrationTransportBase(object):
+  'Interface for the ways of moving migrants between the islands of an island \
+   model genetic search (queues between local processes, files in a shared \
+   directory, etc.). Each batch of migrants is addressed to an island and \
+   tagged with the generation it migrates at.'
+
+  def __init__(self):
+    pass
+
+  ## Sends a batch of migrants to the island, where genomes is an (individuals
+  ## x genes) array and scores holds the score of each of those individuals.
+  def send(self, island, generation, genomes, scores):
+    raise NotImplementedError('send operation was not defined by subclass.')
+
+  ## Waits up to timeout seconds for the batch of migrants sent to the island
+  ## for the given generation, returning it as a tuple of (genomes, scores).
+  def receive(self, island, generation, timeout):
+    raise NotImplementedError('receive operation was not defined by subclass.')
+
+  ## Releases any resources (such as queues or files) held by the transport.
+  def close(self):
+    pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
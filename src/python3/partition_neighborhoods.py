@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+class PartitionNeighborhoods:
+  'The neighborhood of every distinct point in a population, where a point is \
+   the values of a genome\'s partitioning genes and its neighborhood is the \
+   set of points within the partitioning radius of it. The neighborhoods are \
+   kept up to date as genomes join and leave the population between \
+   generations: points which leave are dropped from their neighbors\' sets \
+   and only the distances to the points which join are measured. RPartition \
+   seeds its partitions from these sets instead of re-measuring the whole \
+   population every generation.'
+
+  ## The partition_attributes are the genes (columns of the genomes) to measure
+  ## distance over, and partition_radius is the partitioning radius.
+  def __init__(self, partition_attributes, partition_radius):
+    self._attributes = list(partition_attributes)
+    self._radius = partition_radius
+
+    ## Mapping of {point --> node}, where a point is a tuple of gene values.
+    self._nodes = {}
+
+    ## Mapping of {node --> set of the nodes within radius of it}.
+    self._neighbors = {}
+
+    self._next_node = 0
+
+  @property
+  def attributes(self):
+    return self._attributes
+
+  @property
+  def radius(self):
+    return self._radius
+
+  def __len__(self):
+    return len(self._nodes)
+
+  ## Returns the set of nodes within radius of the node (which includes the
+  ## node itself).
+  def neighbors(self, node):
+    return self._neighbors[node]
+
+  ## Brings the neighborhoods in line with the genomes (an individuals x genes
+  ## array), removing the points no genome has any more and inserting the
+  ## points which are new. Returns the node of each genome.
+  def update(self, genomes):
+    points = [tuple(point) for point in
+              np.asarray(genomes)[:, self._attributes].tolist()]
+
+    present = set(points)
+    self.remove([point for point in self._nodes if point not in present])
+
+    self.insert(points)
+
+    return [self._nodes[point] for point in points]
+
+  ## Adds the points (tuples of gene values) to the neighborhoods, measuring
+  ## their distances to every point already held and to one another. Points
+  ## which are already held are ignored.
+  def insert(self, points):
+    points = [point for point in dict.fromkeys(points) if point not in self._nodes]
+    if len(points) == 0:
+      return
+
+    new_nodes = []
+    for point in points:
+      self._nodes[point] = self._next_node
+      self._neighbors[self._next_node] = set()
+      new_nodes.append(self._next_node)
+      self._next_node += 1
+
+    all_nodes = np.array(list(self._nodes.values()), dtype=np.int64)
+    all_points = np.array(list(self._nodes.keys()), dtype=np.float64)
+    all_points = all_points.reshape(len(all_nodes), len(self._attributes))
+    new_points = all_points[len(all_nodes) - len(new_nodes):]
+
+    ## Measure the new points against every point in blocks of rows, summing
+    ## the squared distance one attribute at a time in the same order as
+    ## RPartition so the neighborhoods match its partitions exactly.
+    block_size = 256
+    for start in range(0, len(new_nodes), block_size):
+      block = new_points[start:start + block_size]
+      summation = np.zeros((len(block), len(all_points)))
+      for attribute in range(0, len(self._attributes)):
+        difference = block[:, attribute, None] - all_points[None, :, attribute]
+        summation += difference * difference
+
+      rows, columns = np.nonzero(np.sqrt(summation) <= self._radius)
+      for row, neighbor in zip(rows.tolist(), all_nodes[columns].tolist()):
+        node = new_nodes[start + row]
+        self._neighbors[node].add(neighbor)
+        self._neighbors[neighbor].add(node)
+
+  ## Drops the points (tuples of gene values) from the neighborhoods. Points
+  ## which aren't held are ignored.
+  def remove(self, points):
+    for point in points:
+      node = self._nodes.pop(point, None)
+      if node is None:
+        continue
+
+      for neighbor in self._neighbors.pop(node):
+        if neighbor != node:
+          self._neighbors[neighbor].discard(node)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
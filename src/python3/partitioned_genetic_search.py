@@ -2,120 +2,85 @@
 
 import copy
 import json
-import random
 import sys
 import time
 
 from bike import Bike
-from bike_search_base import BikeSearchBase
+from checkpoint import pop_checkpoint_options
+from command_line_options import pop_seed
+from config_bundle import load_config_files, pop_config_bundle_options
 from config_parser import Parser
+from genetic_search_base import GeneticSearchBase, pop_evaluation_options
+from partition_neighborhoods import PartitionNeighborhoods
 from partitioned_genetic_operators import PartitionedGeneticOperators
+from population import Population, genome_to_indexes
 from r_partition import RPartition
 from simulation_params import SimulationParams
 
-class PartitionedGeneticSearch(BikeSearchBase):
+class PartitionedGeneticSearch(GeneticSearchBase):
   'Class to implement partitioned genetic algorithm bike search.'
 
-  def __init__(self):
-    self._simulation_params = {}
-    self._ga_log_filename = ''
-
-  ## Runs a genetic algorithm simulation given the specified parameters and
-  ## returns the partition set containing the best bikes.
-  def run(self, simulation_params, ga_log_filename):
-    self._simulation_params = copy.deepcopy(simulation_params)
-    self._ga_log_filename = ga_log_filename
-    return self._run_full_simulation()
-
-  ## Appends the follow header contents to the output_string:
-  ##
-  ##  ---
-  ##  num_runs = #
-  ##  selection_percentage = #
-  ##  cross_over_percentage = #
-  ##  mutation_percentage = #
-  ##  cross_over_gene_count = #
-  ##  mutation_gene_count = #
-  ##  Run Data [gen_count, pop_size, error, runtime]
-  def _add_ga_config_header(self, current_ga_config, num_runs):
-    output_string = '---\n'
-    output_string += 'num_runs = ' + str(num_runs) + '\n'
-    output_string += 'selection_percentage = ' +\
-                     str(current_ga_config['selection_percentage']) + '\n'
-    output_string += 'cross_over_percentage = ' +\
-                     str(current_ga_config['cross_over_percentage']) + '\n'
-    output_string += 'mutation_percentage = ' +\
-                     str(current_ga_config['mutation_percentage']) + '\n'
-    output_string += 'cross_over_gene_count = ' +\
-                     str(current_ga_config['cross_over_gene_count']) + '\n'
-    output_string += 'mutation_gene_count = ' +\
-                     str(current_ga_config['mutation_gene_count']) + '\n'
-    output_string += 'Run Data [gen_count, pop_size, error, runtime]\n'
-    return output_string
-
-  ## Adds bikes to the population which are randomly chosen from the possible
-  ## bike space.
-  def _add_random_bikes_to_pop(self, population, num_bikes_to_add):
-    bike = Bike()
-
-    for count in range(0, int(num_bikes_to_add)):
-      ## Create a random bike and add its indexed array to the population.
-      population.append(bike.generate_random_bike(self._simulation_params.bike_params))
-
-  ## Ranks all the bikes in the unranked_bike_params_population, putting each
-  ## bike_param from the population into the ranked_population as follows:
-  ## 
-  ##    rank --> bike_params for a single bike
-  def _rank_bikes_by_score(self, unranked_bike_params_population, ranked_population):
-    bike = Bike() 
-
-    for single_bike_params_indexes in unranked_bike_params_population:
-      ## Configure the bike with the current geometry.
-      bike.update_geometry_from_indexes(self._simulation_params.bike_params,
-                                        single_bike_params_indexes)
-
-      ## Get the score for the bike as a whole based on the input riders.
-      score = bike.compute_error(self._simulation_params.riders,
-                                 self._simulation_params.target_control_sensitivity,
-                                 self._simulation_params.top_speed)
-
-      ## Add the current bike's to the old_poperation.
-      ranked_population[score] = single_bike_params_indexes
+  ## See GeneticSearchBase for the checkpoint and seed.
+  def __init__(self, checkpoint=None, seed=None):
+    GeneticSearchBase.__init__(self, checkpoint, seed)
 
   ## Runs the genetic algorithm simulation based on what the current member
   ## variables are for this object.
-  def _run_single_simulation(self, simulation_params, best_bikes):
+  def _run_single_simulation(self, simulation_params, best_bikes,
+                             resume_state=None):
     ## Grab initial references
     bike_params = simulation_params.bike_params
     ga_config = simulation_params.ga_config
     score = float('inf')
 
-    ## Build the dictionaries to hold the old and the new bike generations.
-    new_pop = []
-    selected_pop = []
+    ## Build the populations to hold the old and the new bike generations.
+    new_pop = Population(bike_params)
+    selected_pop = Population(bike_params)
 
     ## Create a bike to act as a container for building other bikes.
     bike = Bike()
 
     ## Create a GA object.
     pop_size = ga_config['population_size']
-    ga_operators = PartitionedGeneticOperators(pop_size)
+    ga_operators = self._build_genetic_operators(PartitionedGeneticOperators, pop_size)
+
+    first_gen = 0
 
-    ## Populate the new_pop with a random set of of bikes.
-    self._add_random_bikes_to_pop(new_pop, pop_size)
+    ## Decides when the run has stopped improving.
+    early_stopping = self._build_early_stopping(ga_config)
 
-    ## Create a dictionary for ranking the populations.
-    ranked_pop = {}
-    
-    ## Partitioning object.
-    r_partition = RPartition()
+    ## Partitioning object, which partitions the genomes on the genes of the
+    ## partitioning attributes.
+    r_partition = RPartition(simulation_params.partitioning_engine)
+    partitioning_genes = [new_pop.gene_index(attribute) for attribute in
+                          simulation_params.partitioning_attributes]
 
-    ## Rank all the bikes.
-    self._rank_bikes_by_score(new_pop, ranked_pop)
+    ## With incremental updates the neighborhoods of the bikes are kept from one
+    ## generation to the next, so only the new bikes are measured.
+    neighborhoods = None
+    if simulation_params.partitioning_update == 'incremental':
+      neighborhoods = PartitionNeighborhoods(partitioning_genes,
+                                             simulation_params.partitioning_radius)
+    elif simulation_params.partitioning_update != 'rebuild':
+      raise Exception('update must be set to rebuild or incremental')
 
-    ## Add the ranked_pop to the initial set of partitions.
-    partitions = []
-    partitions.append(ranked_pop)
+    if resume_state is None:
+      ## Populate the new_pop with a random set of of bikes.
+      self._add_random_bikes_to_pop(new_pop, pop_size)
+
+      ## Rank all the bikes.
+      ranked_pop = self._rank_bikes_by_score(new_pop)
+
+      ## Add the ranked_pop to the initial set of partitions.
+      partitions = []
+      partitions.append(ranked_pop)
+    else:
+      ## Pick the interrupted run back up from the generation it had reached.
+      ranked_pop = resume_state['ranked_pop']
+      partitions = resume_state['partitions']
+      first_gen = resume_state['generation']
+      early_stopping = resume_state['early_stopping']
+      early_stopping.restart_clock()
 
     ## Compute counts for each opertor
     selection_percentage = ga_config['selection_percentage']
@@ -128,7 +93,19 @@ class PartitionedGeneticSearch(BikeSearchBase):
     gen_count = int(ga_config['generation_count'])
 
     ## For each generation
-    for gen in range(0, gen_count):
+    self._stop_generation = gen_count
+    for gen in range(first_gen, gen_count):
+      ## Checkpoint the run between generations.
+      self._save_checkpoint_if_due({'generation': gen,
+                                    'ranked_pop': ranked_pop,
+                                    'partitions': partitions,
+                                    'early_stopping': early_stopping})
+
+      ## Stop the run early once it has converged.
+      if early_stopping.should_stop(ranked_pop.best_score()):
+        self._stop_generation = gen
+        break
+
       ## Update the old population to be the previous one.
       new_pop.clear()
       selected_pop.clear()
@@ -149,7 +126,7 @@ class PartitionedGeneticSearch(BikeSearchBase):
       ## Now add the selected individuals to the new population, while keeping
       ## the selected designs separate so they can be used in the other genetic
       ## operations.
-      new_pop = copy.deepcopy(selected_pop)
+      new_pop = selected_pop.copy()
 
       ## Perform cross_over
       ga_operators.cross_over(selected_pop,
@@ -166,129 +143,35 @@ class PartitionedGeneticSearch(BikeSearchBase):
                           mutation_count)
 
       ## Rank all the bikes.
-      ranked_pop.clear()
-      self._rank_bikes_by_score(new_pop, ranked_pop)
+      ranked_pop = self._rank_bikes_by_score(new_pop)
 
       ## Partition the bikes.
-      partitions = r_partition.partition(ranked_pop,
-                                         simulation_params.partitioning_attributes,
-                                         simulation_params.partitioning_radius,
-                                         'min')
-
-    ## Copy the final list of bike params into the caller's out dictionary, with
-    ## a mapping of each bike_param's error -> bike_param.
+      partitions = r_partition.partition_ranked(ranked_pop,
+                                                partitioning_genes,
+                                                simulation_params.partitioning_radius,
+                                                'min',
+                                                neighborhoods=neighborhoods)
+
+    ## Add the best bike of each partition to the caller's out list, as an
+    ## (error, bike_param) pair, so bikes with the same error are all kept.
     for partition in partitions:
-      if partition:
-        lowest_error = sorted(partition.keys())[0]
-        best_bikes[lowest_error] =\
+      if len(partition) > 0:
+        lowest_error = partition.best_score()
+        best_bikes.append((lowest_error,
           bike.convert_bike_params_from_indexes(bike_params,
-                                                ranked_pop[lowest_error])
+                                                genome_to_indexes(bike_params,
+                                                    partition.genomes[0]))))
 
     ## Return the score for the best bike
-    score = sorted(ranked_pop.keys())[0]
-    return float(score)
-
-  def _run_full_simulation(self):
-    ## Store a copy of the ga_config for later manipulation.
-    ga_config = copy.deepcopy(self._simulation_params.ga_config)
-
-    output_string = ''
-    aggregate_error = 0.0
-
-    ## Container to hold the parameters for each GA config run.
-    current_ga_config = {}
-
-    ## Container to hold the best bike designs at the end of the run.
-    best_bikes_per_run = {}
-
-    ## The number of runs to do per configuration (to gather some sense of
-    ## statistical certainty about the results).
-    num_runs = int(ga_config['num_runs'][0])
-    start_time = time.time()
-    beginning = time.time()
-
-    ## Open the log file once to clear it.
-    ga_log_file = open(self._ga_log_filename, 'w')
-    ga_log_file.close()
-
-    for selection_percentage in ga_config['selection_percentage']:
-      current_ga_config['selection_percentage'] = selection_percentage
-      for cross_over_percentage in ga_config['cross_over_percentage']:
-        current_ga_config['cross_over_percentage'] = cross_over_percentage
-        for mutation_percentage in ga_config['mutation_percentage']:
-          current_ga_config['mutation_percentage'] = mutation_percentage
-          for cross_over_gene_count in ga_config['cross_over_gene_count']:
-            current_ga_config['cross_over_gene_count'] = cross_over_gene_count
-            for mutation_gene_count in ga_config['mutation_gene_count']:
-              current_ga_config['mutation_gene_count'] = mutation_gene_count
-
-              ## Add the initial header to the output_string for this run.
-              output_string = self._add_ga_config_header(current_ga_config,
-                                                         num_runs)
-              for gen_count in ga_config['generation_count']:
-                current_ga_config['generation_count'] = gen_count
-                for pop_size in ga_config['population_size']:
-                  current_ga_config['population_size'] = pop_size
-
-                  ## Add the current GA config to the simulation params so we can
-                  ## run this test configuration.
-                  self._simulation_params.ga_config = copy.deepcopy(current_ga_config)
-
-                  ## Start timing the run.
-                  start = time.time()
-
-                  ## Reset error to 0.0 for the new trial
-                  aggregate_error = 0.0
-                  min_error = float('inf')
-                  max_error = 0
-                  for run in range(0, num_runs):
-                    ## Run the simulation for the given configuration and record
-                    ## the error of the best bike in each case.
-                    run_error = self._run_single_simulation(self._simulation_params,
-                                                            best_bikes_per_run)
-                    if run_error < min_error:
-                      min_error = run_error
-
-                    if run_error > max_error:
-                      max_error = run_error
-
-                    aggregate_error += run_error
-
-                  ## Average the error for each run
-                  avg_error = aggregate_error / num_runs
-
-                  ## Comptute the runtime for this trial
-                  runtime = time.time() - start
-
-                  ## Append that error to the output_string
-                  output_string += str(gen_count) + ',' +\
-                                   str(pop_size) + ',' +\
-                                   str(avg_error) + ',' +\
-                                   str(runtime) + '\n'
-
-                  ## Print the output to the specified file. Do it this way to
-                  ## ensure that if the trial dies part way through we still have
-                  ## some data saved.
-                  ga_log_file = open(self._ga_log_filename, 'a')
-                  ga_log_file.write(output_string)
-                  ga_log_file.close()
-
-              print('Selection %: ' + str(selection_percentage) + ', ' +
-                    'Cross Over %: ' + str(cross_over_percentage) + ', ' +
-                    'Mutation %: ' + str(mutation_percentage) + ' -- ' +
-                    'Runtime: ' + str(time.time() - beginning))
-
-    ## Add final deliminter to the file for later parsing.
-    output_string = '---\n'
-
-    ## Print the output to the specified file.
-    ga_log_file = open(self._ga_log_filename, 'a')
-    ga_log_file.write(output_string)
-    ga_log_file.close()
+    return ranked_pop.best_score()
 
+  ## Partitions the best bikes found across all of the runs, returning a list of
+  ## partitions where each is a list of (error, bike_params) pairs from the best
+  ## to the worst.
+  def _finish_full_simulation(self, best_bikes_per_run):
     ## Partition the final output.
-    r_partition = RPartition()
-    partitions = r_partition.partition(best_bikes_per_run,
+    r_partition = RPartition(self._simulation_params.partitioning_engine)
+    partitions = r_partition.partition_pairs(best_bikes_per_run,
                                  self._simulation_params.partitioning_attributes,
                                  self._simulation_params.partitioning_radius, 'min',
                                  float('inf'))
@@ -297,90 +180,106 @@ class PartitionedGeneticSearch(BikeSearchBase):
     ## Return the partitions to the caller.
     return partitions
 
-  ## Flattens all of the partitions into a single grouping from which 'count'
-  ## number of individuals are randomly selected to be added to 'new_pop'.
+  ## Flattens the feasible (finite scoring) bikes of all of the partitions into
+  ## a single grouping from which 'count' number of individuals are randomly
+  ## selected to be added to 'new_pop'. The partitions can overlap, so a bike in
+  ## several of them only counts once. Fresh random bikes make up any shortfall.
   def _select_random_individuals_from_pop(self, partitions, new_pop, count):
     ## Flatten the partitions.
     all_individuals = {}
     for partition in partitions:
-      for key in partition.keys():
-        all_individuals[key] = partition[key]
-
-    while all_individuals and count > 0:
-      key = random.choice(list(all_individuals.keys()))
-      new_pop.append(all_individuals[key])
-      del all_individuals[key]
-      count -= 1
-      
+      for genome in partition.genomes[:partition.finite_count()].tolist():
+        all_individuals[tuple(genome)] = genome
+
+    genomes = list(all_individuals.values())
+    picks = self._rng.choice(len(genomes), min(int(count), len(genomes)),
+                             replace=False)
+    selected = [genomes[pick] for pick in picks]
+    count -= len(selected)
+
+    new_pop.extend(selected)
     self._add_random_bikes_to_pop(new_pop, count)
 
-def parse_inputs(command_line_args):
+## The build_config_bundle is an optional function from
+## pop_config_bundle_options, which lets the parsed config files be loaded from
+## a bundle saved by an earlier launch.
+def parse_inputs(command_line_args, build_config_bundle=None):
   if len(command_line_args) < 8:
     print_usage()
     raise Exception()
 
-  ## Create a SimulationParams object to hold all the parsed input data.
-  simulation_params = SimulationParams()
-
-  ## Create a Parser to parse the input files.
-  parser = Parser()
-
-  ## Create a SimulationParams object to hold all the parsed input data.
-  simulation_params = SimulationParams()
-
-  ## Create a Parser to parse the input files.
-  parser = Parser()
-
   ## Grab the output filename.
-  output_filename = sys.argv[1]
+  output_filename = command_line_args[1]
 
   ## Grab the name of the output file.
-  ga_log_filename = sys.argv[2]
+  ga_log_filename = command_line_args[2]
 
   ## Grab the name of the genetic algorithm's config file.
-  ga_config_filename = sys.argv[3]
+  ga_config_filename = command_line_args[3]
 
   ## Grab the name of the partitioning config file.
-  partitioning_config_filename = sys.argv[4]
+  partitioning_config_filename = command_line_args[4]
 
   ## Grab the name of the target_control_sensitivity curve file.
-  curve_filename = sys.argv[5]
+  curve_filename = command_line_args[5]
 
   ## Grab the name of the bike_params file.
-  bike_params_filename = sys.argv[6]
+  bike_params_filename = command_line_args[6]
 
   ## Grab rider config filename.
-  rider_config_filename = sys.argv[7]
-
-  ## Parse the genetic algorithm config file.
-  if not parser.parse_genetic_algorithm_config_file(simulation_params.ga_config,
-                                                    ga_config_filename):
-    raise Exception()
-
-  ## Parse the partitioning config file.
-  partitioning_config = {}
-  if not parser.parse_partitioning_config_file(partitioning_config,
-                                               partitioning_config_filename):
-    raise Exception()
-
-  ## Add the partitioning config components to the simulation_params object.
-  simulation_params.partitioning_radius = partitioning_config['radius'][0]
-  simulation_params.partitioning_attributes = copy.deepcopy(partitioning_config['attributes'])
-
-  ## Parse the target control sensitivity curve from the input.
-  if not parser.parse_curve_file(simulation_params.target_control_sensitivity,
-                                 curve_filename):
-    raise Exception()
-
-  ## Parse in the bike_params, resulting in a dictionary of {param -> [values]}.
-  if not parser.parse_bike(simulation_params.bike_params, bike_params_filename):
-    raise Exception
-
-  ## Parse in the rider_params, resulting in a list of [{param -> [values]}].
-  if not parser.parse_riders(simulation_params.riders, rider_config_filename):
-    raise Exception
-
-  simulation_params.top_speed = len(simulation_params.target_control_sensitivity)
+  rider_config_filename = command_line_args[7]
+
+  ## Parses the config files into a new SimulationParams.
+  def parse_config_files():
+    ## Create a SimulationParams object to hold all the parsed input data.
+    simulation_params = SimulationParams()
+
+    ## Create a Parser to parse the input files.
+    parser = Parser()
+
+    ## Parse the genetic algorithm config file.
+    if not parser.parse_genetic_algorithm_config_file(simulation_params.ga_config,
+                                                      ga_config_filename):
+      raise Exception()
+
+    ## Parse the partitioning config file.
+    partitioning_config = {}
+    if not parser.parse_partitioning_config_file(partitioning_config,
+                                                 partitioning_config_filename):
+      raise Exception()
+
+    ## Add the partitioning config components to the simulation_params object.
+    simulation_params.partitioning_radius = partitioning_config['radius'][0]
+    simulation_params.partitioning_attributes = copy.deepcopy(partitioning_config['attributes'])
+    if 'engine' in partitioning_config:
+      simulation_params.partitioning_engine = partitioning_config['engine'][0]
+    if 'update' in partitioning_config:
+      simulation_params.partitioning_update = partitioning_config['update'][0]
+
+    ## Parse the target control sensitivity curve from the input.
+    if not parser.parse_curve_file(simulation_params.target_control_sensitivity,
+                                   curve_filename):
+      raise Exception()
+
+    ## Parse in the bike_params, resulting in a dictionary of {param -> [values]}.
+    if not parser.parse_bike(simulation_params.bike_params, bike_params_filename):
+      raise Exception
+
+    ## Parse in the rider_params, resulting in a list of [{param -> [values]}].
+    if not parser.parse_riders(simulation_params.riders, rider_config_filename):
+      raise Exception
+
+    simulation_params.top_speed = len(simulation_params.target_control_sensitivity)
+    return simulation_params
+
+  ## Load the parsed config files from the bundle if they haven't changed.
+  simulation_params = load_config_files(build_config_bundle,
+                                        'partitioned_genetic_search',
+                                        [ga_config_filename,
+                                         partitioning_config_filename,
+                                         curve_filename, bike_params_filename,
+                                         rider_config_filename],
+                                        parse_config_files)
 
   return simulation_params, output_filename, ga_log_filename
 
@@ -389,24 +288,66 @@ def print_usage():
     print('Improper arguments!\n'
           'Run as python3 partitioned_genetic_search.py <output_filename>'
           ' <ga_log_filename> <ga_config_file.txt> <partitioning_config.txt>'
-          ' <target_control_sensitivity.txt> <bike_params.txt> <rider_params>\n'
+          ' <target_control_sensitivity.txt> <bike_params.txt> <rider_params>'
+          ' [--resume] [--checkpoint <checkpoint_filename>]'
+          ' [--checkpoint-interval <seconds>]'
+          ' [--evaluation-executor <serial|process|thread>]'
+          ' [--evaluation-workers <count>] [--evaluation-chunk-size <size>]'
+          ' [--sweep-workers <count>] [--seed <seed>]'
+          ' [--config-bundle <bundle_filename>] [--no-config-bundle]\n'
           '|  output_filename = the file to write the results to\n'
           '|  ga_log_filename = the name of the output file to dump GA results to\n'
           '|  ga_config_file.txt = the GA configuration file for this run\n'
           '|  partitioning_config.txt = the config file describing the '
-                                        'partitioning parameter values.\n'
+                                        'partitioning parameter values, '
+                                        'optionally with engine = <index|'
+                                        'vectorized> (default index) and '
+                                        'update = <rebuild|incremental> '
+                                        '(default rebuild).\n'
           '|  target_control_sensitivity.txt = a sensitivity curve that this '
                                               'model is trying to build towards\n'
           '|  bike_params.txt = a file containing all the bike params\n'
-          '|  rider_params.txt = one or more files containing rider params\n')
+          '|  rider_params.txt = one or more files containing rider params\n'
+          '|  --resume = resume from the checkpoint left by an interrupted run\n'
+          '|  --checkpoint = the checkpoint file (default <output_filename>'
+                                                 '.checkpoint)\n'
+          '|  --checkpoint-interval = seconds between checkpoints (default 300)\n'
+          '|  --evaluation-executor = how each population is scored (default '
+                                     'serial, or evaluation_executor in the GA '
+                                     'config file)\n'
+          '|  --evaluation-workers = pool size for the process and thread '
+                                    'executors (default the number of CPUs)\n'
+          '|  --evaluation-chunk-size = designs sent to a worker at once '
+                                       '(default 256)\n'
+          '|  --sweep-workers = processes to spread the runs of the GA config '
+                               'sweep across (default 1, or sweep_workers in '
+                               'the GA config file)\n'
+          '|  --seed = seed for the random number generators, to replay a '
+                      'search (default a fresh seed, which is printed)\n'
+          '|  --config-bundle = the file to keep the parsed config files in, '
+                               'reused while they are unchanged (default one '
+                               'per set of config files in the user cache directory)\n'
+          '|  --no-config-bundle = always parse the config files\n')
 
 def main():
   try:
+    ## Pull the optional arguments out before parsing the positional ones.
+    command_line_args = list(sys.argv)
+    build_checkpoint = pop_checkpoint_options(command_line_args)
+    ga_config_overrides = pop_evaluation_options(command_line_args)
+    seed = pop_seed(command_line_args)
+    build_config_bundle = pop_config_bundle_options(command_line_args)
+
     ## Parse the command line arguments.
-    simulation_params, output_filename, ga_log_filename = parse_inputs(sys.argv)
+    simulation_params, output_filename, ga_log_filename =\
+      parse_inputs(command_line_args, build_config_bundle)
+
+    ## Options given on the command line take precedence over the GA config file.
+    simulation_params.ga_config.update(ga_config_overrides)
 
     ## Build the simulation object.
-    ga_search = PartitionedGeneticSearch()
+    ga_search = PartitionedGeneticSearch(build_checkpoint(output_filename), seed=seed)
+    print('Seed: ' + str(ga_search.seed))
 
     ## Run the simulation and get back the resulting partitions.
     start_time = time.time()
@@ -417,12 +358,9 @@ def main():
     ## Write the top bike from each partition to output file.
     try:
       with open(output_filename, 'w') as output:
-        best_bikes_overall = {}
-        counter = 0
-        for partition in partitions:
-          error = sorted(partition.keys())[0]
-          ## Add the error -> bike_param mapping to the output dictionary.
-          best_bikes_overall[error] = partition[error]
+        ## Add the best (error, bike_param) pair of each partition to the
+        ## output list.
+        best_bikes_overall = [partition[0] for partition in partitions]
 
         output.write(json.dumps(best_bikes_overall))
 
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+
+import concurrent.futures
+import numpy as np
+import os
+
+from batch_bike_evaluator import BatchBikeEvaluator
+from evaluation_executor_base import EvaluationExecutorBase
+
+class PoolEvaluationExecutor(EvaluationExecutorBase):
+  'Splits the population into chunks and scores them across a pool of worker \
+   processes or threads. The pool is started on first use and then kept for \
+   every later population until shutdown() is called, so the cost of starting \
+   the workers is only paid once per search.'
+
+  ## The pool_type is either 'process' or 'thread', num_workers is the size of
+  ## the pool (defaulting to the number of CPUs) and chunk_size is the number of
+  ## designs sent to a worker at once.
+  def __init__(self, pool_type='process', num_workers=None, chunk_size=256):
+    EvaluationExecutorBase.__init__(self)
+    if pool_type != 'process' and pool_type != 'thread':
+      raise Exception('pool_type must be set to process or thread')
+
+    if num_workers is None:
+      num_workers = os.cpu_count() or 1
+
+    self._pool_type = pool_type
+    self._num_workers = max(1, int(num_workers))
+    self._chunk_size = max(1, int(chunk_size))
+    self._pool = None
+
+  @property
+  def pool_type(self):
+    return self._pool_type
+
+  @property
+  def num_workers(self):
+    return self._num_workers
+
+  @property
+  def chunk_size(self):
+    return self._chunk_size
+
+  ## Returns the error of each design in designs, in the same order as the
+  ## designs.
+  def compute_errors(self, designs, riders, target_control_sensitivity,
+                     top_speed):
+    if len(designs) == 0:
+      return np.empty(0)
+
+    if self._pool is None:
+      if self._pool_type == 'process':
+        self._pool = concurrent.futures.ProcessPoolExecutor(self._num_workers)
+      else:
+        self._pool = concurrent.futures.ThreadPoolExecutor(self._num_workers)
+
+    chunks = [designs[start:start + self._chunk_size]
+              for start in range(0, len(designs), self._chunk_size)]
+    count = len(chunks)
+    errors = self._pool.map(_compute_errors, chunks,
+                            [riders] * count,
+                            [target_control_sensitivity] * count,
+                            [top_speed] * count)
+    return np.concatenate(list(errors))
+
+  ## Shuts down the worker pool (a later compute_errors starts a new one).
+  def shutdown(self):
+    if self._pool is not None:
+      self._pool.shutdown()
+      self._pool = None
+
+## Scores a single chunk of designs. This runs inside the workers.
+def _compute_errors(designs, riders, target_control_sensitivity, top_speed):
+  evaluator = BatchBikeEvaluator()
+  return evaluator.compute_errors(designs, riders, target_control_sensitivity,
+                                  top_speed)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
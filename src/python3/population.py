@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+class Population:
+  'A population of bikes for the genetic searches, stored as a 2-D integer \
+   array with one row (genome) per individual and one column (gene) per \
+   param. Each gene is the index into bike_params[param] of that param\'s \
+   value, with the genes in bike_params order. Individuals are only turned \
+   into {param -> index} dictionaries at the edges of the search.'
+
+  ## The bike_params is the dictionary of {param -> [values]} the genes index
+  ## into, and genomes is an optional (individuals x genes) array (or list of
+  ## rows) to start the population with.
+  def __init__(self, bike_params, genomes=None):
+    self._bike_params = bike_params
+    self._gene_names = list(bike_params.keys())
+    self._radixes = np.array([len(bike_params[name]) for name in self._gene_names],
+                             dtype=np.int64)
+
+    if genomes is None:
+      genomes = np.empty((0, len(self._gene_names)), dtype=np.int64)
+    self._genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, len(self._gene_names))
+
+  @property
+  def bike_params(self):
+    return self._bike_params
+
+  @property
+  def gene_names(self):
+    return self._gene_names
+
+  ## The number of values each gene can take.
+  @property
+  def radixes(self):
+    return self._radixes
+
+  ## The (individuals x genes) array of genomes.
+  @property
+  def genomes(self):
+    return self._genomes
+
+  def __len__(self):
+    return len(self._genomes)
+
+  ## Returns the genome of a single individual (a row of the genomes array).
+  def __getitem__(self, individual):
+    return self._genomes[individual]
+
+  def __iter__(self):
+    return iter(self._genomes)
+
+  ## Returns the column of the genomes array holding the given param's gene.
+  def gene_index(self, param):
+    return self._gene_names.index(param)
+
+  ## Returns a copy of this population.
+  def copy(self):
+    return Population(self._bike_params, self._genomes.copy())
+
+  ## Returns a new population holding the given individuals (row numbers) of
+  ## this population.
+  def take(self, individuals):
+    return Population(self._bike_params,
+                      self._genomes[np.asarray(individuals, dtype=np.int64)])
+
+  ## Empties the population.
+  def clear(self):
+    self._genomes = self._genomes[:0]
+
+  ## Adds individuals to the end of the population, where genomes is either
+  ## another Population or an (individuals x genes) array (or list of rows).
+  def extend(self, genomes):
+    if isinstance(genomes, Population):
+      genomes = genomes.genomes
+    genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, len(self._gene_names))
+    if len(genomes) > 0:
+      self._genomes = np.concatenate((self._genomes, genomes))
+
+  ## Adds count individuals with randomly chosen genes to the population, drawn
+  ## from the NumPy random Generator rng.
+  def add_random(self, count, rng):
+    count = max(0, int(count))
+    self.extend(rng.integers(0, self._radixes,
+                             size=(count, len(self._gene_names))))
+
+  ## Returns each individual as a hashable tuple of its genes.
+  def keys(self):
+    return [tuple(genome) for genome in self._genomes.tolist()]
+
+  ## Returns the population as a list of {param -> index} dictionaries.
+  def to_indexes(self):
+    return [genome_to_indexes(self._bike_params, genome)
+            for genome in self._genomes]
+
+## Converts a single genome (a row of a Population's genomes) into a dictionary
+## of {param -> index into bike_params[param]}.
+def genome_to_indexes(bike_params, genome):
+  single_bike_params_indexes = {}
+  for param, index in zip(bike_params.keys(), genome):
+    single_bike_params_indexes[param] = int(index)
+  return single_bike_params_indexes
+
+## Builds a Population from a list of {param -> index into bike_params[param]}
+## dictionaries.
+def population_from_indexes(bike_params, single_bike_params_indexes_list):
+  genomes = [[single_bike_params_indexes[param] for param in bike_params]
+             for single_bike_params_indexes in single_bike_params_indexes_list]
+  return Population(bike_params, genomes)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+
+import multiprocessing
+import queue
+
+from migration_transport_base import MigrationTransportBase
+
+class QueueMigrationTransport(MigrationTransportBase):
+  'Moves migrants between island processes on the same machine through one \
+   multiprocessing queue per island. Batches can arrive out of generation \
+   order (from different senders), so each island holds on to early batches \
+   until it reaches their generation.'
+
+  ## The island_count is the number of islands to make a queue for. The
+  ## transport has to be built before the island processes are started.
+  def __init__(self, island_count):
+    MigrationTransportBase.__init__(self)
+    self._queues = [multiprocessing.Queue() for island in range(0, island_count)]
+    self._pending = {}
+
+  ## Sends a batch of migrants to the island.
+  def send(self, island, generation, genomes, scores):
+    self._queues[island].put((generation, genomes, scores))
+
+  ## Waits up to timeout seconds for the island's batch of migrants for the
+  ## given generation.
+  def receive(self, island, generation, timeout):
+    while generation not in self._pending:
+      try:
+        sent_generation, genomes, scores = self._queues[island].get(timeout=timeout)
+      except queue.Empty:
+        raise Exception('Island ' + str(island) + ' timed out waiting for '
+                        'migrants at generation ' + str(generation))
+      self._pending[sent_generation] = (genomes, scores)
+    return self._pending.pop(generation)
+
+  ## Closes the queues.
+  def close(self):
+    for migration_queue in self._queues:
+      migration_queue.close()
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
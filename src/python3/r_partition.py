@@ -2,34 +2,57 @@
 
 import copy
 import math
+import numpy as np
 from r_partition_base import RPartitionBase
+from radius_grid_index import RadiusGridIndex
 
 class RPartition(RPartitionBase):
   'Class to implement the RPartition algorithm. Note that this implementation \
    uses Euclidean distance to compute the distance between different data \
-   points, & uses the average data_points score as the partition threshold.'
+   points, & uses the average data_points score as the partition threshold. \
+   Partitions are built by one of two engines which give the same partitions: \
+   the index engine compares each seed against the nearby points of a grid \
+   index, and the vectorized engine packs the points into an array and \
+   measures the distance from each seed to every point at once with NumPy.'
 
-  def __init__(self):
+  ## The engine is either 'index' or 'vectorized' (see above).
+  def __init__(self, engine='index'):
     RPartitionBase.__init__(self)
 
+    if engine != 'index' and engine != 'vectorized':
+      raise Exception('engine must be set to index or vectorized')
+
+    self._engine = engine
+
+  @property
+  def engine(self):
+    return self._engine
+
   ## Parses data_points (which is a mapping of {score --> {attributes}}, and
   ## creates a new dictionary of {score --> {attribute}} which contains members
   ## of the input data_points that are within the specified partition_radius from
   ## the partition_seed_score. Note that this method computes the distance between
   ## points using the Euclidean distance, and only computes this distance using
   ## the attributes specified in the partition_attributes parameter.
-  ## Returns the resulting dictionary (the partition) to the caller.
+  ## Returns the resulting dictionary (the partition) to the caller. The
+  ## spatial_index is an optional RadiusGridIndex of the data_points, which
+  ## limits the points compared to the ones near the seed.
   def _build_partition_around_seed(self, data_points, partition_seed_score,
-                                 partition_attributes, partition_radius):
+                                 partition_attributes, partition_radius,
+                                 spatial_index=None):
     ## The partition to fill and return to the caller.
     partition = {}
 
     ## Begin by getting the seed point for the partition.
     partition_seed_point = data_points[partition_seed_score]
 
-    ## Iterate over all data_points, comparing the distance between each point
-    ## and the partition's seed point.
-    for score, point in data_points.items():
+    ## Iterate over all data_points (or the ones the index says are close),
+    ## comparing the distance between each point and the partition's seed point.
+    candidates = data_points.items()
+    if spatial_index is not None:
+      candidates = spatial_index.candidates(partition_seed_point)
+
+    for score, point in candidates:
       distance = self._compute_euclidean_distance(point,
                                                   partition_seed_point,
                                                   partition_attributes)
@@ -115,31 +138,216 @@ class RPartition(RPartitionBase):
     ordered_candidate_scores = self._compute_ordered_candidate_scores(scores,
                                                                 threshold,
                                                                 min_max)
+    return self._partition_candidates(data_points, ordered_candidate_scores,
+                                      partition_attributes, partition_radius)
+
+  ## Performs the same partitioning as partition on a RankedPopulation, where
+  ## the partition_attributes are the genes (columns of the genomes) to measure
+  ## distance over. Partitions are seeded from the best ranked candidate on,
+  ## and bikes with the same score are kept apart rather than colliding on it.
+  ##
+  ## The neighborhoods are an optional PartitionNeighborhoods kept across calls
+  ## (over the same partition_attributes and partition_radius). They are
+  ## updated to the ranked_pop's genomes and the partitions are read from them,
+  ## so only the bikes that are new since the last call are measured. Either
+  ## way the partitions are the same.
+  ##
+  ## Outputs a list of partitions, where each partition is a RankedPopulation of
+  ## the bikes that are within partition_radius distance from its seed.
+  def partition_ranked(self, ranked_pop, partition_attributes, partition_radius,
+                       min_max, threshold_factor=0.50, neighborhoods=None):
+    scores = ranked_pop.scores.tolist()
+    threshold = self._compute_average_score(scores, threshold_factor)
+
+    ## The data points are keyed by rank, which already orders them by score.
+    if min_max == 'min':
+      ordered_candidates = [rank for rank in range(0, len(scores))
+                            if scores[rank] <= threshold]
+    elif min_max == 'max':
+      ordered_candidates = [rank for rank in reversed(range(0, len(scores)))
+                            if scores[rank] >= threshold]
+    else:
+      raise AttributeError('min_max must be \'min\' or \'max\'.')
+
+    if neighborhoods is not None:
+      if neighborhoods.attributes != list(partition_attributes) or\
+         neighborhoods.radius != partition_radius:
+        raise Exception('The neighborhoods were built over different '
+                        'partitioning attributes or radius')
+      return self._partition_neighborhoods(ranked_pop, ordered_candidates,
+                                           neighborhoods)
+
+    ## The genomes are already an array, so the vectorized engine can measure
+    ## distances over the partitioning genes directly.
+    if self._engine == 'vectorized':
+      points = ranked_pop.genomes[:, partition_attributes].astype(np.float64)
+      partitions = self._partition_positions(points, ordered_candidates,
+                                             partition_radius)
+      return [ranked_pop.take(members) for members in partitions]
+
+    data_points = dict(enumerate(ranked_pop.genomes.tolist()))
+    partitions = self._partition_candidates(data_points, ordered_candidates,
+                                            partition_attributes,
+                                            partition_radius)
+    return [ranked_pop.take(list(partition.keys())) for partition in partitions]
+
+  ## Performs the same partitioning as partition on a list of (score, point)
+  ## pairs, where each point is a dictionary of attribute --> value. Partitions
+  ## are seeded from the best candidate on, and points with the same score are
+  ## kept apart rather than colliding on it.
+  ##
+  ## Outputs a list of partitions, where each partition is a list of the
+  ## (score, point) pairs within partition_radius distance from its seed, from
+  ## the best to the worst.
+  def partition_pairs(self, pairs, partition_attributes, partition_radius,
+                      min_max, threshold_factor=0.50):
+    scores = [score for score, point in pairs]
+    threshold = self._compute_average_score(scores, threshold_factor)
+
+    ## The data points are keyed by position, and the candidates are ordered
+    ## by score with ties left in the order they were given.
+    if min_max == 'min':
+      ordered_candidates = [position for position in range(0, len(scores))
+                            if scores[position] <= threshold]
+    elif min_max == 'max':
+      ordered_candidates = [position for position in range(0, len(scores))
+                            if scores[position] >= threshold]
+    else:
+      raise AttributeError('min_max must be \'min\' or \'max\'.')
+    ordered_candidates.sort(key=lambda position: scores[position],
+                            reverse=(min_max == 'max'))
+
+    data_points = {position: point for position, (score, point)
+                   in enumerate(pairs)}
+    partitions = self._partition_candidates(data_points, ordered_candidates,
+                                            partition_attributes,
+                                            partition_radius)
+    return [[pairs[position] for position
+             in sorted(sorted(partition.keys()),
+                       key=lambda position: scores[position],
+                       reverse=(min_max == 'max'))]
+            for partition in partitions]
+
+  ## Partitions the ranked_pop around each of the ordered_candidates ranks in
+  ## turn, skipping candidates which have already been taken into a partition,
+  ## where each partition is read from the neighborhood of its seed. Bikes which
+  ## share their partitioning genes share a neighborhood. Returns the list of
+  ## partitions.
+  def _partition_neighborhoods(self, ranked_pop, ordered_candidates,
+                               neighborhoods):
+    rank_nodes = neighborhoods.update(ranked_pop.genomes)
+
+    ## Mapping of {node --> ranks of the bikes at that node}.
+    node_ranks = {}
+    for rank, node in enumerate(rank_nodes):
+      node_ranks.setdefault(node, []).append(rank)
+
+    partitions = []
+    consumed = set()
+    for partition_seed in ordered_candidates:
+      seed_node = rank_nodes[partition_seed]
+      if seed_node in consumed:
+        continue
+
+      members = neighborhoods.neighbors(seed_node)
+      consumed.update(members)
+
+      partition = []
+      for node in members:
+        partition.extend(node_ranks[node])
+      partitions.append(ranked_pop.take(partition))
+
+    return partitions
+
+  ## Partitions the data_points (a mapping of {key --> {attributes}}) around
+  ## each of the ordered_candidates keys in turn, skipping candidates which
+  ## have already been taken into a partition. Returns the list of partitions.
+  def _partition_candidates(self, data_points, ordered_candidates,
+                            partition_attributes, partition_radius):
+    if self._engine == 'vectorized':
+      return self._partition_candidates_vectorized(data_points,
+                                                   ordered_candidates,
+                                                   partition_attributes,
+                                                   partition_radius)
+
     ## Resultant partitions to output.
     partitions = []
 
-    ## While there are still candidates to partition, partition.
-    while ordered_candidate_scores:
-      ## Get the next score to investiage.
-      partition_seed_score = ordered_candidate_scores.pop(0)
+    ## Index the points so each partition only has to look at the points near
+    ## its seed.
+    spatial_index = RadiusGridIndex(data_points, partition_attributes,
+                                    partition_radius)
 
-      ## Build the partition around the seed_score.
+    ## Candidates which have been included in a partition. This prevents us
+    ## from partitioning on points that have already been "consumed" by another
+    ## partition.
+    consumed = set()
+
+    ## Partition around each candidate that is still left, in order.
+    for partition_seed in ordered_candidates:
+      if partition_seed in consumed:
+        continue
+
+      ## Build the partition around the seed.
       partition = self._build_partition_around_seed(data_points,
-                                                partition_seed_score,
+                                                partition_seed,
                                                 partition_attributes,
-                                                partition_radius)
-
-      ## Remove any candidates from the ordered_candidate_scores list if they
-      ## were included in the most recent partition. This prevents us from
-      ## partitioning on points that have already been "consumed" by another
-      ## partition.
-      ordered_candidate_scores = [score for score in ordered_candidate_scores if score not in partition.keys()]
+                                                partition_radius,
+                                                spatial_index)
+      consumed.update(partition.keys())
 
       ## Add this partition to the list of partitions.
       partitions.append(partition)
 
     return partitions
 
+  ## Performs the same partitioning as _partition_candidates by packing the
+  ## data_points into an (points x attributes) array and partitioning on their
+  ## positions in it. Returns the list of partitions.
+  def _partition_candidates_vectorized(self, data_points, ordered_candidates,
+                                       partition_attributes, partition_radius):
+    keys = list(data_points.keys())
+    positions = {key: position for position, key in enumerate(keys)}
+
+    points = np.array([[point[attribute] for attribute in partition_attributes]
+                       for point in data_points.values()], dtype=np.float64)
+    points = points.reshape(len(keys), len(partition_attributes))
+
+    partitions = self._partition_positions(points,
+                                           [positions[candidate] for candidate
+                                            in ordered_candidates],
+                                           partition_radius)
+    return [{keys[member]: data_points[keys[member]] for member in members}
+            for members in partitions]
+
+  ## Partitions the rows of points (an array of points x attributes) around
+  ## each of the ordered_seeds rows in turn, skipping seeds which have already
+  ## been taken into a partition. Returns the list of partitions, each an array
+  ## of the rows within partition_radius of its seed in ascending order.
+  def _partition_positions(self, points, ordered_seeds, partition_radius):
+    partitions = []
+
+    ## Rows which have been included in a partition.
+    consumed = np.zeros(len(points), dtype=bool)
+
+    for partition_seed in ordered_seeds:
+      if consumed[partition_seed]:
+        continue
+
+      ## Sum the squared distance one attribute at a time, in the same order
+      ## as _compute_euclidean_distance, so both engines agree on points which
+      ## sit right on the radius.
+      summation = np.zeros(len(points))
+      for attribute in range(0, points.shape[1]):
+        difference = points[:, attribute] - points[partition_seed, attribute]
+        summation += difference * difference
+
+      members = np.flatnonzero(np.sqrt(summation) <= partition_radius)
+      consumed[members] = True
+      partitions.append(members)
+
+    return partitions
+
 ## Needed so we can import this module into Jupyter notebooks.
 def load_ipython_extension(ipython):
   pass
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+
+import itertools
+import math
+
+class RadiusGridIndex:
+  'Spatial index for finding the data points near a given point. The points \
+   are hashed into a uniform grid of cells a little over radius wide (over \
+   the given attributes), so every point within radius of a query point lies \
+   in the query point\'s cell or one of its neighbours. A query only looks at \
+   those cells rather than at every point. The index only narrows down the \
+   candidates, so the caller still measures the exact distance to each one.'
+
+  ## The data_points are a mapping of {key --> {attributes}}, and the points are
+  ## indexed on the values of their attributes_to_index.
+  def __init__(self, data_points, attributes_to_index, radius):
+    self._attributes = list(attributes_to_index)
+    self._keys = list(data_points.keys())
+    self._points = list(data_points.values())
+
+    ## With too many attributes, checking every neighbouring cell costs more
+    ## than checking every point, so the index just hands back every point.
+    ## The same goes for a radius which takes in every point.
+    self._scan_all = radius == float('inf') or\
+                     3 ** len(self._attributes) >= len(self._points)
+
+    ## Widen the cells a little so rounding in the division can't push a point
+    ## which is exactly radius away two cells over. A radius of 0 only takes
+    ## in points at exactly the same spot, so those are hashed on their values.
+    self._cell_size = None
+    if radius > 0:
+      self._cell_size = radius * (1.0 + 1e-9)
+
+    ## Mapping of {cell --> [positions of the points in that cell]}.
+    self._cells = {}
+    if not self._scan_all:
+      for position, point in enumerate(self._points):
+        self._cells.setdefault(self._cell(point), []).append(position)
+
+  ## Returns the (key, point) pair of every point which might be within radius
+  ## of the point, in the order of the data_points.
+  def candidates(self, point):
+    if self._scan_all:
+      return zip(self._keys, self._points)
+
+    cell = self._cell(point)
+    positions = []
+    if self._cell_size is None:
+      positions.extend(self._cells.get(cell, []))
+    else:
+      for offsets in itertools.product((-1, 0, 1), repeat=len(cell)):
+        neighbour = tuple(index + offset for index, offset in zip(cell, offsets))
+        positions.extend(self._cells.get(neighbour, []))
+    positions.sort()
+    return [(self._keys[position], self._points[position])
+            for position in positions]
+
+  ## Returns the grid cell holding the point.
+  def _cell(self, point):
+    if self._cell_size is None:
+      return tuple(point[attribute] for attribute in self._attributes)
+    return tuple(math.floor(point[attribute] / self._cell_size)
+                 for attribute in self._attributes)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from population import Population
+
+class RankedPopulation:
+  'A population of bikes for the genetic searches along with the score of each \
+   bike, held as parallel score and genome arrays sorted from the best (lowest) \
+   score to the worst. The sort is stable, so bikes with the same score (such \
+   as every infeasible bike, which scores inf) keep their population order \
+   rather than overwriting one another. The best bikes sit at the front of the \
+   arrays, so taking the top k is a slice rather than a re-sort.'
+
+  ## The bike_params is the dictionary of {param -> [values]} the genes index
+  ## into, genomes is an (individuals x genes) array (or Population) and scores
+  ## is the score of each of those individuals.
+  def __init__(self, bike_params, genomes=None, scores=None):
+    self._bike_params = bike_params
+
+    if isinstance(genomes, Population):
+      genomes = genomes.genomes
+    if genomes is None:
+      genomes = np.empty((0, len(bike_params)), dtype=np.int64)
+    if scores is None:
+      scores = []
+
+    genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, len(bike_params))
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    if len(genomes) != len(scores):
+      raise Exception('A ranked population needs one score per genome, got ' +\
+                      str(len(scores)) + ' scores for ' + str(len(genomes)) +\
+                      ' genomes')
+
+    order = np.argsort(scores, kind='stable')
+    self._genomes = genomes[order]
+    self._scores = scores[order]
+
+  @property
+  def bike_params(self):
+    return self._bike_params
+
+  ## The (individuals x genes) array of genomes, from the best to the worst.
+  @property
+  def genomes(self):
+    return self._genomes
+
+  ## The score of each genome, in ascending order.
+  @property
+  def scores(self):
+    return self._scores
+
+  def __len__(self):
+    return len(self._scores)
+
+  ## Returns the best score, or inf if the population is empty.
+  def best_score(self):
+    if len(self._scores) == 0:
+      return float('inf')
+    return float(self._scores[0])
+
+  ## Returns the number of individuals with a finite score. Infeasible bikes
+  ## score inf, so these are the feasible bikes at the front of the ranking.
+  def finite_count(self):
+    return int(np.searchsorted(self._scores, float('inf'), side='left'))
+
+  ## Returns the count best individuals as a new RankedPopulation.
+  def best(self, count):
+    return self._slice(0, max(0, int(count)))
+
+  ## Yields a (score, genome) tuple for each individual, from the best to the
+  ## worst.
+  def items(self):
+    for score, genome in zip(self._scores.tolist(), self._genomes):
+      yield score, genome
+
+  ## Returns a new RankedPopulation holding the given individuals (positions in
+  ## the ranking) of this one.
+  def take(self, individuals):
+    individuals = np.sort(np.asarray(individuals, dtype=np.int64))
+    ranked_population = RankedPopulation(self._bike_params)
+    ranked_population._genomes = self._genomes[individuals]
+    ranked_population._scores = self._scores[individuals]
+    return ranked_population
+
+  ## Removes the count best individuals, returning their genomes as a
+  ## Population.
+  def pop_best(self, count):
+    count = max(0, int(count))
+    population = Population(self._bike_params, self._genomes[:count])
+    self._genomes = self._genomes[count:]
+    self._scores = self._scores[count:]
+    return population
+
+  ## Removes the given individuals (positions in the ranking), returning their
+  ## genomes as a Population in the order they were given.
+  def pop_individuals(self, individuals):
+    individuals = np.asarray(individuals, dtype=np.int64)
+    population = Population(self._bike_params, self._genomes[individuals])
+
+    keep = np.ones(len(self._scores), dtype=bool)
+    keep[individuals] = False
+    self._genomes = self._genomes[keep]
+    self._scores = self._scores[keep]
+    return population
+
+  ## Returns the individuals from start up to (not including) stop as a new
+  ## RankedPopulation.
+  def _slice(self, start, stop):
+    ranked_population = RankedPopulation(self._bike_params)
+    ranked_population._genomes = self._genomes[start:stop]
+    ranked_population._scores = self._scores[start:stop]
+    return ranked_population
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -0,0 +1,196 @@
+#!/usr/bin/python3
+
+import copy
+
+## 95% Male Body Mass Percentages
+BODY_SEGMENT_TO_MASS_PERCENTAGE = {'arm': 0.06,
+                                   'head': 0.07,
+                                   'leg': 0.170,
+                                   'torso': 0.47}
+
+class RiderProfile(object):
+  'Read-only container for a single rider. Holds the rider_params parsed from \
+   the rider config file along with every value that only depends on the \
+   rider (body segment masses, local inertias, limb geometry), so that they \
+   are computed once per rider instead of once per bike fitting.'
+
+  __slots__ = ('_rider_params',
+               '_rider_mass', '_head_diameter', '_torso_length',
+               '_torso_depth', '_torso_width', '_arm_length', '_arm_diameter',
+               '_leg_length', '_leg_diameter',
+               '_m_head', '_m_torso', '_m_arm', '_m_leg',
+               '_head_local_Ixx', '_torso_local_Ixx', '_torso_local_Izz',
+               '_leg_local_Ixx', '_leg_local_Izz', '_arm_local_Ixx',
+               '_arm_local_Izz', '_leg_lateral_offset', '_arm_lateral_offset')
+
+  ## Builds the profile from a dictionary of rider_params (param -> value), as
+  ## produced by Parser.parse_riders. Note that we are assuming that all the
+  ## names below will be present and all their values will be decimal values.
+  def __init__(self, rider_params):
+    self._rider_params = copy.deepcopy(rider_params)
+
+    ## Rider Parameters
+    self._rider_mass     = rider_params['rider_mass']
+    self._head_diameter  = rider_params['head_diameter']
+    self._torso_length   = rider_params['torso_length']
+    self._torso_depth    = rider_params['torso_depth']
+    self._torso_width    = rider_params['torso_width']
+    self._arm_length     = rider_params['arm_length']
+    self._arm_diameter   = rider_params['arm_diameter']
+    self._leg_length     = rider_params['leg_length']
+    self._leg_diameter   = rider_params['leg_diameter']
+
+    ## Compute the mass of each of the rider's body segments.
+    self._m_head  = self._rider_mass * BODY_SEGMENT_TO_MASS_PERCENTAGE['head']
+    self._m_torso = self._rider_mass * BODY_SEGMENT_TO_MASS_PERCENTAGE['torso']
+    self._m_arm   = self._rider_mass * BODY_SEGMENT_TO_MASS_PERCENTAGE['arm']
+    self._m_leg   = self._rider_mass * BODY_SEGMENT_TO_MASS_PERCENTAGE['leg']
+
+    ## Compute the head's inertia about its own CG. Note that we are idealizing
+    ## the head as a sphere (which is where the below equation is coming from).
+    self._head_local_Ixx = (2 / 5.0) * self._m_head *\
+                           ((self._head_diameter / 2) ** 2)
+
+    ## Compute the torso's local inertia values. Note that we are idealizing
+    ## the torso as a cuboid (which is where the below equations come from).
+    self._torso_local_Ixx = (1 / 12.0) * self._m_torso *\
+                            ((self._torso_width ** 2) + (self._torso_length ** 2))
+    self._torso_local_Izz = (1 / 12.0) * self._m_torso *\
+                            ((self._torso_width ** 2) + (self._torso_depth ** 2))
+
+    ## Compute the limbs' local inertia values. Note that we are idealizing the
+    ## legs and arms as cylinders of constant diameter (which is where the below
+    ## equations come from).
+    self._leg_local_Ixx = (1 / 4.0) * self._m_leg *\
+                          ((self._leg_diameter / 2) ** 2) +\
+                          (1 / 12.0) * self._m_leg * (self._leg_length ** 2)
+    self._leg_local_Izz = (1 / 2.0) * self._m_leg * ((self._leg_diameter / 2) ** 2)
+    self._arm_local_Ixx = (1 / 4.0) * self._m_arm *\
+                          ((self._arm_diameter / 2) ** 2) +\
+                          (1 / 12.0) * self._m_arm * (self._arm_length ** 2)
+    self._arm_local_Izz = (1 / 2.0) * self._m_arm * ((self._arm_diameter / 2) ** 2)
+
+    ## Squared sideways distance of each limb's centerline from the bike's
+    ## centerplane, used when shifting the limb inertias to the global x-axis.
+    self._leg_lateral_offset = ((self._torso_width / 2) -\
+                                (self._leg_diameter / 2)) ** 2
+    self._arm_lateral_offset = ((self._torso_width / 2) +\
+                                (self._arm_diameter / 2)) ** 2
+
+  ## Allows the profile to be read like the rider_params dictionary it was built
+  ## from (ie. rider['rider_name']).
+  def __getitem__(self, param):
+    return self._rider_params[param]
+
+  def __contains__(self, param):
+    return param in self._rider_params
+
+  def __str__(self):
+    return str(self._rider_params)
+
+  ## Return a full copy of the rider_params this profile was built from.
+  def rider_params(self):
+    return copy.deepcopy(self._rider_params)
+
+  @property
+  def rider_mass(self):
+    return self._rider_mass
+
+  @property
+  def head_diameter(self):
+    return self._head_diameter
+
+  @property
+  def torso_length(self):
+    return self._torso_length
+
+  @property
+  def torso_depth(self):
+    return self._torso_depth
+
+  @property
+  def torso_width(self):
+    return self._torso_width
+
+  @property
+  def arm_length(self):
+    return self._arm_length
+
+  @property
+  def arm_diameter(self):
+    return self._arm_diameter
+
+  @property
+  def leg_length(self):
+    return self._leg_length
+
+  @property
+  def leg_diameter(self):
+    return self._leg_diameter
+
+  @property
+  def m_head(self):
+    return self._m_head
+
+  @property
+  def m_torso(self):
+    return self._m_torso
+
+  @property
+  def m_arm(self):
+    return self._m_arm
+
+  @property
+  def m_leg(self):
+    return self._m_leg
+
+  @property
+  def head_local_Ixx(self):
+    return self._head_local_Ixx
+
+  @property
+  def torso_local_Ixx(self):
+    return self._torso_local_Ixx
+
+  @property
+  def torso_local_Izz(self):
+    return self._torso_local_Izz
+
+  @property
+  def leg_local_Ixx(self):
+    return self._leg_local_Ixx
+
+  @property
+  def leg_local_Izz(self):
+    return self._leg_local_Izz
+
+  @property
+  def arm_local_Ixx(self):
+    return self._arm_local_Ixx
+
+  @property
+  def arm_local_Izz(self):
+    return self._arm_local_Izz
+
+  @property
+  def leg_lateral_offset(self):
+    return self._leg_lateral_offset
+
+  @property
+  def arm_lateral_offset(self):
+    return self._arm_lateral_offset
+
+## Returns rider as a RiderProfile, building one if it is still a plain
+## rider_params dictionary.
+def as_rider_profile(rider):
+  if isinstance(rider, RiderProfile):
+    return rider
+  return RiderProfile(rider)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -0,0 +1,196 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+class SamplingDesign:
+  'Builds the designs sampled by the SamplingTuner for any number of \
+   attributes, each with any number of levels (values). A design is a list \
+   of rows, one per run, holding the level (index into the attribute\'s \
+   values) of each attribute. Orthogonal arrays have every pair of levels of \
+   every pair of attributes turn up equally often, and Latin hypercubes \
+   spread a chosen number of runs evenly over the levels of each attribute.'
+
+  ## The level_counts are the number of levels of each attribute.
+  def __init__(self, level_counts):
+    self._level_counts = [int(level_count) for level_count in level_counts]
+
+    for level_count in self._level_counts:
+      if level_count < 1:
+        raise Exception('Every attribute must have at least one level.')
+
+  @property
+  def level_counts(self):
+    return self._level_counts
+
+  ## Returns a strength 2 orthogonal array, built with the Rao-Hamming
+  ## construction over the smallest prime power number of levels q covering
+  ## every attribute: the runs are every vector x of t digits in the finite
+  ## field GF(q), and each attribute is the dot product (in GF(q)) of x with a
+  ## different vector whose first non-zero digit is 1. This gives
+  ## (q^t - 1) / (q - 1) attributes in q^t runs, so t is the smallest (from 2)
+  ## which covers the attributes. Attributes with q levels are exactly
+  ## balanced. An attribute with fewer than q levels has its levels folded
+  ## (taken mod its level count), which only stays balanced if its level count
+  ## divides q. Otherwise its lowest levels turn up in more runs than the rest,
+  ## and the array is not orthogonal (see orthogonal_array_is_balanced). For
+  ## example, [6, 6, 6] is built over q = 7, and level 0 of each attribute is in
+  ## 14 of the 49 runs against 7 for each other level. Attributes with a single
+  ## level stay at it without taking up a vector.
+  ##
+  ## With 5 levels and 3 or 5 attributes these are the squares the tuner used
+  ## to hard code.
+  def orthogonal_array(self):
+    if len(self._level_counts) == 0:
+      return []
+
+    varied = [attribute for attribute, level_count in enumerate(self._level_counts)
+              if level_count > 1]
+    if len(varied) == 0:
+      return [[0] * len(self._level_counts)]
+    attribute_count = len(varied)
+
+    levels, add, multiply =\
+      _galois_field(_smallest_prime_power_at_least(max(self._level_counts + [2])))
+
+    digits = 2
+    while (levels ** digits - 1) // (levels - 1) < attribute_count:
+      digits += 1
+
+    ## The vectors of each attribute, the unit vectors first and then the rest
+    ## in lexicographic order.
+    vectors = []
+    for digit in range(0, digits):
+      vectors.append([int(index == digit) for index in range(0, digits)])
+    for number in range(0, levels ** digits):
+      vector = [(number // levels ** (digits - 1 - index)) % levels
+                for index in range(0, digits)]
+      first_non_zero = [value for value in vector if value != 0][:1]
+      if first_non_zero == [1] and vector not in vectors:
+        vectors.append(vector)
+      if len(vectors) >= attribute_count:
+        break
+    vectors = np.array(vectors[:attribute_count], dtype=np.int64)
+
+    ## Every run, with its first digit changing the fastest.
+    runs = np.arange(0, levels ** digits, dtype=np.int64)
+    runs = (runs[:, None] // levels ** np.arange(0, digits, dtype=np.int64)) % levels
+
+    ## The dot products, summed one digit at a time with the field's tables.
+    columns = np.zeros((len(runs), attribute_count), dtype=np.int64)
+    for digit in range(0, digits):
+      columns = add[columns, multiply[runs[:, digit, None], vectors[None, :, digit]]]
+
+    design = np.zeros((len(runs), len(self._level_counts)), dtype=np.int64)
+    design[:, varied] = columns % np.array([self._level_counts[attribute]
+                                            for attribute in varied],
+                                           dtype=np.int64)
+    return design.tolist()
+
+  ## Returns True if orthogonal_array gives a balanced (true) orthogonal array,
+  ## which is when every level count divides the number of levels q it is built
+  ## over. That holds when all of the level counts are powers of one prime, such
+  ## as [5, 5, 5] or [8, 4, 2], and fails for level counts such as [6, 6, 6] or
+  ## [5, 5, 3].
+  def orthogonal_array_is_balanced(self):
+    prime, exponent = _smallest_prime_power_at_least(max(self._level_counts +
+                                                         [2]))
+    return all((prime ** exponent) % level_count == 0
+               for level_count in self._level_counts)
+
+  ## Returns a Latin hypercube of sample_count runs, drawn from the NumPy random
+  ## Generator rng. Each attribute's column splits [0, 1) into sample_count
+  ## equal strata, draws one point from each in a random order, and maps the
+  ## point onto the attribute's levels, so each level turns up in as close to
+  ## sample_count / levels runs as it can.
+  def latin_hypercube(self, sample_count, rng):
+    sample_count = int(sample_count)
+    if sample_count < 1:
+      raise Exception('A Latin hypercube needs at least one run.')
+
+    design = np.empty((sample_count, len(self._level_counts)), dtype=np.int64)
+    for attribute, level_count in enumerate(self._level_counts):
+      points = (rng.permutation(sample_count) + rng.random(sample_count)) /\
+               sample_count
+      design[:, attribute] = np.minimum((points * level_count).astype(np.int64),
+                                        level_count - 1)
+    return design.tolist()
+
+## Returns the smallest prime power greater than or equal to number, as a tuple
+## of (prime, exponent).
+def _smallest_prime_power_at_least(number):
+  candidate = max(2, int(number))
+  while True:
+    prime = _smallest_prime_factor(candidate)
+    exponent = 0
+    remainder = candidate
+    while remainder % prime == 0:
+      remainder //= prime
+      exponent += 1
+    if remainder == 1:
+      return prime, exponent
+    candidate += 1
+
+## Returns the smallest prime factor of number (which is at least 2).
+def _smallest_prime_factor(number):
+  for divisor in range(2, int(number ** 0.5) + 1):
+    if number % divisor == 0:
+      return divisor
+  return number
+
+## Returns the finite field GF(prime^exponent) of the prime_power (a tuple of
+## (prime, exponent)) as a tuple of (order, add, multiply), where add and
+## multiply are (order x order) tables of the sum and product of two elements.
+## The elements are the numbers 0 to order - 1, with the base prime digits of
+## each being the coefficients (lowest first) of a polynomial over GF(prime),
+## so 0 and 1 are the field's zero and one. Products are taken modulo the
+## first monic polynomial of degree exponent which makes every non-zero
+## element invertible (that is, an irreducible one).
+def _galois_field(prime_power):
+  prime, exponent = prime_power
+  order = prime ** exponent
+
+  elements = np.arange(0, order, dtype=np.int64)
+  digits = (elements[:, None] // prime ** np.arange(0, exponent)) % prime
+  weights = prime ** np.arange(0, exponent)
+  add = ((digits[:, None, :] + digits[None, :, :]) % prime) @ weights
+
+  if exponent == 1:
+    return order, add, np.outer(elements, elements) % prime
+
+  for lower_terms in range(0, order):
+    modulus = [int(digit) for digit in digits[lower_terms]] + [1]
+    multiply = np.array([[_multiply_polynomials(digits[a], digits[b], modulus,
+                                                prime) @ weights
+                          for b in range(0, order)] for a in range(0, order)],
+                        dtype=np.int64)
+    if all(1 in multiply[element] for element in range(1, order)):
+      return order, add, multiply
+
+  raise Exception('No irreducible polynomial of degree ' + str(exponent) +
+                  ' over GF(' + str(prime) + ')')
+
+## Returns the coefficients (lowest first) of the product of the polynomials a
+## and b over GF(prime), reduced modulo the monic polynomial modulus.
+def _multiply_polynomials(a, b, modulus, prime):
+  degree = len(modulus) - 1
+  product = [0] * (2 * degree - 1)
+  for i, a_coefficient in enumerate(a):
+    for j, b_coefficient in enumerate(b):
+      product[i + j] += int(a_coefficient) * int(b_coefficient)
+
+  ## Cancel the terms above the degree from the top down.
+  for power in reversed(range(degree, len(product))):
+    coefficient = product[power] % prime
+    if coefficient != 0:
+      for offset in range(0, degree + 1):
+        product[power - degree + offset] -= coefficient * modulus[offset]
+  return np.array([coefficient % prime for coefficient in product[:degree]],
+                  dtype=np.int64)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -1,11 +1,20 @@
 #!/usr/bin/python3
 
 import copy
+import json
+import math
+import multiprocessing
+import numpy as np
+import queue
 import sys
 import time
+import traceback
 
 from bike import Bike
+from command_line_options import pop_option, pop_seed
+from config_bundle import load_config_files, pop_config_bundle_options
 from config_parser import Parser
+from sampling_design import SamplingDesign
 from partitioned_genetic_search import PartitionedGeneticSearch
 from simulation_params import SimulationParams
 from unpartitioned_genetic_search import UnpartitionedGeneticSearch
@@ -14,51 +23,88 @@ from unpartitioned_genetic_search import UnpartitionedGeneticSearch
 ## that produces the results with the lowest overall error.
 class SamplingTuner():
 
+  ## The seed makes the sampling reproducible, with every cell of the square
+  ## searched with a seed of its own drawn from it (and one is drawn from the
+  ## system's entropy if it's None). The cell_workers is the number of cells of
+  ## the square (or trials of the tuning) to search at once, each in a process
+  ## of its own, and the cell_timeout is the seconds a cell may take before it's
+  ## stopped and marked as failed (or None to let cells take as long as they
+  ## need). With more than one worker or a timeout each cell writes its own GA
+  ## log, named <ga_log_filename>.<cell> (or <ga_log_filename>.trial<trial>).
   def __init__(self, simulation_params, output_filename, ga_log_filename,\
-               ga_platform, sampling_attributes):
+               ga_platform, sampling_attributes, seed=None, cell_workers=1,
+               cell_timeout=None):
     self._simulation_params = copy.deepcopy(simulation_params)
     self._output_filename = output_filename
     self._ga_log_filename = ga_log_filename
     self._ga_platform = ga_platform
     self._sampling_attributes = copy.deepcopy(sampling_attributes)
 
+    if seed is None:
+      seed = np.random.SeedSequence().entropy
+    self._seed = seed
+
+    if int(cell_workers) < 1:
+      raise Exception('cell_workers must be at least 1')
+    if cell_timeout is not None and cell_timeout <= 0:
+      raise Exception('cell_timeout must be greater than 0')
+
+    self._cell_workers = int(cell_workers)
+    self._cell_timeout = cell_timeout
+
+    ## Mapping of {cell -> reason} for the cells of the last square which
+    ## failed.
+    self._failed_cells = {}
+
     ## Set the sample count here arbitrarily
     self._simulation_params.sample_count = 25
 
-  def _build_square(self, num_attributes):
+  ## The seed the tuner was built with, which can be passed to a new tuner to
+  ## replay it.
+  @property
+  def seed(self):
+    return self._seed
+
+  ## The cells of the last square run which failed or timed out, as a mapping
+  ## of {cell -> reason}. Failed cells are left out of the attribute results.
+  @property
+  def failed_cells(self):
+    return self._failed_cells
+
+  ## Builds a search seeded from the tuner's seed and the spawn_key, which is
+  ## (cell,) for a cell (row number) of the square and (1, trial) for a trial
+  ## of the tuning.
+  def _build_search(self, spawn_key):
+    seed = np.random.SeedSequence(self._seed, spawn_key=spawn_key)
+    if self._ga_platform == 'unpartitioned':
+      return UnpartitionedGeneticSearch(seed=seed)
+    return PartitionedGeneticSearch(seed=seed)
+
+  ## Builds the square (the design) to sample, a list of rows holding the index
+  ## into the ga_config values of each sampling attribute. The design is either
+  ## 'orthogonal', for an orthogonal array, or 'latin_hypercube', for a Latin
+  ## hypercube of sample_count rows (by default as many as the orthogonal array
+  ## would have) drawn from the tuner's seed.
+  def _build_square(self, design, sample_count=None):
     ga_config = self._simulation_params.ga_config
-    square = None
-    if num_attributes == 3:
-      square = self._build_3_attribute_square(self._sampling_attributes, ga_config)
-    elif num_attributes == 4:
-      square = self._build_4_attribute_square(self._sampling_attributes, ga_config)
+    sampling_design = SamplingDesign([len(ga_config[attribute]) for attribute
+                                      in self._sampling_attributes])
+
+    if design == 'orthogonal':
+      if not sampling_design.orthogonal_array_is_balanced():
+        print('Warning: the sampling attributes have ' +
+              str(sampling_design.level_counts) + ' values, which are not all '
+              'powers of one prime, so the orthogonal array is unbalanced and '
+              'lower values are sampled more often.')
+      return sampling_design.orthogonal_array()
+    elif design == 'latin_hypercube':
+      if sample_count is None:
+        sample_count = len(sampling_design.orthogonal_array())
+      rng = np.random.default_rng(np.random.SeedSequence(self._seed,
+                                                         spawn_key=(3, 0)))
+      return sampling_design.latin_hypercube(sample_count, rng)
     else:
-      square = self._build_5_attribute_square(self._sampling_attributes, ga_config)
-    return square
-
-  def _build_3_attribute_square(self, sampling_attributes, ga_config):
-    square = [[0, 0, 0], [1, 0, 1], [2, 0, 2], [3, 0, 3], [4, 0, 4],
-              [0, 1, 1], [1, 1, 2], [2, 1, 3], [3, 1, 4], [4, 1, 0],
-              [0, 2, 2], [1, 2, 3], [2, 2, 4], [3, 2, 0], [4, 2, 1],
-              [0, 3, 3], [1, 3, 4], [2, 3, 0], [3, 3, 1], [4, 3, 2],
-              [0, 4, 4], [1, 4, 0], [2, 4, 1], [3, 4, 2], [4, 4, 3]]
-    return square
-
-  def _build_4_attribute_square(self, sampling_attributes, ga_config):
-    square = [[0, 0, 0, 0], [1, 0, 1, 3], [2, 0, 2, 1], [3, 0, 3, 4], [4, 0, 4, 2],
-              [0, 1, 1, 1], [1, 1, 2, 4], [2, 1, 3, 2], [3, 1, 4, 1], [4, 1, 0, 3],
-              [0, 2, 2, 2], [1, 2, 3, 0], [2, 2, 4, 3], [3, 2, 0, 2], [4, 2, 1, 4],
-              [0, 3, 3, 3], [1, 3, 4, 1], [2, 3, 0, 4], [3, 3, 1, 3], [4, 3, 2, 0],
-              [0, 4, 4, 4], [1, 4, 0, 2], [2, 4, 1, 0], [3, 4, 2, 4], [4, 4, 3, 1]]
-    return square
-
-  def _build_5_attribute_square(self, sampling_attributes, ga_config):
-    square = [[0, 0, 0, 0, 0], [1, 0, 1, 1, 1], [2, 0, 2, 2, 2], [3, 0, 3, 3, 3], [4, 0, 4, 4, 4],
-              [0, 1, 1, 2, 3], [1, 1, 2, 3, 4], [2, 1, 3, 4, 0], [3, 1, 4, 0, 1], [4, 1, 0, 1, 2],
-              [0, 2, 2, 4, 1], [1, 2, 3, 0, 2], [2, 2, 4, 1, 3], [3, 2, 0, 2, 4], [4, 2, 1, 3, 0],
-              [0, 3, 3, 1, 4], [1, 3, 4, 2, 0], [2, 3, 0, 3, 1], [3, 3, 1, 4, 2], [4, 3, 2, 0, 3],
-              [0, 4, 4, 3, 2], [1, 4, 0, 4, 3], [2, 4, 1, 0, 4], [3, 4, 2, 1, 0], [4, 4, 3, 2, 1]]
-    return square
+      raise Exception('design must be set to orthogonal or latin_hypercube')
 
   ## Returns a dictionary of {attribute -> [{value, error}]}, that is a
   ## dictionary of attributes names to a list of attribute value to error
@@ -71,19 +117,14 @@ class SamplingTuner():
       attribute_lists.append(copy.deepcopy(ga_config[attribute]))
       attribute_results[attribute] = {}
 
-    ## Build a search algorithm object. 
-    ga_search = None
-    if self._ga_platform == 'unpartitioned':
-      print('running unpartitioned')
-      ga_search = UnpartitionedGeneticSearch()
-    else:
-      print('running partitioned')
-      ga_search = PartitionedGeneticSearch()
+    print('running ' + self._ga_platform)
 
-    simulation_params = copy.deepcopy(self._simulation_params)
+    ## Build the (name, spawn_key, simulation_params) of every cell in the
+    ## square.
+    cells = []
+    for cell, entry in enumerate(square):
+      simulation_params = copy.deepcopy(self._simulation_params)
 
-    ## For every cell in the square.
-    for entry in square:
       ## Build the ga_config for each run.
       for index in range(0, len(entry)):
         attribute_name = sampling_attributes[index]
@@ -92,26 +133,27 @@ class SamplingTuner():
 
       print('gen_count: ' + str(simulation_params.ga_config['generation_count']))
       print('pop_size: ' + str(simulation_params.ga_config['population_size']))
+      cells.append((str(cell), (cell,), simulation_params))
+
+    ## Search every cell, getting back a mapping of {cell -> min_error} for the
+    ## cells which didn't fail.
+    cell_errors, self._failed_cells = self._run_cells(cells)
+
+    for cell, reason in sorted(self._failed_cells.items()):
+      print('Cell ' + str(cell) + ' failed: ' + reason)
+
+    ## Populate the output results for each attribute name and value in the
+    ## cells, in the order of the square.
+    ## The number of cells each attribute value was searched in, for averaging.
+    cell_counts = {}
+    for attribute in sampling_attributes:
+      cell_counts[attribute] = {}
+
+    for cell, entry in enumerate(square):
+      if cell not in cell_errors:
+        continue
+      min_error = cell_errors[cell]
 
-      ## Run the genetic search with this cell's ga_config.
-      search_results = ga_search.run(simulation_params, self._ga_log_filename)
-
-      ## If unpartitioned, then the results are a dictionary of
-      ## {error -> bike_params}.
-      if self._ga_platform == 'unpartitioned':
-        min_error = sorted(search_results.keys())[0]
-
-      ## If partitioned, then the results are a list of dictionaries of
-      ## {error -> bike_params}.
-      else:
-        min_error = float('inf')
-        for partition in search_results:
-          partition_error = sorted(partition.keys())[0]
-          if min_error > partition_error:
-            min_error == partition_error
-
-      ## Populate the output results for each attribute name and value in this
-      ## cell.
       for index in range(0, len(entry)):
         attribute_name = sampling_attributes[index]
         attribute_value = ga_config[attribute_name][entry[index]] 
@@ -121,72 +163,356 @@ class SamplingTuner():
           attribute_results[attribute_name][attribute_value] = {}
           attribute_results[attribute_name][attribute_value]['min_error'] = min_error
           attribute_results[attribute_name][attribute_value]['max_error'] = min_error
-          attribute_results[attribute_name][attribute_value]['avg_error'] = (min_error / 5)
+          attribute_results[attribute_name][attribute_value]['avg_error'] = min_error
+          cell_counts[attribute_name][attribute_value] = 1
 
         else:
           dictionary = attribute_results[attribute_name][attribute_value]
-          dictionary['avg_error'] += (min_error / 5)
+          dictionary['avg_error'] += min_error
+          cell_counts[attribute_name][attribute_value] += 1
 
           if dictionary['min_error'] > min_error:
             dictionary['min_error'] = min_error
           if dictionary['max_error'] < min_error:
             dictionary['max_error'] = min_error
 
+    ## Turn the summed errors into averages over the cells each value was in.
+    for attribute_name in sampling_attributes:
+      for attribute_value, count in cell_counts[attribute_name].items():
+        attribute_results[attribute_name][attribute_value]['avg_error'] /= count
+
     return attribute_results
 
-  ## Does a quick sampling of the design space using the appropriate
-  ## Greaco-Latin square.
+  ## Searches the cells, a list of (name, spawn_key, simulation_params), either
+  ## one after another or, with more than one cell worker or a cell timeout, in
+  ## processes of their own. Returns a tuple of two mappings keyed by position
+  ## in cells, {cell -> min_error} for the cells which finished and
+  ## {cell -> reason} for the ones which failed.
+  def _run_cells(self, cells):
+    if self._cell_workers == 1 and self._cell_timeout is None:
+      cell_errors = {}
+      for cell, (name, spawn_key, simulation_params) in enumerate(cells):
+        cell_errors[cell] = self._run_cell(spawn_key, simulation_params,
+                                           self._ga_log_filename)
+      return cell_errors, {}
+
+    return self._run_cells_in_processes(cells)
+
+  ## Runs the genetic search seeded by the spawn_key with the simulation_params,
+  ## logging to ga_log_filename. Returns the error of the best bike the search
+  ## found.
+  def _run_cell(self, spawn_key, simulation_params, ga_log_filename):
+    ## Run the genetic search with this cell's ga_config.
+    ga_search = self._build_search(spawn_key)
+    search_results = ga_search.run(simulation_params, ga_log_filename)
+
+    ## If unpartitioned, then the results are a list of (error, bike_params)
+    ## pairs from the best to the worst.
+    if self._ga_platform == 'unpartitioned':
+      min_error = search_results[0][0]
+
+    ## If partitioned, then the results are a list of partitions, each a list
+    ## of (error, bike_params) pairs from the best to the worst.
+    else:
+      min_error = float('inf')
+      for partition in search_results:
+        partition_error = partition[0][0]
+        if min_error > partition_error:
+          min_error = partition_error
+
+    return min_error
+
+  ## Searches the cells (see _run_cells) in up to cell_workers processes at
+  ## once, with each cell logging to <ga_log_filename>.<name>. A cell which
+  ## raises, dies or runs past the cell_timeout fails. Returns the same tuple
+  ## of mappings as _run_cells.
+  def _run_cells_in_processes(self, cells):
+    results = multiprocessing.Queue()
+    waiting = list(range(0, len(cells)))
+
+    ## Mapping of {cell -> (process, start_time)} for the running cells.
+    running = {}
+    cell_errors = {}
+    failed_cells = {}
+
+    while waiting or running:
+      ## Keep the workers busy.
+      while waiting and len(running) < self._cell_workers:
+        cell = waiting.pop(0)
+        name, spawn_key, simulation_params = cells[cell]
+        process = multiprocessing.Process(target=_run_cell_process,
+                                          args=(self, cell, spawn_key,
+                                                simulation_params,
+                                                self._ga_log_filename + '.' +
+                                                name,
+                                                results))
+        process.start()
+        running[cell] = (process, time.time())
+
+      ## Note which cells have exited before reading the results, so the
+      ## result of a cell which has just finished isn't taken for a crash.
+      exited = [cell for cell in running if running[cell][0].exitcode is not None]
+
+      finished = {}
+      try:
+        cell, error, min_error = results.get(timeout=0.1)
+        while True:
+          finished[cell] = (error, min_error)
+          cell, error, min_error = results.get_nowait()
+      except queue.Empty:
+        pass
+
+      for cell, (error, min_error) in finished.items():
+        ## Skip a result which came in just as its cell was timed out.
+        if cell not in running:
+          continue
+
+        if error is None:
+          cell_errors[cell] = min_error
+        else:
+          failed_cells[cell] = 'raised an exception:\n' + error
+        running.pop(cell)[0].join()
+
+      for cell in exited:
+        if cell in running:
+          failed_cells[cell] = 'exited without a result'
+          running.pop(cell)[0].join()
+
+      ## Stop the cells which have run out of time.
+      if self._cell_timeout is not None:
+        now = time.time()
+        for cell in list(running.keys()):
+          process, start_time = running[cell]
+          if now - start_time > self._cell_timeout:
+            process.terminate()
+            process.join()
+            failed_cells[cell] = 'timed out after ' +\
+                                 str(self._cell_timeout) + ' seconds'
+            running.pop(cell)
+
+    return cell_errors, failed_cells
+
+  ## Does a quick sampling of the design space using a strength 2 orthogonal
+  ## array, or with design = 'latin_hypercube' a Latin hypercube of
+  ## sample_count runs (see _build_square). The attributes can have any number
+  ## of values each. The orthogonal array is only balanced, with every pair of
+  ## values of every pair of attributes sampled equally often, when the value
+  ## counts are all powers of one prime (such as 5 values of every attribute,
+  ## or 8, 4 and 2 values). Other value counts sample the lower values more
+  ## often, and a warning is printed (see SamplingDesign.orthogonal_array).
   ## Returns a dictionary of {attribute -> [{value, error}]}, that is a
   ## dictionary of attributes names to a list of attribute value to error
   ## tuples.
-  def sample(self):
+  def sample(self, design='orthogonal', sample_count=None):
     ga_config = self._simulation_params.ga_config
     sampling_attributes = self._sampling_attributes
 
-    ## Ensure that the proper number of attributes was specified.
-    num_attributes = len(sampling_attributes)
-    if num_attributes < 3 or num_attributes > 5:
-      raise Exception('Must specifiy between 3 and 5 attributes to sample.')
+    ## Ensure that the sampling attributes were specified.
+    if len(sampling_attributes) == 0:
+      raise Exception('Must specify at least one attribute to sample.')
 
-    ## Ensure that all of the attributes have 5 values.
+    ## Ensure that all of the attributes have values.
     for attribute in sampling_attributes:
       if attribute not in ga_config.keys():
         raise Exception('All sampling parameters must be present in ga_config.')
 
-      if len(ga_config[attribute]) != 5:
-        raise Exception('All sampling parameters must have the same number of values.')
+      if len(ga_config[attribute]) == 0:
+        raise Exception('All sampling parameters must have at least one value.')
 
-    ## Build the Greaco-Latin square.
-    square = self._build_square(len(sampling_attributes))
+    ## Build the design to sample (see _build_square).
+    square = self._build_square(design, sample_count)
 
     ## Run the experiments in the square.
     return self._run_square(square, sampling_attributes, ga_config)
 
-  def tune(self):
-    pass
+  ## Tunes the sampling attributes of the ga_config with Hyperband, which runs
+  ## rounds of successive halving: a set of GA configs drawn at random from the
+  ## values of the sampling attributes is searched on a small generation_count,
+  ## the best 1 / reduction_factor of them are searched again on
+  ## reduction_factor times the generations, and so on up to the largest
+  ## generation_count. The generation_count values in the ga_config give the
+  ## smallest and largest budgets. With a single generation_count value, the
+  ## smallest budget is that value divided by the reduction_factor as many times
+  ## as it can be while staying at least 1. An exception is raised if the
+  ## budgets leave no room for a single reduction_factor step. Each bracket of
+  ## Hyperband starts on a larger budget with fewer configs, hedging against
+  ## configs which only pull ahead late in a search. With hyperband=False only
+  ## the first (most aggressive) bracket is run, which is plain successive
+  ## halving.
+  ##
+  ## Returns a dictionary of {'best_config', 'best_generation_count',
+  ## 'best_error', 'best_by_generation_count', 'trials'}, where best_config is
+  ## the {attribute -> value} of the trial which found the lowest error on the
+  ## largest generation_count (errors on smaller budgets are too noisy to pick
+  ## a winner from), best_by_generation_count maps each generation_count to the
+  ## {'config', 'error'} of its best trial and trials is the history of every
+  ## trial as a list of {'trial', 'bracket', 'rung', 'generation_count',
+  ## 'config', 'error', 'failed'} dictionaries (failed is the reason a trial
+  ## failed, or None).
+  def tune(self, reduction_factor=3, hyperband=True):
+    ga_config = self._simulation_params.ga_config
+    if reduction_factor < 2:
+      raise Exception('reduction_factor must be at least 2')
+
+    ## Tune every sampling attribute apart from the generation_count, which is
+    ## the budget.
+    tuning_attributes = []
+    for attribute in self._sampling_attributes:
+      if attribute not in ga_config.keys():
+        raise Exception('All sampling parameters must be present in ga_config.')
+      if attribute != 'generation_count':
+        tuning_attributes.append(attribute)
+
+    min_generations = int(min(ga_config['generation_count']))
+    max_generations = int(max(ga_config['generation_count']))
+    if min_generations < 1:
+      raise Exception('generation_count must be at least 1 to tune')
+
+    ## Without a range of budgets, derive the smallest one from the largest.
+    if min_generations == max_generations:
+      while min_generations // reduction_factor >= 1:
+        min_generations //= reduction_factor
+
+    ## The number of times the budget can be multiplied by the reduction_factor
+    ## between the smallest and the largest.
+    max_bracket = 0
+    while min_generations * reduction_factor ** (max_bracket + 1) <= max_generations:
+      max_bracket += 1
+
+    if max_bracket == 0:
+      raise Exception('Tuning needs a generation_count range of at least ' +
+                      str(reduction_factor) + 'x (the reduction_factor), got ' +
+                      str(min_generations) + ' to ' + str(max_generations))
+
+    brackets = list(reversed(range(0, max_bracket + 1)))
+    if not hyperband:
+      brackets = brackets[:1]
+
+    rng = np.random.default_rng(np.random.SeedSequence(self._seed,
+                                                       spawn_key=(2, 0)))
+    trials = []
+
+    print('tuning ' + self._ga_platform + ' on ' + str(min_generations) +
+          ' to ' + str(max_generations) + ' generations')
+    for bracket in brackets:
+      config_count = int(math.ceil(float(max_bracket + 1) / (bracket + 1) *
+                                   reduction_factor ** bracket))
+      configs = self._draw_tuning_configs(rng, tuning_attributes, config_count)
+
+      for rung in range(0, bracket + 1):
+        generation_count = max(min_generations,
+                               int(round(max_generations *
+                                         float(reduction_factor) ** (rung - bracket))))
+        print('Bracket ' + str(bracket) + ', rung ' + str(rung) + ': ' +
+              str(len(configs)) + ' configs at ' + str(generation_count) +
+              ' generations')
+
+        ## Search every config on this rung's budget.
+        cells = []
+        for config in configs:
+          simulation_params = copy.deepcopy(self._simulation_params)
+          for attribute, value in config.items():
+            simulation_params.ga_config[attribute] = [value]
+          simulation_params.ga_config['generation_count'] = [generation_count]
+
+          trial_number = len(trials) + len(cells)
+          cells.append(('trial' + str(trial_number), (1, trial_number),
+                        simulation_params))
+
+        cell_errors, failed_cells = self._run_cells(cells)
+
+        rung_trials = []
+        for cell, config in enumerate(configs):
+          trial = {'trial': len(trials), 'bracket': bracket, 'rung': rung,
+                   'generation_count': generation_count, 'config': config,
+                   'error': cell_errors.get(cell, float('inf')),
+                   'failed': failed_cells.get(cell)}
+          if trial['failed'] is not None:
+            print('Trial ' + str(trial['trial']) + ' failed: ' + trial['failed'])
+          trials.append(trial)
+          rung_trials.append(trial)
+
+        ## Promote the best configs to the next rung (a stable sort, so ties go
+        ## to the config drawn first).
+        promote_count = len(configs) // reduction_factor
+        if rung == bracket or promote_count == 0:
+          break
+        rung_trials.sort(key=lambda trial: trial['error'])
+        configs = [trial['config'] for trial in rung_trials[:promote_count]]
+
+    ## The best trial on each budget, ties going to the earliest trial.
+    best_by_generation_count = {}
+    for trial in trials:
+      best = best_by_generation_count.get(trial['generation_count'])
+      if best is None or trial['error'] < best['error']:
+        best_by_generation_count[trial['generation_count']] =\
+          {'config': trial['config'], 'error': trial['error']}
+
+    ## Only pick the winner from the largest budget which was searched.
+    best_generation_count = max(best_by_generation_count.keys())
+    best = best_by_generation_count[best_generation_count]
+    return {'best_config': best['config'],
+            'best_generation_count': best_generation_count,
+            'best_error': best['error'],
+            'best_by_generation_count': best_by_generation_count,
+            'trials': trials}
+
+  ## Draws count distinct GA configs, each a dictionary of {attribute -> value}
+  ## over the tuning_attributes, at random from every combination of their
+  ## values in the ga_config. Every combination is returned (in a random order)
+  ## if there are no more than count of them.
+  def _draw_tuning_configs(self, rng, tuning_attributes, count):
+    ga_config = self._simulation_params.ga_config
+    radixes = [len(ga_config[attribute]) for attribute in tuning_attributes]
+    combination_count = 1
+    for radix in radixes:
+      combination_count *= radix
+
+    combinations = rng.choice(combination_count,
+                              min(count, combination_count), replace=False)
+
+    ## Decode each combination number into the index of each attribute's value.
+    configs = []
+    for combination in combinations.tolist():
+      config = {}
+      for attribute, radix in zip(tuning_attributes, radixes):
+        combination, index = divmod(combination, radix)
+        config[attribute] = ga_config[attribute][index]
+      configs.append(config)
+    return configs
+
+## Searches a single cell of the square or trial of the tuning (see
+## SamplingTuner._run_cells_in_processes). This runs inside the cell's own
+## process, and puts a tuple of (cell, error, min_error) on the results queue
+## when it finishes, where error is the traceback of a failed cell (or None)
+## and min_error is the error of the best bike of a successful one.
+def _run_cell_process(tuner, cell, spawn_key, simulation_params,
+                      ga_log_filename, results):
+  try:
+    min_error = tuner._run_cell(spawn_key, simulation_params, ga_log_filename)
+    results.put((cell, None, min_error))
+  except BaseException:
+    results.put((cell, traceback.format_exc(), None))
 
 ## Parses the inputs for the sampling tuner, returning them as a tuple of
 ## simulation_params, output_filename, ga_log_filename, ga_platform.
-def parse_inputs(command_line_args):
+## The build_config_bundle is an optional function from
+## pop_config_bundle_options, which lets the parsed config files be loaded from
+## a bundle saved by an earlier launch.
+def parse_inputs(command_line_args, build_config_bundle=None):
   num_command_line_args = len(command_line_args)
   if num_command_line_args < 8 or num_command_line_args > 10:
     print_usage()
     raise Exception()
 
-  ## Create a SimulationParams object to hold all the parsed input data.
-  simulation_params = SimulationParams()
-
-  ## Create a Parser to parse the input files.
-  parser = Parser()
-
   ## Grab the output filename.
-  output_filename = sys.argv[1]
+  output_filename = command_line_args[1]
 
   ## Grab the name of the output file.
-  ga_log_filename = sys.argv[2]
+  ga_log_filename = command_line_args[2]
 
   ## Grab the ga_platform name.
-  ga_platform = sys.argv[3]
+  ga_platform = command_line_args[3]
 
   ## Ensure that the name is either 'unpartitioned' or 'partitioned'.
   if ga_platform != 'unpartitioned' and ga_platform != 'partitioned':
@@ -203,46 +529,69 @@ def parse_inputs(command_line_args):
     raise Exception('improper number of arguements for partitioned sampling')
 
   ## Grab the name of the genetic algorithm's config file.
-  ga_config_filename = sys.argv[4]
+  ga_config_filename = command_line_args[4]
 
   ## Grab the name of the target_control_sensitivity curve file.
-  curve_filename = sys.argv[5]
+  curve_filename = command_line_args[5]
 
   ## Grab the name of the bike_params file.
-  bike_params_filename = sys.argv[6]
+  bike_params_filename = command_line_args[6]
 
   ## Grab rider config filename.
-  rider_config_filename = sys.argv[7]
-
-  ## Parse the genetic algorithm config file.
-  parser.parse_genetic_algorithm_config_file(simulation_params.ga_config,
-                                             ga_config_filename)
+  rider_config_filename = command_line_args[7]
 
+  ## The config files to parse.
+  source_filenames = [ga_config_filename, curve_filename, bike_params_filename,
+                      rider_config_filename]
   if ga_platform == 'partitioned':
     ## Grab the name of the partitioning config file.
-    partitioning_config_filename = sys.argv[8]
-
-    ## Parse the partitioning config file.
-    partitioning_config = {}
-    parser.parse_partitioning_config_file(partitioning_config,
-                                          partitioning_config_filename)
-
-    ## Add the partitioning config components to the simulation_params object.
-    simulation_params.partitioning_radius = partitioning_config['radius'][0]
-    simulation_params.partitioning_attributes = copy.deepcopy(partitioning_config['attributes'])
-
-  ## Parse the target control sensitivity curve from the input.
-  parser.parse_curve_file(simulation_params.target_control_sensitivity,
-                          curve_filename) 
-
-  ## Parse in the bike_params, resulting in a dictionary of {param -> [values]}.
-  parser.parse_bike(simulation_params.bike_params, bike_params_filename)
-
-  ## Parse in the rider_params, resulting in a list of [{param -> [values]}].
-  parser.parse_riders(simulation_params.riders, rider_config_filename)
-
-  ## Compute the top speed to test all bikes at given the input curve.
-  simulation_params.top_speed = len(simulation_params.target_control_sensitivity)
+    partitioning_config_filename = command_line_args[8]
+    source_filenames.append(partitioning_config_filename)
+
+  ## Parses the config files into a new SimulationParams.
+  def parse_config_files():
+    ## Create a SimulationParams object to hold all the parsed input data.
+    simulation_params = SimulationParams()
+
+    ## Create a Parser to parse the input files.
+    parser = Parser()
+
+    ## Parse the genetic algorithm config file.
+    parser.parse_genetic_algorithm_config_file(simulation_params.ga_config,
+                                               ga_config_filename)
+
+    if ga_platform == 'partitioned':
+      ## Parse the partitioning config file.
+      partitioning_config = {}
+      parser.parse_partitioning_config_file(partitioning_config,
+                                            partitioning_config_filename)
+
+      ## Add the partitioning config components to the simulation_params object.
+      simulation_params.partitioning_radius = partitioning_config['radius'][0]
+      simulation_params.partitioning_attributes = copy.deepcopy(partitioning_config['attributes'])
+      if 'engine' in partitioning_config:
+        simulation_params.partitioning_engine = partitioning_config['engine'][0]
+      if 'update' in partitioning_config:
+        simulation_params.partitioning_update = partitioning_config['update'][0]
+
+    ## Parse the target control sensitivity curve from the input.
+    parser.parse_curve_file(simulation_params.target_control_sensitivity,
+                            curve_filename) 
+
+    ## Parse in the bike_params, resulting in a dictionary of {param -> [values]}.
+    parser.parse_bike(simulation_params.bike_params, bike_params_filename)
+
+    ## Parse in the rider_params, resulting in a list of [{param -> [values]}].
+    parser.parse_riders(simulation_params.riders, rider_config_filename)
+
+    ## Compute the top speed to test all bikes at given the input curve.
+    simulation_params.top_speed = len(simulation_params.target_control_sensitivity)
+    return simulation_params
+
+  ## Load the parsed config files from the bundle if they haven't changed.
+  simulation_params = load_config_files(build_config_bundle,
+                                        'sampling_tuner_' + ga_platform,
+                                        source_filenames, parse_config_files)
 
   return simulation_params, output_filename, ga_log_filename, ga_platform
 
@@ -251,8 +600,13 @@ def print_usage():
     print('Improper arguments!\n'
           'Run as python3 sampling_tuner.py <output_filename> <ga_log_filename>'
           ' <ga_platform> <ga_config_file.txt> <partitioning_config.txt>'
-          ' <target_control_sensitivity.txt> <bike_params.txt> <rider_params>\n'
-          '|  output_filename = the file to write the results to\n'
+          ' <target_control_sensitivity.txt> <bike_params.txt> <rider_params>'
+          ' [--mode <sample|tune>] [--seed <seed>] [--cell-workers <count>]'
+          ' [--cell-timeout <seconds>] [--design <orthogonal|latin_hypercube>]'
+          ' [--sample-count <count>] [--config-bundle <bundle_filename>]'
+          ' [--no-config-bundle]\n'
+          '|  output_filename = the file to write the sampling or tuning '
+                                'results to\n'
           '|  ga_log_filename = the name of the output file to dump GA results to\n'
           '|  ga_platform = [unpartitioned, partitioned] -- the search platform to sample\n'
           '|  ga_config_file.txt = the GA configuration file for this run\n'
@@ -261,32 +615,84 @@ def print_usage():
           '|  bike_params.txt = a file containing all the bike params\n'
           '|  rider_params.txt = one or more files containing rider params\n'
           '|  partitioning_config.txt = the config file describing the '
-                                        'partitioning parameter values.\n')
+                                        'partitioning parameter values.\n'
+          '|  --mode = sample the design space once, or tune the GA config '
+                      'with Hyperband (default tune)\n'
+          '|  --seed = seed for the random number generators, to replay the '
+                      'sampling (default a fresh seed, which is printed)\n'
+          '|  --cell-workers = processes to search the cells of the square '
+                              'in at once (default 1)\n'
+          '|  --cell-timeout = seconds a cell may run before it is marked as '
+                              'failed (default no limit)\n'
+          '|  --design = the design to sample, an orthogonal array or a Latin '
+                        'hypercube (default orthogonal)\n'
+          '|  --sample-count = runs in a Latin hypercube (default as many as '
+                              'the orthogonal array)\n'
+          '|  --config-bundle = the file to keep the parsed config files in, '
+                               'reused while they are unchanged (default one '
+                               'per set of config files in the user cache directory)\n'
+          '|  --no-config-bundle = always parse the config files\n')
 
 def main():
   try:
+    ## Pull the optional arguments out before parsing the positional ones.
+    command_line_args = list(sys.argv)
+    mode = pop_option(command_line_args, '--mode', 'tune')
+    if mode != 'sample' and mode != 'tune':
+      raise Exception('mode must be set to sample or tune')
+    seed = pop_seed(command_line_args)
+    build_config_bundle = pop_config_bundle_options(command_line_args)
+    cell_workers = int(pop_option(command_line_args, '--cell-workers', 1))
+    cell_timeout = pop_option(command_line_args, '--cell-timeout')
+    if cell_timeout is not None:
+      cell_timeout = float(cell_timeout)
+    design = pop_option(command_line_args, '--design', 'orthogonal')
+    sample_count = pop_option(command_line_args, '--sample-count')
+    if sample_count is not None:
+      sample_count = int(sample_count)
+
     ## Parse the input.
     simulation_params, output_filename, ga_log_filename, ga_platform =\
-       parse_inputs(sys.argv)
+       parse_inputs(command_line_args, build_config_bundle)
 
     ## Set the sampling attributes here to make things easy for now.
     sampling_attributes = ['generation_count', 'population_size',
                            'selection_percentage', 'mutation_percentage',\
-                           'cross_over_percentage']
+                           'cross_over_percentage', 'cross_over_gene_count',
+                           'mutation_gene_count']
 
     ## Create a SamplingTuner object.
     tuner = SamplingTuner(simulation_params, output_filename, ga_log_filename,
-                          ga_platform, sampling_attributes)
-
-    ## Sample the design space.
-    start_time = time.time()
-    attribute_results = tuner.sample()
-    end_time = time.time()
-    print('Total sampling time: ' + str(end_time - start_time))
-    print(attribute_results)
-
-    ## tune the design space based on that sampling.
-    tuner.tune()
+                          ga_platform, sampling_attributes, seed,
+                          cell_workers, cell_timeout)
+    print('Seed: ' + str(tuner.seed))
+
+    if mode == 'sample':
+      ## Sample the design space.
+      start_time = time.time()
+      results = tuner.sample(design, sample_count)
+      end_time = time.time()
+      print('Total sampling time: ' + str(end_time - start_time))
+      print(results)
+    else:
+      ## Tune the GA config with Hyperband.
+      start_time = time.time()
+      results = tuner.tune()
+      end_time = time.time()
+      print('Total tuning time: ' + str(end_time - start_time))
+      print('Best GA config: ' + str(results['best_config']) + ' at ' +
+            str(results['best_generation_count']) + ' generations, error ' +
+            str(results['best_error']) + ' (' +
+            str(len(results['trials'])) + ' trials)')
+
+    ## Write the sampled errors, or the winner and the trial history, to the
+    ## output file.
+    try:
+      with open(output_filename, 'w') as output:
+        output.write(json.dumps(results))
+    except IOError:
+      print('Could not open ' + str(output_filename) + ' for writing.')
+      sys.exit(1)
 
   except BaseException as e:
     print(str(e))
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+from batch_bike_evaluator import BatchBikeEvaluator
+from evaluation_executor_base import EvaluationExecutorBase
+
+class SerialEvaluationExecutor(EvaluationExecutorBase):
+  'Scores the whole population in this process, in a single batch.'
+
+  def __init__(self):
+    EvaluationExecutorBase.__init__(self)
+    self._evaluator = BatchBikeEvaluator()
+
+  ## Returns the error of each design in designs.
+  def compute_errors(self, designs, riders, target_control_sensitivity,
+                     top_speed):
+    return self._evaluator.compute_errors(designs, riders,
+                                          target_control_sensitivity, top_speed)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
@@ -7,7 +7,9 @@ class SimulationParams:
     self._bike_params = {}
     self._ga_config = {}
     self._partitioning_attributes = []
+    self._partitioning_engine = 'index'
     self._partitioning_radius = 0
+    self._partitioning_update = 'rebuild'
     self._riders = []
     self._sample_count = 0
     self._target_control_sensitivity = []
@@ -25,10 +27,18 @@ class SimulationParams:
   def partitioning_attributes(self):
     return self._partitioning_attributes; 
 
+  @property
+  def partitioning_engine(self):
+    return self._partitioning_engine; 
+
   @property
   def partitioning_radius(self):
     return self._partitioning_radius; 
 
+  @property
+  def partitioning_update(self):
+    return self._partitioning_update; 
+
   @property
   def riders(self):
     return self._riders; 
@@ -57,10 +67,18 @@ class SimulationParams:
   def partitioning_attributes(self, value):
       self._partitioning_attributes = copy.deepcopy(value)
 
+  @partitioning_engine.setter
+  def partitioning_engine(self, value):
+      self._partitioning_engine = value
+
   @partitioning_radius.setter
   def partitioning_radius(self, value):
       self._partitioning_radius = copy.deepcopy(value)
 
+  @partitioning_update.setter
+  def partitioning_update(self, value):
+      self._partitioning_update = value
+
   @riders.setter
   def riders(self, value):
       self._riders = copy.deepcopy(value)
@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+
+import unittest
+
+import numpy as np
+
+from batch_bike_evaluator import BatchBikeEvaluator, BIKE_PARAM_NAMES
+from bike import Bike
+from rider_profile import RiderProfile
+
+## The sample recumbent design space from the search demo notebook.
+BIKE_PARAMS = {'wheelbase': np.arange(0, 1.2001, 0.15).tolist(),
+               'hip_angle': list(range(80, 151, 10)),
+               'headtube_angle': list(range(0, 19, 2)),
+               'crank_radius': [0.165, 0.170, 0.175],
+               'crank_x_offset': np.arange(-0.5, 1.0001, 0.05).tolist(),
+               'crank_z_offset': np.arange(0.2, 0.6001, 0.05).tolist(),
+               'fork_offset': np.arange(-0.075, 0.0751, 0.015).tolist(),
+               'seat_height': np.arange(0.2, 0.4001, 0.025).tolist(),
+               'handlebar_radius': np.arange(0.1, 0.4001, 0.05).tolist(),
+               'front_wheel_radius': [0.23, 0.28, 0.36],
+               'rear_wheel_radius': [0.23, 0.28, 0.36],
+               'frame_mass': [10],
+               'crank_mass': [1],
+               'front_wheel_mass': [2],
+               'rear_wheel_mass': [2]}
+
+TARGET_CONTROL_SENSITIVITY = [0.0, 4.99, 8.82, 11.10, 12.07, 12.20, 11.86,
+                              11.30, 10.67, 10.02, 9.40, 8.82, 8.29, 7.80,
+                              7.36, 6.96, 6.60, 6.27, 5.96, 5.69, 5.43, 5.20,
+                              4.98, 4.79, 4.60, 4.43]
+
+TOP_SPEED = 25
+
+## The rider from the search demo notebook, and a much taller one who doesn't
+## fit on many of the designs.
+RIDERS = [RiderProfile({'rider_mass': 60, 'head_diameter': 0.185,
+                        'torso_length': 0.48, 'torso_depth': 0.15,
+                        'torso_width': 0.2, 'arm_length': 0.5,
+                        'arm_diameter': 0.08, 'leg_length': 1.0,
+                        'leg_diameter': 0.12}),
+          RiderProfile({'rider_mass': 95, 'head_diameter': 0.21,
+                        'torso_length': 0.62, 'torso_depth': 0.22,
+                        'torso_width': 0.3, 'arm_length': 0.68,
+                        'arm_diameter': 0.1, 'leg_length': 1.15,
+                        'leg_diameter': 0.16})]
+
+class BatchBikeEvaluatorTest(unittest.TestCase):
+  'Checks that the batch evaluator scores designs the same as the scalar Bike.'
+
+  def setUp(self):
+    rng = np.random.default_rng(2718)
+    self._indexes = [{param: int(rng.integers(0, len(values)))
+                      for param, values in BIKE_PARAMS.items()}
+                     for _ in range(0, 2000)]
+    self._evaluator = BatchBikeEvaluator()
+
+  ## Returns the error of each design from the scalar Bike, fitting each rider
+  ## in turn and summing the differences of its curve from the target.
+  def scalar_errors(self, riders):
+    bike = Bike()
+    errors = []
+    for single_bike_params_indexes in self._indexes:
+      bike.update_geometry_from_indexes(BIKE_PARAMS, single_bike_params_indexes)
+      errors.append(bike.compute_error(riders, TARGET_CONTROL_SENSITIVITY,
+                                       TOP_SPEED))
+    return np.array(errors)
+
+  def assertErrorsMatch(self, actual, expected):
+    np.testing.assert_array_equal(np.isinf(actual), np.isinf(expected))
+    finite = np.isfinite(expected)
+    np.testing.assert_allclose(actual[finite], expected[finite],
+                               rtol=1e-9, atol=1e-9)
+
+  def test_matches_bike_for_one_rider(self):
+    designs = self._evaluator.designs_from_indexes(BIKE_PARAMS, self._indexes)
+    expected = self.scalar_errors(RIDERS[:1])
+    actual = self._evaluator.compute_errors(designs, RIDERS[:1],
+                                            TARGET_CONTROL_SENSITIVITY,
+                                            TOP_SPEED)
+    self.assertErrorsMatch(actual, expected)
+
+  def test_matches_bike_for_several_riders(self):
+    designs = self._evaluator.designs_from_indexes(BIKE_PARAMS, self._indexes)
+    expected = self.scalar_errors(RIDERS)
+    actual = self._evaluator.compute_errors(designs, RIDERS,
+                                            TARGET_CONTROL_SENSITIVITY,
+                                            TOP_SPEED)
+    self.assertErrorsMatch(actual, expected)
+
+    ## The designs should cover both bikes every rider fits and bikes where
+    ## one of them doesn't fit.
+    self.assertTrue(np.isfinite(expected).any())
+    self.assertTrue(np.isinf(expected).any())
+
+  def test_designs_from_bike_params_match_indexes(self):
+    single_bike_params_list = [Bike().convert_bike_params_from_indexes(
+                                   BIKE_PARAMS, single_bike_params_indexes)
+                               for single_bike_params_indexes in self._indexes]
+    np.testing.assert_array_equal(
+        self._evaluator.designs_from_bike_params(single_bike_params_list),
+        self._evaluator.designs_from_indexes(BIKE_PARAMS, self._indexes))
+    self.assertEqual(len(BIKE_PARAM_NAMES), len(BIKE_PARAMS))
+
+if __name__ == '__main__':
+  unittest.main()
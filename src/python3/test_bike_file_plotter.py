@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from bike_file_plotter import read_bike_pairs
+
+BIKE_PARAMS = {'wheelbase': 1.2, 'hip_angle': 80.0, 'headtube_angle': 18.0,
+               'crank_radius': 0.165, 'crank_x_offset': 0.0,
+               'crank_z_offset': 0.6, 'fork_offset': 0.0, 'seat_height': 0.3,
+               'handlebar_radius': 0.25, 'front_wheel_radius': 0.28,
+               'rear_wheel_radius': 0.28, 'frame_mass': 10.0,
+               'crank_mass': 1.0, 'front_wheel_mass': 2.0,
+               'rear_wheel_mass': 2.0}
+
+RIDER_PARAMS = ('rider_name    = Chris\n'
+                'rider_mass    = 60\n'
+                'head_diameter = 0.185\n'
+                'torso_length  = 0.48\n'
+                'torso_depth   = 0.15\n'
+                'torso_width   = 0.2\n'
+                'arm_length    = 0.5\n'
+                'arm_diameter  = 0.08\n'
+                'leg_length    = 1.0\n'
+                'leg_diameter  = 0.12\n')
+
+TARGET_CONTROL_SENSITIVITY = '0.0\n4.99\n8.82\n11.10\n12.07\n12.20\n'
+
+class BikeFilePlotterTest(unittest.TestCase):
+  'Checks that both plotters read the output files the searches write.'
+
+  def setUp(self):
+    self._directory = tempfile.TemporaryDirectory()
+    self._bikes_filename = self.write('bikes.txt', json.dumps(
+        [[12.5, dict(BIKE_PARAMS)],
+         [12.5, dict(BIKE_PARAMS, seat_height=0.325)]]))
+    self._curve_filename = self.write('target_control_curve.txt',
+                                      TARGET_CONTROL_SENSITIVITY)
+    self._rider_filename = self.write('rider_params.txt', RIDER_PARAMS)
+
+  def tearDown(self):
+    self._directory.cleanup()
+
+  def write(self, name, contents):
+    filename = os.path.join(self._directory.name, name)
+    with open(filename, 'w') as output:
+      output.write(contents)
+    return filename
+
+  ## Runs one of the plotter scripts the way the notebooks do, returning its
+  ## completed process.
+  def run_plotter(self, script, args):
+    environment = dict(os.environ, MPLBACKEND='Agg')
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+    return subprocess.run([sys.executable, script] + args,
+                          cwd=self._directory.name, env=environment,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          universal_newlines=True, timeout=300)
+
+  def test_read_bike_pairs_keeps_ties(self):
+    with open(self._bikes_filename) as bikes_file:
+      pairs = read_bike_pairs(json.load(bikes_file))
+    self.assertEqual([error for error, bike_params in pairs], [12.5, 12.5])
+    self.assertEqual(pairs[1][1]['seat_height'], 0.325)
+
+  def test_read_bike_pairs_accepts_mappings(self):
+    self.assertEqual(read_bike_pairs({'1.5': BIKE_PARAMS}),
+                     [(1.5, BIKE_PARAMS)])
+
+  def test_plotter_main_plots_a_list_file(self):
+    process = self.run_plotter('bike_file_plotter.py',
+                               [self._bikes_filename, self._curve_filename,
+                                self._rider_filename])
+    self.assertEqual(process.returncode, 0, process.stdout)
+    self.assertEqual(process.stdout.count('Bike Params:'), 2, process.stdout)
+
+  def test_cmdline_plotter_main_plots_a_list_file(self):
+    pdf_filename = os.path.join(self._directory.name, 'bikes.pdf')
+    process = self.run_plotter('bike_file_plotter_cmdline.py',
+                               [pdf_filename, self._bikes_filename,
+                                self._curve_filename, self._rider_filename])
+    self.assertEqual(process.returncode, 0, process.stdout)
+    self.assertTrue(os.path.getsize(pdf_filename) > 0)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from bike import Bike
+from rider_profile import RiderProfile
+
+## Returns the Ixx term of a segment's local inertia tensor rotated into the
+## global coordinate system, computed with the full matrix product Bike used
+## before _compute_rotated_Ixx replaced it.
+def matrix_rotated_Ixx(local_ref, local_Ixx, local_Iyy, local_Izz):
+  local_inertia_tensor = np.matrix([[local_Ixx,     0,         0    ],
+                                    [    0,     local_Iyy,     0    ],
+                                    [    0,         0,     local_Izz]])
+  global_ref = np.matrix([[1, 0, 0],
+                          [0, 1, 0],
+                          [0, 0, 1]])
+  rotation_matrix = global_ref * (local_ref.transpose())
+  rotated_inertia_tensor = rotation_matrix * local_inertia_tensor *\
+                           (rotation_matrix.transpose())
+  return rotated_inertia_tensor.item(0)
+
+def random_rider_profile(rng):
+  return RiderProfile({'rider_mass': rng.uniform(40, 120),
+                       'head_diameter': rng.uniform(0.15, 0.25),
+                       'torso_length': rng.uniform(0.4, 0.8),
+                       'torso_depth': rng.uniform(0.15, 0.35),
+                       'torso_width': rng.uniform(0.3, 0.5),
+                       'arm_length': rng.uniform(0.5, 0.8),
+                       'arm_diameter': rng.uniform(0.06, 0.12),
+                       'leg_length': rng.uniform(0.7, 1.1),
+                       'leg_diameter': rng.uniform(0.1, 0.2)})
+
+class RotatedIxxTest(unittest.TestCase):
+  'Checks that the closed form rotated Ixx used for the arm, leg and torso \
+   matches the matrix product it replaced.'
+
+  def setUp(self):
+    self._rng = random.Random(1234)
+    self._bike = Bike()
+
+  ## Angles spread over the full circle, including the axis aligned ones.
+  def angles(self):
+    angles = [k * math.pi / 4 for k in range(-8, 9)]
+    angles.extend(self._rng.uniform(-2 * math.pi, 2 * math.pi)
+                  for _ in range(200))
+    return angles
+
+  ## Builds a bike holding a random rider's segment masses, ready to compute a
+  ## segment's inertia about the global x-axis.
+  def bike_with_rider(self, rider_profile):
+    bike = Bike()
+    bike._rider_profile = rider_profile
+    bike._m_arm = rider_profile.m_arm
+    bike._m_leg = rider_profile.m_leg
+    bike._m_torso = rider_profile.m_torso
+    bike._rider_Ixx = 0
+    return bike
+
+  def assertClose(self, actual, expected):
+    self.assertAlmostEqual(actual, expected, delta=1e-12 * max(1, abs(expected)))
+
+  def test_matches_matrix_for_principal_inertias(self):
+    for angle in self.angles():
+      local_Ixx = self._rng.uniform(0.001, 10)
+      local_Iyy = self._rng.uniform(0.001, 10)
+      local_Izz = self._rng.uniform(0.001, 10)
+      local_ref = np.matrix([[math.sin(angle), 0, math.cos(angle)],
+                             [       0,        1,        0       ],
+                             [math.cos(angle), 0, math.sin(angle)]])
+      self.assertClose(
+          self._bike._compute_rotated_Ixx(math.sin(angle), math.cos(angle),
+                                          local_Ixx, local_Izz),
+          matrix_rotated_Ixx(local_ref, local_Ixx, local_Iyy, local_Izz))
+
+  def test_arm(self):
+    for zeta in self.angles():
+      rider_profile = random_rider_profile(self._rng)
+      bike = self.bike_with_rider(rider_profile)
+      bike._zeta = zeta
+      bike._arm_cg_z = self._rng.uniform(0, 1.5)
+      bike._compute_arm_inertia_about_global_x_axis()
+
+      local_ref = np.matrix([[math.sin(zeta), 0, math.cos(zeta)],
+                             [      0,        1,       0       ],
+                             [math.cos(zeta), 0, math.sin(zeta)]])
+      expected = matrix_rotated_Ixx(local_ref, rider_profile.arm_local_Ixx,
+                                    rider_profile.arm_local_Ixx,
+                                    rider_profile.arm_local_Izz) +\
+                 rider_profile.m_arm * ((((rider_profile.torso_width / 2) +\
+                                          (rider_profile.arm_diameter / 2)) ** 2) +\
+                                        (bike._arm_cg_z ** 2))
+      self.assertClose(bike._arm_Ixx, expected)
+
+  def test_leg(self):
+    for theta in self.angles():
+      rider_profile = random_rider_profile(self._rng)
+      bike = self.bike_with_rider(rider_profile)
+      bike._theta = theta
+      bike._leg_cg_z = self._rng.uniform(0, 1.5)
+      bike._compute_leg_inertia_about_global_x_axis()
+
+      local_ref = np.matrix([[-math.sin(theta), 0,  math.cos(theta)],
+                             [        0,        1,         0       ],
+                             [-math.cos(theta), 0, -math.sin(theta)]])
+      expected = matrix_rotated_Ixx(local_ref, rider_profile.leg_local_Ixx,
+                                    rider_profile.leg_local_Ixx,
+                                    rider_profile.leg_local_Izz) +\
+                 rider_profile.m_leg * ((((rider_profile.torso_width / 2) -\
+                                          (rider_profile.leg_diameter / 2)) ** 2) +\
+                                        (bike._leg_cg_z ** 2))
+      self.assertClose(bike._leg_Ixx, expected)
+
+  def test_torso(self):
+    for phi in self.angles():
+      rider_profile = random_rider_profile(self._rng)
+      bike = self.bike_with_rider(rider_profile)
+      bike._phi = phi
+      bike._torso_cg_z = self._rng.uniform(0, 1.5)
+      bike._compute_torso_inertia_about_global_x_axis()
+
+      torso_local_Iyy = (1 / 12.0) * rider_profile.m_torso *\
+                        ((rider_profile.torso_depth ** 2) +\
+                         (rider_profile.torso_length ** 2))
+      local_ref = np.matrix([[ math.sin(phi), 0, math.cos(phi)],
+                             [       0,       1,       0      ],
+                             [-math.cos(phi), 0, math.sin(phi)]])
+      expected = matrix_rotated_Ixx(local_ref, rider_profile.torso_local_Ixx,
+                                    torso_local_Iyy,
+                                    rider_profile.torso_local_Izz) +\
+                 rider_profile.m_torso * (bike._torso_cg_z ** 2)
+      self.assertClose(bike._torso_Ixx, expected)
+
+if __name__ == '__main__':
+  unittest.main()
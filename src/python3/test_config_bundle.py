@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+
+import os
+import pickle
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+import config_bundle
+from config_bundle import ConfigBundle, load_config_files, \
+                          pop_config_bundle_options
+
+class ConfigBundleTest(unittest.TestCase):
+  'Checks when a config bundle is reused, reparsed or refused.'
+
+  def setUp(self):
+    self._directory = tempfile.TemporaryDirectory()
+    self._cache_home = os.path.join(self._directory.name, 'cache')
+    environment = mock.patch.dict(os.environ,
+                                  {'XDG_CACHE_HOME': self._cache_home})
+    environment.start()
+    self.addCleanup(environment.stop)
+
+    self._source_filename = os.path.join(self._directory.name, 'ga.txt')
+    self.write_source('num_runs = 1\n')
+    self._bundle_filename = os.path.join(self._directory.name, 'ga.bundle')
+    self._parses = 0
+
+  def tearDown(self):
+    self._directory.cleanup()
+
+  def write_source(self, contents):
+    with open(self._source_filename, 'w') as source_file:
+      source_file.write(contents)
+
+  ## Stands in for parsing the config files, returning their contents along
+  ## with the number of times they have been parsed.
+  def parse(self):
+    self._parses += 1
+    with open(self._source_filename) as source_file:
+      return {'contents': source_file.read(), 'parse': self._parses}
+
+  def load_or_parse(self):
+    return ConfigBundle(self._bundle_filename,
+                        [self._source_filename]).load_or_parse(self.parse)
+
+  def test_unchanged_sources_reuse_the_bundle(self):
+    self.assertEqual(self.load_or_parse()['parse'], 1)
+    self.assertEqual(self.load_or_parse()['parse'], 1)
+    self.assertEqual(self._parses, 1)
+
+  def test_touched_source_reuses_the_bundle(self):
+    self.load_or_parse()
+    stats = os.stat(self._source_filename)
+    os.utime(self._source_filename, ns=(stats.st_atime_ns,
+                                        stats.st_mtime_ns + 10 ** 9))
+
+    self.assertEqual(self.load_or_parse()['parse'], 1)
+
+    ## The new modification time was recorded, so the next load doesn't hash.
+    with mock.patch.object(config_bundle, '_hash_file',
+                           wraps=config_bundle._hash_file) as hash_file:
+      self.assertEqual(self.load_or_parse()['parse'], 1)
+    hash_file.assert_not_called()
+    self.assertEqual(self._parses, 1)
+
+  def test_edited_source_is_reparsed(self):
+    self.load_or_parse()
+    stats = os.stat(self._source_filename)
+    self.write_source('num_runs = 2\n')
+    os.utime(self._source_filename, ns=(stats.st_atime_ns,
+                                        stats.st_mtime_ns + 10 ** 9))
+
+    simulation_params = self.load_or_parse()
+    self.assertEqual(simulation_params, {'contents': 'num_runs = 2\n',
+                                         'parse': 2})
+
+  def test_tampered_payload_is_not_unpickled(self):
+    self.load_or_parse()
+    with open(self._bundle_filename, 'rb') as bundle_file:
+      contents = bundle_file.read()
+
+    ## Swap in a payload holding other params, keeping the old signature.
+    bundle = pickle.loads(contents[32:])
+    bundle['simulation_params'] = {'contents': 'forged', 'parse': 0}
+    with open(self._bundle_filename, 'wb') as bundle_file:
+      bundle_file.write(contents[:32])
+      bundle_file.write(pickle.dumps(bundle))
+
+    with mock.patch.object(config_bundle.pickle, 'loads',
+                           wraps=pickle.loads) as loads:
+      simulation_params = ConfigBundle(self._bundle_filename,
+                                       [self._source_filename]).load()
+    self.assertIsNone(simulation_params)
+    loads.assert_not_called()
+
+    self.assertEqual(self.load_or_parse()['parse'], 2)
+
+  def test_group_readable_cache_directory_is_refused(self):
+    cache_directory = os.path.join(self._cache_home, 'bike_config_bundles')
+    os.makedirs(cache_directory)
+    os.chmod(cache_directory, 0o750)
+
+    ## The default bundle is turned off.
+    build_config_bundle = pop_config_bundle_options(['search.py'])
+    self.assertIsNone(build_config_bundle('search', [self._source_filename]))
+
+    ## A bundle named on the command line can't be signed, so it is neither
+    ## written nor loaded.
+    self.assertEqual(self.load_or_parse()['parse'], 1)
+    self.assertEqual(self.load_or_parse()['parse'], 2)
+    self.assertFalse(os.path.exists(self._bundle_filename))
+
+  def test_default_bundle_is_kept_in_a_private_cache_directory(self):
+    command_line_args = ['search.py', 'output.txt']
+    build_config_bundle = pop_config_bundle_options(command_line_args)
+    self.assertEqual(command_line_args, ['search.py', 'output.txt'])
+
+    bundle = build_config_bundle('search', [self._source_filename])
+    directory = os.path.dirname(bundle.filename)
+    self.assertEqual(directory, os.path.join(self._cache_home,
+                                             'bike_config_bundles'))
+    self.assertTrue(os.path.basename(bundle.filename).startswith('search_'))
+    self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+
+    ## Other kinds or config files get bundles of their own.
+    other_bundle = build_config_bundle('other', [self._source_filename])
+    self.assertNotEqual(other_bundle.filename, bundle.filename)
+
+  def test_config_bundle_option_names_the_bundle(self):
+    command_line_args = ['search.py', '--config-bundle', self._bundle_filename,
+                         'output.txt']
+    build_config_bundle = pop_config_bundle_options(command_line_args)
+    self.assertEqual(command_line_args, ['search.py', 'output.txt'])
+
+    for parse in [1, 1]:
+      simulation_params = load_config_files(build_config_bundle, 'search',
+                                            [self._source_filename],
+                                            self.parse)
+      self.assertEqual(simulation_params['parse'], parse)
+    self.assertTrue(os.path.exists(self._bundle_filename))
+
+  def test_no_config_bundle_option_always_parses(self):
+    command_line_args = ['search.py', '--no-config-bundle', 'output.txt']
+    build_config_bundle = pop_config_bundle_options(command_line_args)
+    self.assertEqual(command_line_args, ['search.py', 'output.txt'])
+    self.assertIsNone(build_config_bundle('search', [self._source_filename]))
+
+    for parse in [1, 2]:
+      simulation_params = load_config_files(build_config_bundle, 'search',
+                                            [self._source_filename],
+                                            self.parse)
+      self.assertEqual(simulation_params['parse'], parse)
+    self.assertFalse(os.path.exists(os.path.join(self._cache_home,
+                                                 'bike_config_bundles')))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+import os
+import tempfile
+import unittest
+
+from config_parser import Parser
+
+class RangeParamTest(unittest.TestCase):
+  'Checks the values of the "param = x to y by z" ranges.'
+
+  def setUp(self):
+    self._parser = Parser()
+
+  ## Returns the values of the range written on the param_line, or None if the
+  ## range was rejected.
+  def parse_range(self, param_line):
+    dictionary = {}
+    if not self._parser._parse_range_param_line(
+        dictionary, self._parser.range_param.match(param_line)):
+      return None
+    return dictionary['param']
+
+  def test_fine_steps_do_not_drift(self):
+    values = self.parse_range('param = 0 to 1 by 0.001')
+    self.assertEqual(len(values), 1001)
+    self.assertEqual(values[-1], 1.0)
+    self.assertEqual(values[300], 0.3)
+    self.assertNotIn(0.30000000000000004, values)
+    self.assertEqual(values, [round(index * 0.001, 3)
+                              for index in range(0, 1001)])
+
+  def test_end_between_steps_is_dropped_when_closer_to_the_step_before(self):
+    self.assertEqual(self.parse_range('param = 0 to 1 by 0.3'),
+                     [0.0, 0.3, 0.6, 0.9])
+
+  def test_end_between_steps_is_added_when_closer_to_the_step_past_it(self):
+    self.assertEqual(self.parse_range('param = 0 to 1.1 by 0.4'),
+                     [0.0, 0.4, 0.8, 1.1])
+
+  def test_end_half_way_between_steps_is_dropped(self):
+    self.assertEqual(self.parse_range('param = 0 to 1 by 0.4'),
+                     [0.0, 0.4, 0.8])
+    self.assertEqual(self.parse_range('param = 1.5 to 3 by 1'), [1.5, 2.5])
+
+  def test_descending_range(self):
+    self.assertEqual(self.parse_range('param = 1 to 0 by -0.25'),
+                     [1.0, 0.75, 0.5, 0.25, 0.0])
+
+  def test_values_are_rounded_to_the_written_decimal_places(self):
+    self.assertEqual(self.parse_range('param = 0.05 to 0.3 by 0.05'),
+                     [0.05, 0.1, 0.15, 0.2, 0.25, 0.3])
+    self.assertEqual(self.parse_range('param = 0.125 to 0.5 by 0.1'),
+                     [0.125, 0.225, 0.325, 0.425, 0.5])
+    self.assertEqual(self.parse_range('param = 2 to 4 by 1'), [2.0, 3.0, 4.0])
+
+  def test_steps_away_from_the_end_are_rejected(self):
+    self.assertIsNone(self.parse_range('param = 1 to 0 by 0.25'))
+    self.assertIsNone(self.parse_range('param = 0 to 1 by -0.25'))
+    self.assertIsNone(self.parse_range('param = 0 to 1 by 0'))
+
+  def test_bike_params_file_ranges(self):
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'bike_params.txt')
+      with open(filename, 'w') as params_file:
+        params_file.write('wheelbase = 0.9 to 1.2 by 0.1\n'
+                          'hip_angle = 150 to 80 by -35\n')
+      bike_params = {}
+      self.assertTrue(self._parser.parse_bike(bike_params, filename))
+    self.assertEqual(bike_params, {'wheelbase': [0.9, 1.0, 1.1, 1.2],
+                                   'hip_angle': [150.0, 115.0, 80.0]})
+
+if __name__ == '__main__':
+  unittest.main()
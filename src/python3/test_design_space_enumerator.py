@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+import itertools
+import unittest
+
+import numpy as np
+
+from batch_bike_evaluator import BIKE_PARAM_NAMES
+from design_space_enumerator import DesignSpaceEnumerator
+
+## Returns a small bike_params dictionary ({param -> [values]}) over all of the
+## BIKE_PARAM_NAMES, with a mix of radixes (including single valued params) so
+## every stride is different. The params are listed in reverse so the
+## enumeration order has to come from the param_names rather than the keys.
+def mixed_radix_bike_params():
+  radixes = [3, 1, 2, 1, 4, 2, 1, 1, 3, 1, 1, 2, 1, 1, 1]
+  bike_params = {}
+  for name, radix in reversed(list(zip(BIKE_PARAM_NAMES, radixes))):
+    bike_params[name] = [round(0.1 * value + len(name), 3)
+                         for value in range(0, radix)]
+  return bike_params
+
+class DesignSpaceEnumeratorTest(unittest.TestCase):
+  'Checks that design numbers map to and from the designs in the same order \
+   as nested for loops over the BIKE_PARAM_NAMES.'
+
+  def setUp(self):
+    self._bike_params = mixed_radix_bike_params()
+    self._enumerator = DesignSpaceEnumerator(self._bike_params,
+                                             BIKE_PARAM_NAMES)
+
+  def test_size(self):
+    self.assertEqual(self._enumerator.size, 3 * 2 * 4 * 2 * 3 * 2)
+    self.assertEqual(len(self._enumerator), self._enumerator.size)
+
+  def test_round_trips_every_design_number(self):
+    for index in range(0, self._enumerator.size):
+      indexes = self._enumerator.index_to_indexes(index)
+      self.assertEqual(self._enumerator.indexes_to_index(indexes), index)
+      design = self._enumerator.index_to_design(index)
+      self.assertEqual(self._enumerator.design_to_index(design), index)
+
+  def test_order_matches_itertools_product(self):
+    products = itertools.product(*[self._bike_params[name]
+                                   for name in BIKE_PARAM_NAMES])
+    for index, values in enumerate(products):
+      self.assertEqual(self._enumerator.index_to_design(index),
+                       dict(zip(BIKE_PARAM_NAMES, values)))
+    self.assertEqual(index + 1, self._enumerator.size)
+
+  def test_chunks_match_the_single_designs(self):
+    size = self._enumerator.size
+    for start, stop, chunk_size in [(0, size, 7), (0, size, size),
+                                    (5, 100, 16), (size - 3, size + 10, 2),
+                                    (-4, 3, 1), (50, 50, 4)]:
+      design_numbers = []
+      for chunk_start, designs in self._enumerator.design_chunks(start, stop,
+                                                                 chunk_size):
+        self.assertLessEqual(len(designs), chunk_size)
+        for row, design in enumerate(designs):
+          expected = self._enumerator.index_to_design(chunk_start + row)
+          np.testing.assert_array_equal(design, [expected[name] for name
+                                                 in BIKE_PARAM_NAMES])
+          design_numbers.append(chunk_start + row)
+      self.assertEqual(design_numbers, list(range(max(0, start),
+                                                  min(size, stop))))
+
+  def test_split_covers_the_space(self):
+    for range_size in [1, 7, 48, self._enumerator.size, 10000]:
+      ranges = self._enumerator.split(range_size)
+      self.assertEqual(ranges[0][0], 0)
+      self.assertEqual(ranges[-1][1], self._enumerator.size)
+      for (start, stop), (next_start, next_stop) in zip(ranges, ranges[1:]):
+        self.assertEqual(stop, next_start)
+      self.assertTrue(all(stop - start <= range_size for start, stop in ranges))
+
+  def test_out_of_range_designs_are_rejected(self):
+    with self.assertRaises(Exception):
+      self._enumerator.index_to_indexes(self._enumerator.size)
+    with self.assertRaises(Exception):
+      self._enumerator.index_to_indexes(-1)
+    design = self._enumerator.index_to_design(0)
+    design['wheelbase'] = -1.0
+    with self.assertRaises(Exception):
+      self._enumerator.design_to_index(design)
+
+if __name__ == '__main__':
+  unittest.main()
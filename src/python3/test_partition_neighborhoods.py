@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+import random
+import unittest
+
+import numpy as np
+
+from partition_neighborhoods import PartitionNeighborhoods
+from r_partition import RPartition
+from ranked_population import RankedPopulation
+
+class PartitionNeighborhoodsTest(unittest.TestCase):
+  'Checks that neighborhoods kept up to date across generations give the same \
+   partitions as rebuilding them from scratch every generation.'
+
+  def setUp(self):
+    self._rng = random.Random(2024)
+    self._gene_count = 5
+    self._value_count = 6
+    self._bike_params = {'param_' + str(gene): list(range(0, self._value_count))
+                         for gene in range(0, self._gene_count)}
+
+  def random_genome(self):
+    return [self._rng.randrange(0, self._value_count)
+            for _ in range(0, self._gene_count)]
+
+  ## Yields a RankedPopulation per generation, where each generation keeps a
+  ## random part of the last one (dropping the rest) and adds new genomes.
+  def generations(self, count, size):
+    genomes = [self.random_genome() for _ in range(0, size)]
+    for _ in range(0, count):
+      scores = [self._rng.choice([float('inf'), 2.0, self._rng.uniform(0, 10)])
+                for _ in genomes]
+      yield RankedPopulation(self._bike_params, genomes, scores)
+
+      survivors = self._rng.sample(genomes, self._rng.randint(0, size))
+      genomes = survivors + [self.random_genome()
+                             for _ in range(0, size - len(survivors))]
+
+  def assertSamePartitions(self, actual, expected):
+    self.assertEqual(len(actual), len(expected))
+    for actual_partition, expected_partition in zip(actual, expected):
+      np.testing.assert_array_equal(actual_partition.genomes,
+                                    expected_partition.genomes)
+      np.testing.assert_array_equal(actual_partition.scores,
+                                    expected_partition.scores)
+
+  def test_incremental_partitions_match_rebuild(self):
+    for partition_radius in [0, 1, 1.5, 2, 3]:
+      partition_attributes = self._rng.sample(range(0, self._gene_count), 3)
+      neighborhoods = PartitionNeighborhoods(partition_attributes,
+                                             partition_radius)
+      for ranked_pop in self.generations(8, 60):
+        for min_max in ['min', 'max']:
+          expected = RPartition().partition_ranked(ranked_pop,
+                                                   partition_attributes,
+                                                   partition_radius, min_max)
+          actual = RPartition().partition_ranked(ranked_pop,
+                                                 partition_attributes,
+                                                 partition_radius, min_max,
+                                                 neighborhoods=neighborhoods)
+          self.assertSamePartitions(actual, expected)
+
+  def test_incremental_neighborhoods_match_rebuild(self):
+    partition_attributes = [0, 2, 4]
+    neighborhoods = PartitionNeighborhoods(partition_attributes, 2)
+    for ranked_pop in self.generations(8, 60):
+      nodes = neighborhoods.update(ranked_pop.genomes)
+
+      rebuilt = PartitionNeighborhoods(partition_attributes, 2)
+      rebuilt_nodes = rebuilt.update(ranked_pop.genomes)
+      self.assertEqual(len(neighborhoods), len(rebuilt))
+
+      ## Compare the neighborhoods by the points they hold, since the two
+      ## number their nodes differently.
+      rebuilt_node_of = {}
+      for node, rebuilt_node in zip(nodes, rebuilt_nodes):
+        rebuilt_node_of[node] = rebuilt_node
+      for node, rebuilt_node in rebuilt_node_of.items():
+        self.assertEqual({rebuilt_node_of[neighbor]
+                          for neighbor in neighborhoods.neighbors(node)},
+                         rebuilt.neighbors(rebuilt_node))
+
+  def test_mismatched_neighborhoods_are_rejected(self):
+    ranked_pop = next(self.generations(1, 10))
+    neighborhoods = PartitionNeighborhoods([0, 1], 2)
+    with self.assertRaises(Exception):
+      RPartition().partition_ranked(ranked_pop, [0, 2], 2, 'min',
+                                    neighborhoods=neighborhoods)
+
+if __name__ == '__main__':
+  unittest.main()
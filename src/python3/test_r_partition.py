@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+
+import random
+import unittest
+
+import numpy as np
+
+from r_partition import RPartition
+from ranked_population import RankedPopulation
+from radius_grid_index import RadiusGridIndex
+
+## Partitions the data_points the way RPartition did before it had a grid
+## index: every seed is measured against every point with
+## _build_partition_around_seed, and the points it takes in are struck from the
+## remaining candidates.
+def baseline_partitions(r_partition, data_points, ordered_candidates,
+                        partition_attributes, partition_radius):
+  ordered_candidates = list(ordered_candidates)
+  partitions = []
+  while ordered_candidates:
+    partition_seed = ordered_candidates.pop(0)
+    partition = r_partition._build_partition_around_seed(data_points,
+                                                         partition_seed,
+                                                         partition_attributes,
+                                                         partition_radius)
+    ordered_candidates = [candidate for candidate in ordered_candidates
+                          if candidate not in partition]
+    partitions.append(partition)
+  return partitions
+
+## Returns the baseline partitions of the data_points made by partition.
+def baseline_partition(data_points, partition_attributes, partition_radius,
+                       min_max, threshold_factor=0.50):
+  r_partition = RPartition()
+  scores = data_points.keys()
+  threshold = r_partition._compute_average_score(scores, threshold_factor)
+  ordered_candidates = r_partition._compute_ordered_candidate_scores(scores,
+                                                                     threshold,
+                                                                     min_max)
+  return baseline_partitions(r_partition, data_points, ordered_candidates,
+                             partition_attributes, partition_radius)
+
+## Returns data_points ({score --> {attribute --> value}}) whose values sit on a
+## grid of the given spacing, so many pairs of points are exactly the radius
+## apart (such as 3-4-5 triangles with a radius of 5 spacings).
+def grid_data_points(rng, count, attributes, spacing, extent):
+  data_points = {}
+  while len(data_points) < count:
+    score = rng.uniform(0, 100)
+    data_points[score] = {attribute: rng.randint(0, extent) * spacing
+                          for attribute in attributes}
+  data_points[float('inf')] = {attribute: 0.0 for attribute in attributes}
+  return data_points
+
+## Returns data_points whose values are drawn uniformly at random.
+def random_data_points(rng, count, attributes):
+  data_points = {}
+  while len(data_points) < count:
+    data_points[rng.uniform(0, 100)] = {attribute: rng.uniform(-10, 10)
+                                        for attribute in attributes}
+  return data_points
+
+## Returns the baseline partitions of the ranked_pop made by partition_ranked,
+## each as a list of ranks.
+def baseline_partition_ranked(ranked_pop, partition_attributes,
+                              partition_radius, min_max, threshold_factor=0.50):
+  r_partition = RPartition()
+  scores = ranked_pop.scores.tolist()
+  threshold = r_partition._compute_average_score(scores, threshold_factor)
+  if min_max == 'min':
+    ordered_candidates = [rank for rank in range(0, len(scores))
+                          if scores[rank] <= threshold]
+  else:
+    ordered_candidates = [rank for rank in reversed(range(0, len(scores)))
+                          if scores[rank] >= threshold]
+
+  data_points = dict(enumerate(ranked_pop.genomes.tolist()))
+  partitions = baseline_partitions(r_partition, data_points, ordered_candidates,
+                                   partition_attributes, partition_radius)
+  return [sorted(partition.keys()) for partition in partitions]
+
+## Returns a RankedPopulation of count random genomes over gene_count genes,
+## each gene indexing into value_count values. Some scores are tied and some
+## are inf, like the infeasible bikes of a real population.
+def random_ranked_population(rng, count, gene_count, value_count):
+  bike_params = {'param_' + str(gene): list(range(0, value_count))
+                 for gene in range(0, gene_count)}
+  genomes = [[rng.randrange(0, value_count) for _ in range(0, gene_count)]
+             for _ in range(0, count)]
+  scores = [rng.choice([float('inf'), 1.0, rng.uniform(0, 10)])
+            for _ in range(0, count)]
+  return RankedPopulation(bike_params, genomes, scores)
+
+## Returns the partitions as lists of (key, point) items, so partitions are
+## only equal if they hold the same points in the same order.
+def as_items(partitions):
+  return [list(partition.items()) for partition in partitions]
+
+class RadiusGridIndexTest(unittest.TestCase):
+  'Checks that the grid indexed partitions match a scan of every point.'
+
+  def setUp(self):
+    self._rng = random.Random(42)
+
+  ## Yields (data_points, partition_attributes, partition_radius) cases.
+  def cases(self):
+    attributes = ['a', 'b', 'c']
+    for spacing in [1, 0.1, 0.25]:
+      for radius in [0, 1, 2, 5]:
+        data_points = grid_data_points(self._rng, 300, attributes, spacing, 12)
+        yield data_points, ['a', 'b'], radius * spacing
+        yield data_points, attributes, radius * spacing
+    for radius in [0.5, 2.0, 7.5, float('inf')]:
+      data_points = random_data_points(self._rng, 300, attributes)
+      yield data_points, ['a'], radius
+      yield data_points, attributes, radius
+
+  def test_partition_matches_full_scan(self):
+    for data_points, partition_attributes, partition_radius in self.cases():
+      for min_max in ['min', 'max']:
+        expected = baseline_partition(data_points, partition_attributes,
+                                      partition_radius, min_max)
+        actual = RPartition(engine='index').partition(data_points,
+                                                      partition_attributes,
+                                                      partition_radius,
+                                                      min_max)
+        self.assertEqual(as_items(actual), as_items(expected))
+
+  def test_points_on_the_radius_are_included(self):
+    data_points = {1.0: {'a': 0.0, 'b': 0.0},
+                   2.0: {'a': 0.3, 'b': 0.4},
+                   3.0: {'a': -0.5, 'b': 0.0},
+                   4.0: {'a': 0.0, 'b': 0.5000001}}
+    ## Pad the points out so the index hashes them rather than scanning.
+    for position in range(0, 20):
+      data_points[10.0 + position] = {'a': 100.0 + position, 'b': 100.0}
+
+    r_partition = RPartition(engine='index')
+    partition = r_partition._build_partition_around_seed(
+        data_points, 1.0, ['a', 'b'], 0.5,
+        RadiusGridIndex(data_points, ['a', 'b'], 0.5))
+    expected = r_partition._build_partition_around_seed(data_points, 1.0,
+                                                        ['a', 'b'], 0.5)
+    self.assertEqual(list(partition.keys()), list(expected.keys()))
+    self.assertIn(2.0, partition)
+    self.assertIn(3.0, partition)
+    self.assertNotIn(4.0, partition)
+
+class VectorizedEngineTest(unittest.TestCase):
+  'Checks that the index and vectorized engines give the same partitions as \
+   the baseline dict loop, from both partition and partition_ranked.'
+
+  def setUp(self):
+    self._rng = random.Random(7)
+
+  def test_partition(self):
+    attributes = ['a', 'b', 'c']
+    for trial in range(0, 10):
+      if trial % 2 == 0:
+        data_points = grid_data_points(self._rng, 200, attributes,
+                                       self._rng.choice([1, 0.1, 0.25]), 10)
+        partition_radius = self._rng.choice([0, 1, 2, 5]) * 0.25
+      else:
+        data_points = random_data_points(self._rng, 200, attributes)
+        partition_radius = self._rng.uniform(0.5, 8)
+      partition_attributes = attributes[:self._rng.randint(1, 3)]
+
+      for min_max in ['min', 'max']:
+        expected = baseline_partition(data_points, partition_attributes,
+                                      partition_radius, min_max)
+        for engine in ['index', 'vectorized']:
+          actual = RPartition(engine=engine).partition(data_points,
+                                                       partition_attributes,
+                                                       partition_radius,
+                                                       min_max)
+          self.assertEqual(as_items(actual), as_items(expected), engine)
+
+  def test_partition_ranked(self):
+    for trial in range(0, 10):
+      ranked_pop = random_ranked_population(self._rng, 150, 4, 8)
+      partition_attributes = self._rng.sample(range(0, 4), self._rng.randint(1, 4))
+      partition_radius = self._rng.choice([0, 1, 2, 2.5, 5])
+
+      for min_max in ['min', 'max']:
+        expected = baseline_partition_ranked(ranked_pop, partition_attributes,
+                                             partition_radius, min_max)
+        for engine in ['index', 'vectorized']:
+          actual = RPartition(engine=engine).partition_ranked(
+              ranked_pop, partition_attributes, partition_radius, min_max)
+          self.assertEqual(len(actual), len(expected), engine)
+          for partition, ranks in zip(actual, expected):
+            np.testing.assert_array_equal(partition.genomes,
+                                          ranked_pop.genomes[ranks])
+            np.testing.assert_array_equal(partition.scores,
+                                          ranked_pop.scores[ranks])
+
+class PartitionPairsTest(unittest.TestCase):
+  'Checks that partitioning (score, point) pairs keeps tied scores apart.'
+
+  def setUp(self):
+    self._rng = random.Random(11)
+
+  def test_matches_partition_ranked(self):
+    for trial in range(0, 10):
+      ranked_pop = random_ranked_population(self._rng, 150, 4, 8)
+      partition_attributes = self._rng.sample(range(0, 4), self._rng.randint(1, 4))
+      partition_radius = self._rng.choice([0, 1, 2, 2.5, 5])
+      pairs = [(score, dict(enumerate(genome))) for score, genome
+               in zip(ranked_pop.scores.tolist(), ranked_pop.genomes.tolist())]
+
+      expected = baseline_partition_ranked(ranked_pop, partition_attributes,
+                                           partition_radius, 'min')
+      for engine in ['index', 'vectorized']:
+        actual = RPartition(engine=engine).partition_pairs(
+            pairs, partition_attributes, partition_radius, 'min')
+        self.assertEqual(actual, [[pairs[rank] for rank in ranks]
+                                  for ranks in expected], engine)
+
+  def test_tied_scores_are_kept_apart(self):
+    pairs = [(2.0, {'a': 0.0}), (1.0, {'a': 10.0}), (1.0, {'a': 0.25}),
+             (1.0, {'a': 20.0})]
+    for engine in ['index', 'vectorized']:
+      partitions = RPartition(engine=engine).partition_pairs(pairs, ['a'], 0.5,
+                                                             'min', 2.0)
+      self.assertEqual(partitions, [[(1.0, {'a': 10.0})],
+                                    [(1.0, {'a': 0.25}), (2.0, {'a': 0.0})],
+                                    [(1.0, {'a': 20.0})]])
+
+if __name__ == '__main__':
+  unittest.main()
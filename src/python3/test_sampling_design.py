@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+import itertools
+import unittest
+
+from sampling_design import SamplingDesign
+
+class OrthogonalArrayTest(unittest.TestCase):
+  'Checks that the orthogonal arrays are balanced for prime power levels.'
+
+  ## Asserts that every pair of levels of every pair of attributes turns up in
+  ## the same number of runs.
+  def assertOrthogonal(self, level_counts):
+    design = SamplingDesign(level_counts).orthogonal_array()
+    for a, b in itertools.combinations(range(0, len(level_counts)), 2):
+      counts = {}
+      for run in design:
+        counts[(run[a], run[b])] = counts.get((run[a], run[b]), 0) + 1
+      self.assertEqual(len(counts), level_counts[a] * level_counts[b])
+      self.assertEqual(len(set(counts.values())), 1, (level_counts, a, b))
+
+  def test_prime_power_levels_are_balanced(self):
+    for levels in [2, 3, 4, 5, 7, 8, 9, 16]:
+      for attribute_count in [2, 4, levels + 1]:
+        self.assertOrthogonal([levels] * attribute_count)
+
+  def test_powers_of_one_prime_are_balanced(self):
+    for level_counts in [[8, 4, 2], [9, 3, 3], [4, 2, 2, 4]]:
+      self.assertOrthogonal(level_counts)
+
+  def test_matches_the_old_5_level_squares(self):
+    self.assertEqual(SamplingDesign([5] * 3).orthogonal_array()[:10],
+                     [[0, 0, 0], [1, 0, 1], [2, 0, 2], [3, 0, 3], [4, 0, 4],
+                      [0, 1, 1], [1, 1, 2], [2, 1, 3], [3, 1, 4], [4, 1, 0]])
+    self.assertEqual(SamplingDesign([5] * 5).orthogonal_array()[5:10],
+                     [[0, 1, 1, 2, 3], [1, 1, 2, 3, 4], [2, 1, 3, 4, 0],
+                      [3, 1, 4, 0, 1], [4, 1, 0, 1, 2]])
+
+  def test_single_level_attributes_stay_put(self):
+    design = SamplingDesign([4, 1, 4]).orthogonal_array()
+    self.assertEqual(len(design), 16)
+    self.assertTrue(all(run[1] == 0 for run in design))
+
+class UnbalancedOrthogonalArrayTest(unittest.TestCase):
+  'Pins what the orthogonal arrays do when the level counts are not all \
+   powers of one prime: the levels are folded, leaving them unbalanced.'
+
+  ## Returns the number of runs each level of the attribute turns up in.
+  def level_runs(self, design, attribute):
+    counts = {}
+    for run in design:
+      counts[run[attribute]] = counts.get(run[attribute], 0) + 1
+    return [counts[level] for level in sorted(counts.keys())]
+
+  def test_balance_is_reported(self):
+    for level_counts in [[5, 5, 5], [8, 4, 2], [9, 3], [4, 1, 4], [2]]:
+      design = SamplingDesign(level_counts)
+      self.assertTrue(design.orthogonal_array_is_balanced(), level_counts)
+    for level_counts in [[6, 6, 6], [5, 5, 3], [3, 2], [7, 10]]:
+      design = SamplingDesign(level_counts)
+      self.assertFalse(design.orthogonal_array_is_balanced(), level_counts)
+
+  def test_six_levels_fold_onto_level_zero(self):
+    design = SamplingDesign([6, 6, 6]).orthogonal_array()
+    self.assertEqual(len(design), 49)
+    for attribute in range(0, 3):
+      self.assertEqual(self.level_runs(design, attribute), [14, 7, 7, 7, 7, 7])
+
+  def test_mixed_levels_fold_the_smaller_attribute(self):
+    design = SamplingDesign([5, 5, 3]).orthogonal_array()
+    self.assertEqual(len(design), 25)
+    self.assertEqual(self.level_runs(design, 0), [5] * 5)
+    self.assertEqual(self.level_runs(design, 2), [10, 10, 5])
+
+    ## The 5 level attributes are still balanced against each other, but not
+    ## against the folded one.
+    pairs = {}
+    for run in design:
+      pairs[(run[0], run[2])] = pairs.get((run[0], run[2]), 0) + 1
+    self.assertEqual(len(pairs), 15)
+    self.assertEqual(sorted(set(pairs.values())), [1, 2])
+    self.assertEqual(len(set((run[0], run[1]) for run in design)), 25)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+import random
+import unittest
+
+from top_k_collector import TopKCollector
+
+class TopKCollectorTest(unittest.TestCase):
+  'Checks that the collector keeps the k best items, ties included.'
+
+  def test_keeps_the_k_best(self):
+    rng = random.Random(5)
+    errors = [rng.choice([rng.uniform(0, 10), 1.0, float('inf')])
+              for _ in range(0, 500)]
+    collector = TopKCollector(25)
+    for order, error in enumerate(errors):
+      collector.offer(error, order, order)
+
+    expected = sorted((error, order) for order, error in enumerate(errors))[:25]
+    self.assertEqual(collector.to_list(), expected)
+
+  def test_tied_items_are_all_kept(self):
+    collector = TopKCollector(4)
+    for item in ['a', 'b', 'c', 'd', 'e']:
+      collector.offer(float('inf'), item)
+    self.assertEqual(collector.to_list(), [(float('inf'), 'a'),
+                                           (float('inf'), 'b'),
+                                           (float('inf'), 'c'),
+                                           (float('inf'), 'd')])
+
+    collector.offer(2.0, 'f')
+    collector.offer(2.0, 'g')
+    self.assertEqual(collector.to_list(), [(2.0, 'f'), (2.0, 'g'),
+                                           (float('inf'), 'a'),
+                                           (float('inf'), 'b')])
+
+if __name__ == '__main__':
+  unittest.main()
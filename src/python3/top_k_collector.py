@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+import heapq
+
+class TopKCollector:
+  'Keeps the k lowest error items offered to it. The items are held in a \
+   bounded max-heap (the worst kept item on top), so each offer is O(log k) \
+   and an item which is worse than everything kept is rejected in O(1).'
+
+  ## The k is the number of items to keep.
+  def __init__(self, k):
+    self._k = max(0, int(k))
+
+    ## Heap of (-error, -order, -sequence, item) entries. Negating the keys
+    ## turns heapq's min-heap into a max-heap, and the sequence number keeps the
+    ## items themselves from ever being compared.
+    self._heap = []
+    self._sequence = 0
+
+  @property
+  def k(self):
+    return self._k
+
+  def __len__(self):
+    return len(self._heap)
+
+  ## Returns True if the collector is holding k items.
+  def is_full(self):
+    return len(self._heap) >= self._k
+
+  ## Returns the error an item needs to beat to be kept, which is the error of
+  ## the worst kept item once the collector is full and inf before then.
+  def worst_error(self):
+    if self._k == 0:
+      return -float('inf')
+    if not self.is_full():
+      return float('inf')
+    return -self._heap[0][0]
+
+  ## Offers an item with the given error, returning True if it was kept. Ties on
+  ## error are broken by order (lowest wins), which defaults to the order the
+  ## items were offered in. Note that the order of each item should be unique.
+  def offer(self, error, item, order=None):
+    self._sequence += 1
+    if order is None:
+      order = self._sequence
+
+    entry = (-error, -order, -self._sequence, item)
+    if not self.is_full():
+      if self._k == 0:
+        return False
+      heapq.heappush(self._heap, entry)
+      return True
+
+    ## Only replace the worst kept item if the new one beats it.
+    if entry[:2] <= self._heap[0][:2]:
+      return False
+    heapq.heapreplace(self._heap, entry)
+    return True
+
+  ## Returns the kept items as a list of (error, order, item) tuples, sorted
+  ## from best to worst.
+  def items(self):
+    entries = sorted(self._heap, reverse=True)
+    return [(-error, -order, item) for error, order, sequence, item in entries]
+
+  ## Returns the kept items as a list of (error, item) pairs, sorted from best
+  ## to worst, the form the searches write their best bikes out in. Items with
+  ## the same error each keep their own entry.
+  def to_list(self):
+    return [(error, item) for error, order, item in self.items()]
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass
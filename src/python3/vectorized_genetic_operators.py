@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+import numpy as np
+
+from genetic_operator_base import GeneticOperatorBase
+
+class VectorizedGeneticOperators(GeneticOperatorBase):
+  'Cross over and mutation operators which build every child of a generation \
+   at once with NumPy array operations (gathering parent rows and swapping \
+   masked columns) rather than one child at a time. Subclasses supply the \
+   selection operator.'
+
+  ## The pop_size is the number of individuals in a given generation. The
+  ## cross_over_type is either 'gene_count', where every child takes the same
+  ## randomly chosen num_traits genes from its first parent and the rest from
+  ## its second, or 'uniform', where each gene of each child comes from either
+  ## parent with equal odds. The mutation_rate is the odds of each gene of a
+  ## mutated child being re-drawn, or None to re-draw the same randomly chosen
+  ## num_traits genes in every mutated child. The rng is the NumPy random
+  ## Generator to draw from.
+  def __init__(self, pop_size, cross_over_type='gene_count',
+               mutation_rate=None, rng=None):
+    GeneticOperatorBase.__init__(self, pop_size)
+
+    if cross_over_type != 'gene_count' and cross_over_type != 'uniform':
+      raise Exception('cross_over_type must be set to gene_count or uniform')
+
+    if mutation_rate is not None and (mutation_rate < 0 or mutation_rate > 1):
+      raise Exception('mutation_rate must be between 0 and 1')
+
+    if rng is None:
+      rng = np.random.default_rng()
+
+    self._cross_over_type = cross_over_type
+    self._mutation_rate = mutation_rate
+    self._rng = rng
+
+  ## Adds cross_over_count children to the new_pop, each built by crossing over
+  ## two parents drawn (with replacement) from the old_pop.
+  def cross_over(self, old_pop, new_pop, bike_params, num_traits, cross_over_count):
+    cross_over_count = int(cross_over_count)
+    if cross_over_count <= 0:
+      return
+
+    ## Gather the rows of both parents of every child.
+    parents = old_pop.genomes
+    first_parents = parents[self._rng.integers(0, len(parents), cross_over_count)]
+    second_parents = parents[self._rng.integers(0, len(parents), cross_over_count)]
+
+    ## Each child starts as its second parent, and takes the masked genes from
+    ## its first parent.
+    if self._cross_over_type == 'uniform':
+      mask = self._rng.random(first_parents.shape) < 0.5
+    else:
+      mask = np.zeros(first_parents.shape, dtype=bool)
+      mask[:, self._choose_genes(parents.shape[1], num_traits)] = True
+
+    new_pop.extend(np.where(mask, first_parents, second_parents))
+
+  ## Adds mutation_count children to the new_pop, each built by re-drawing some
+  ## of the genes of a parent drawn (with replacement) from the old_pop.
+  def mutate(self, old_pop, new_pop, bike_params, num_traits, mutation_count):
+    mutation_count = int(mutation_count)
+    if mutation_count <= 0:
+      return
+
+    parents = old_pop.genomes
+    children = parents[self._rng.integers(0, len(parents), mutation_count)]
+
+    if self._mutation_rate is None:
+      mask = np.zeros(children.shape, dtype=bool)
+      mask[:, self._choose_genes(children.shape[1], num_traits)] = True
+    else:
+      mask = self._rng.random(children.shape) < self._mutation_rate
+
+    ## Draw a new value for every gene and keep the ones under the mask.
+    mutations = self._rng.integers(0, old_pop.radixes, size=children.shape)
+    new_pop.extend(np.where(mask, mutations, children))
+
+  ## Returns num_genes distinct genes (columns) chosen at random from the
+  ## gene_count genes of a genome.
+  def _choose_genes(self, gene_count, num_genes):
+    num_genes = min(int(num_genes), gene_count)
+    return self._rng.choice(gene_count, num_genes, replace=False)
+
+## Needed so we can import this module into Jupyter notebooks.
+def load_ipython_extension(ipython):
+  pass
+
+## Needed so we can import this module into Jupyter notebooks.
+def unload_ipython_extension(ipython):
+  pass